@@ -1,27 +1,22 @@
 import os
+import logging
+from importlib import import_module
 from dotenv import load_dotenv
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 # .env 파일 로드 /
 load_dotenv()
 
-from concept.router import router as concept_router
-from goal.router import router as goal_router
-from rule.router import router as rule_router
-from component.router import router as component_router #
-from card_text.router import router as card_text_router
-from card_image.router import router as card_image_router
-from thumbnail.router import router as thumbnail_router
-from model3d.router import router as model3d_router
-from rulebook.router import router as rulebook_router 
-from balance.router import router as balance_router
-from summary.router import router as summary_router
-from translate.router import router as translate_router 
-from pricing.api import router as pricing_router
-from copyright.router import router as copyright_router
-from game_translation.router import router as translation_router
+from utils.deadline import DeadlineMiddleware
+from utils.resources import registry
+from utils.profiles import active_profiles, selected_routers
 
+logger = logging.getLogger(__name__)
+
+# 서버 시작 직후 무거운 리소스(모델/인덱스/LLM 체인)를 백그라운드에서 미리 초기화할지 여부
+RESOURCE_WARMUP = os.getenv("RESOURCE_WARMUP", "true").lower() == "true"
 
 
 app = FastAPI()
@@ -35,18 +30,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.include_router(concept_router)
-app.include_router(goal_router)
-app.include_router(rule_router)
-app.include_router(component_router)
-app.include_router(balance_router)
-app.include_router(summary_router)
-app.include_router(card_text_router)
-app.include_router(card_image_router)
-app.include_router(thumbnail_router)
-app.include_router(model3d_router)
-app.include_router(rulebook_router) 
-app.include_router(translate_router) 
-app.include_router(pricing_router)
-app.include_router(copyright_router)
-app.include_router(translation_router, prefix="/api/translation", tags=["게임 번역"])
+# 요청별 시간 예산 (X-Request-Deadline / X-Request-Timeout-Ms 또는 라우트 기본값)
+app.add_middleware(DeadlineMiddleware)
+
+# APP_PROFILE에 포함된 라우터만 import/마운트한다. import가 실패하면 해당 라우터만 비활성화한다.
+disabled_routers = {}
+for module_path, options in selected_routers():
+    try:
+        app.include_router(import_module(module_path).router, **options)
+    except Exception as e:
+        disabled_routers[module_path] = f"{type(e).__name__}: {e}"
+        logger.warning(f"라우터 '{module_path}' 비활성화: {disabled_routers[module_path]}")
+
+
+@app.on_event("startup")
+def warm_up_resources():
+    # 모델/인덱스 로드, 인코더 더미 encode, OpenAI 커넥션 pre-warm을 백그라운드 스레드에서 동시에 진행
+    if RESOURCE_WARMUP:
+        registry.warm_up_in_background()
+
+
+@app.get("/livez", tags=["System"], summary="프로세스 생존 확인")
+def livez():
+    return {"status": "alive"}
+
+
+@app.get("/readyz", tags=["System"], summary="트래픽 수신 준비 확인")
+def readyz():
+    """warm-up이 진행 중이거나 필수 리소스(READY_RESOURCES, 기본: 프로필별)가 실패해 있으면 503을 반환한다."""
+    ready, pending = registry.readiness()
+    if not ready:
+        return JSONResponse(status_code=503, content={"status": "warming", "pending": pending})
+    return {"status": "ready"}
+
+
+@app.get("/api/system/resources", tags=["System"], summary="리소스 초기화 상태")
+def resource_status():
+    return {"profiles": active_profiles(), "resources": registry.status(), "disabledRouters": disabled_routers}
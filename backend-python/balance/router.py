@@ -6,9 +6,8 @@ from typing import List, Dict
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
+from utils import deadline
+from utils.resources import PromptSpec, lazy_chain
 
 # --- 초기 설정 ---
 load_dotenv()
@@ -20,10 +19,7 @@ router = APIRouter(
 )
 
 # --- LLM 및 프롬프트 정의 ---
-llm_simulator = ChatOpenAI(model_name="gpt-4o", temperature=0.9)
-llm_analyzer = ChatOpenAI(model_name="gpt-4o", temperature=0.5)
-
-simulation_prompt_template = PromptTemplate(
+simulation_prompt_template = PromptSpec(
     input_variables=["game_rules_text", "player_names", "max_turns", "penalty_info"],
     template=(
         "# SYSTEM DIRECTIVE: AI Game Master (GM) Simulation Protocol\n"
@@ -70,9 +66,9 @@ simulation_prompt_template = PromptTemplate(
         "```"
     )
 )
-simulation_chain = LLMChain(llm=llm_simulator, prompt=simulation_prompt_template)
+simulation_chain = lazy_chain("balance.simulation", simulation_prompt_template, model_name="gpt-4o", temperature=0.9)
 
-balance_prompt_template = PromptTemplate(
+balance_prompt_template = PromptSpec(
     input_variables=["game_rules_text"],
     template=(
         "# SYSTEM DIRECTIVE: AI Game Balance Analyst\n"
@@ -98,7 +94,7 @@ balance_prompt_template = PromptTemplate(
         "```"
     )
 )
-balance_analyzer_chain = LLMChain(llm=llm_analyzer, prompt=balance_prompt_template)
+balance_analyzer_chain = lazy_chain("balance.balance_analyzer", balance_prompt_template, model_name="gpt-4o", temperature=0.5)
 
 
 # --- Pydantic 모델 정의 ---
@@ -161,13 +157,13 @@ def parse_llm_json_response(response_text: str) -> dict:
     return json.loads(json_str)
 
 @router.post("/simulate", response_model=SimulateResponse, summary="규칙 기반 시뮬레이션")
-async def simulate_endpoint(request: SimulateRequest):
+def simulate_endpoint(request: SimulateRequest):
     rules_text = json.dumps(request.rules.dict(), ensure_ascii=False, indent=2)
     player_names_str = ", ".join(request.playerNames)
     penalty_info_str = "적용됨" if request.enablePenalty else "적용되지 않음"
 
     try:
-        response = simulation_chain.invoke({
+        response = deadline.invoke_chain(simulation_chain, {
             "game_rules_text": rules_text,
             "player_names": player_names_str,
             "max_turns": request.maxTurns,
@@ -189,17 +185,21 @@ async def simulate_endpoint(request: SimulateRequest):
         }
         return final_response
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"서버 오류 발생: {e}")
 
 @router.post("/analyze", response_model=FeedbackBalanceResponse, summary="게임 밸런스 분석")
-async def analyze_balance_endpoint(request: AnalysisRequest):
+def analyze_balance_endpoint(request: AnalysisRequest):
     rules_text = json.dumps(request.rules.dict(), ensure_ascii=False, indent=2)
 
     try:
-        response = balance_analyzer_chain.invoke({"game_rules_text": rules_text})
+        response = deadline.invoke_chain(balance_analyzer_chain, {"game_rules_text": rules_text})
         balance_result = parse_llm_json_response(response['text'])
         return FeedbackBalanceResponse(**balance_result)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"LLM 기반 밸런스 분석 중 오류 발생: {e}")
\ No newline at end of file
@@ -1,9 +1,10 @@
-from openai import OpenAI
 import os
 from dotenv import load_dotenv
+from utils import deadline
+from utils.resources import lazy_openai_client
 
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = lazy_openai_client()
 
 def call_dalle_image(prompt: str) -> str:
     try:
@@ -13,9 +14,12 @@ def call_dalle_image(prompt: str) -> str:
             n=1,
             size="1024x1024",
             quality="standard",
-            style="vivid"
+            style="vivid",
+            timeout=deadline.timeout_for("image")
         )
         return response.data[0].url
+    except deadline.DeadlineExceeded:
+        raise
     except Exception as e:
         print(f"[DALL·E Error] {e}")
         return "이미지 생성 실패"
@@ -4,6 +4,7 @@ from card_image.translator import translate_prompt_kor_to_eng
 import requests
 import uuid
 from utils.s3_utils import upload_image_bytes_to_s3
+from utils import deadline
 
 # 영어 프롬프트 생성 함수 (DALL·E용)
 def generate_card_image_prompt(title: str, effect: str, game_concept: str) -> str:
@@ -35,7 +36,7 @@ def generate_card_image(title: str, effect: str, game_concept: str = "medieval f
     temporary_url = call_dalle_image(prompt)  # returns presigned image URL
 
     # 2. 해당 URL로 이미지 다운로드 (bytes)
-    response = requests.get(temporary_url)
+    response = requests.get(temporary_url, timeout=deadline.timeout_for("download"))
     if response.status_code != 200:
         raise Exception("이미지 다운로드 실패")
 
@@ -7,9 +7,8 @@ from dotenv import load_dotenv
 from typing import List
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
-from langchain_openai import ChatOpenAI
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
+from utils import deadline
+from utils.resources import PromptSpec, lazy_chain
 
 # --- 초기 설정 ---
 load_dotenv()
@@ -20,10 +19,6 @@ router = APIRouter(
     tags=["Component"]
 )
 
-# --- LLM 정의 ---
-llm_components = ChatOpenAI(model_name="gpt-4o", temperature=0.8)
-llm_regenerate_components = ChatOpenAI(model_name="gpt-4o", temperature=0.7)
-
 # --- Pydantic 모델 정의 ---
 
 class ComponentGenerationRequest(BaseModel):
@@ -67,7 +62,7 @@ class RegenerateComponentsResponse(BaseModel):
 # --- 프롬프트 템플릿 정의 ---
 
 # 🚨 [수정] 프롬프트의 지시사항과 JSON 예시를 새로운 구조에 맞게 변경합니다.
-component_generation_prompt = PromptTemplate(
+component_generation_prompt = PromptSpec(
     input_variables=["theme", "ideaText", "mechanics", "mainGoal", "turnStructure", "actionRules"],
     template="""# Mission: 당신은 보드게임 업계의 살아있는 전설, '마스터 보드게임 아키텍트'입니다. 당신의 임무는 단순히 룰을 물질화하는 것을 넘어, **플레이어가 박스를 열고, 구성품을 만지고, 게임을 끝낼 때까지의 모든 순간을 아우르는 '완벽한 제품 경험'**을 설계하는 것입니다.
 
@@ -128,7 +123,7 @@ component_generation_prompt = PromptTemplate(
 )
 
 # ... (component_regeneration_prompt_template는 기존 구조를 유지해도 재생성 로직에 큰 문제가 없어 그대로 둡니다) ...
-component_regeneration_prompt_template = PromptTemplate(
+component_regeneration_prompt_template = PromptSpec(
     input_variables=[
         "current_components_json", "feedback", "theme", "playerCount", "averageWeight",
         "ideaText", "mechanics", "mainGoal", "winConditionType", "storyline",
@@ -204,8 +199,8 @@ component_regeneration_prompt_template = PromptTemplate(
 )
 
 # --- LLM 체인 정의 ---
-component_generation_chain = LLMChain(llm=llm_components, prompt=component_generation_prompt)
-component_regeneration_chain = LLMChain(llm=llm_regenerate_components, prompt=component_regeneration_prompt_template)
+component_generation_chain = lazy_chain("component.component_generation", component_generation_prompt, model_name="gpt-4o", temperature=0.8)
+component_regeneration_chain = lazy_chain("component.component_regeneration", component_regeneration_prompt_template, model_name="gpt-4o", temperature=0.7)
 
 
 # --- API 엔드포인트 ---
@@ -213,7 +208,7 @@ component_regeneration_chain = LLMChain(llm=llm_regenerate_components, prompt=co
 def generate_components_api(request: ComponentGenerationRequest):
     response_text = ""
     try:
-        response = component_generation_chain.invoke(request.dict())
+        response = deadline.invoke_chain(component_generation_chain, request.dict())
         response_text = response.get('text', '')
         
         json_match = re.search(r"```json\s*(\{.*?\})\s*```", response_text, re.DOTALL)
@@ -230,6 +225,8 @@ def generate_components_api(request: ComponentGenerationRequest):
         print(f"JSON 파싱 오류: {e}")
         print(f"LLM 원본 응답: {response_text}")
         raise HTTPException(status_code=500, detail="LLM 응답을 JSON으로 파싱하는 데 실패했습니다.")
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"구성요소 생성 중 오류 발생: {e}")
         raise HTTPException(status_code=500, detail=f"서버 내부 오류 발생: {e}")
@@ -237,7 +234,7 @@ def generate_components_api(request: ComponentGenerationRequest):
 
 def regenerate_game_components_logic(request: RegenerateComponentsRequest) -> dict:
     try:
-        response = component_regeneration_chain.invoke(request.dict())
+        response = deadline.invoke_chain(component_regeneration_chain, request.dict())
         response_text = response.get('text', '')
         json_match = re.search(r"```json\s*(\{.*?\})\s*```", response_text, re.DOTALL)
         if json_match:
@@ -246,6 +243,8 @@ def regenerate_game_components_logic(request: RegenerateComponentsRequest) -> di
         else:
             # 코드 블록이 없는 경우도 처리
             return json.loads(response_text)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"재생성 중 오류 발생: {e}")
         if 'response' in locals() and 'text' in response:
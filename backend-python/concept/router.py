@@ -5,14 +5,13 @@ import os
 import numpy as np
 from dotenv import load_dotenv
 from typing import List, Dict, Any
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, Field
-from langchain_openai import ChatOpenAI
-from langchain_openai import OpenAIEmbeddings
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
-import pandas as pd
-from langchain_community.vectorstores import FAISS
+from utils import deadline
+from utils import resources
+from utils.resources import PromptSpec, lazy_chain
+from pipeline import speculative
+from pipeline.speculative import speculative_cache
 from faker import Faker
 
 # --- 초기 설정 ---
@@ -33,9 +32,13 @@ RAG_DATA_PATH = "./boardgame_detaildata_1-101.json"
 
 def setup_rag_retriever():
     """
-    서버 시작 시 RAG 검색기(Retriever)를 설정하는 함수입니다.
+    RAG 검색기(Retriever)를 설정하는 함수입니다. (첫 요청 또는 warm-up 시 1회 실행)
     """
     try:
+        import pandas as pd
+        from langchain_openai import OpenAIEmbeddings
+        from langchain_community.vectorstores import FAISS
+
         embeddings = OpenAIEmbeddings()
         if os.path.exists(FAISS_INDEX_PATH):
             print(f"'{FAISS_INDEX_PATH}'에서 기존 FAISS 인덱스를 로드합니다.")
@@ -73,11 +76,10 @@ def setup_rag_retriever():
         print(f"Warning: RAG 설정 중 오류 발생. RAG 기능이 비활성화됩니다. 오류: {e}")
         return None
 
-retriever = setup_rag_retriever()
+retriever = resources.register("concept.retriever", setup_rag_retriever)
 
-llm = ChatOpenAI(model_name="gpt-4o", temperature=0.8)
 
-generate_concept_prompt = PromptTemplate(
+generate_concept_prompt = PromptSpec(
     input_variables=["theme", "playerCount", "averageWeight", "retrieved_games"],
     template=(
         "# Mission: 당신은 보드게임 업계의 전설적인 크리에이티브 디렉터, '컨셉 아키텍트'입니다. 당신의 임무는 플레이어의 마음에 각인될 독창적인 세계관과 경험을 설계하는 것입니다.\n\n"
@@ -107,9 +109,9 @@ generate_concept_prompt = PromptTemplate(
         "```"
     )
 )
-concept_generation_chain = LLMChain(llm=llm, prompt=generate_concept_prompt)
+concept_generation_chain = lazy_chain("concept.concept_generation", generate_concept_prompt, model_name="gpt-4o", temperature=0.8)
 
-regenerate_concept_prompt = PromptTemplate(
+regenerate_concept_prompt = PromptSpec(
     input_variables=["original_concept_json", "feedback"],
     template=(
         "# Mission: 당신은 침체된 게임 컨셉에 새로운 활력을 불어넣는 '컨셉 닥터'입니다. 날카로운 분석력으로 기존 컨셉의 장단점을 파악하고, 사용자의 피드백을 창의적으로 재해석하여 컨셉을 다음 단계로 진화시키세요.\n\n"
@@ -138,7 +140,7 @@ regenerate_concept_prompt = PromptTemplate(
         "```"
     )
 )
-regenerate_concept_chain = LLMChain(llm=llm, prompt=regenerate_concept_prompt)
+regenerate_concept_chain = lazy_chain("concept.regenerate_concept", regenerate_concept_prompt, model_name="gpt-4o", temperature=0.8)
 
 class GenerateConceptRequest(BaseModel):
     projectId: int = Field(..., example=1)
@@ -188,12 +190,13 @@ def _parse_concept_from_llm(response_text: str) -> Dict[str, Any]:
         raise ValueError("LLM 응답에서 유효한 JSON을 찾을 수 없습니다.")
 
 @router.post("/generate-concept", response_model=ConceptResponse, summary="새로운 보드게임 컨셉 생성")
-async def generate_concept_api(request: GenerateConceptRequest):
+def generate_concept_api(request: GenerateConceptRequest, http_request: Request = None):
     retrieved_games_info = "유사 게임 정보를 찾을 수 없음."
-    if retriever:
+    rag_retriever = retriever.get()
+    if rag_retriever:
         try:
             search_query = f"테마: {request.theme}, 플레이 인원: {request.playerCount}, 난이도: {request.averageWeight}"
-            docs = retriever.invoke(search_query)
+            docs = rag_retriever.invoke(search_query)
             if docs:
                 retrieved_games_info = "\n\n".join([doc.page_content for doc in docs])
         except Exception as e:
@@ -206,7 +209,7 @@ async def generate_concept_api(request: GenerateConceptRequest):
             "averageWeight": request.averageWeight,
             "retrieved_games": retrieved_games_info
         }
-        response = concept_generation_chain.invoke(llm_input)
+        response = deadline.invoke_chain(concept_generation_chain, llm_input)
         concept_data = _parse_concept_from_llm(response['text'])
 
         concept_data["conceptId"] = np.random.randint(1000, 9999)
@@ -214,15 +217,22 @@ async def generate_concept_api(request: GenerateConceptRequest):
         concept_data["projectId"] = request.projectId
         concept_data["createdAt"] = datetime.datetime.now().isoformat(timespec='seconds')
         
+        if speculative.requested(http_request):
+            speculative.speculate_goal(ConceptResponse.model_validate(concept_data).model_dump())
         return concept_data
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"컨셉 생성 중 서버 오류: {e}")
         raise HTTPException(status_code=500, detail=f"LLM 체인 실행 중 오류 발생: {str(e)}")
 
 @router.post("/regenerate-concept", response_model=ConceptResponse, summary="기존 보드게임 컨셉 재생성")
-async def regenerate_concept_api(request: RegenerateConceptRequest):
+def regenerate_concept_api(request: RegenerateConceptRequest, http_request: Request = None):
+    # 다음 단계 대신 컨셉을 고치는 중이므로 기존 컨셉 기준 추측 작업은 버린다
+    speculative_cache.cancel_lineage(request.originalConcept.projectId,
+                                     speculative.concept_frame(request.originalConcept))
     try:
         original_concept_json_str = request.originalConcept.model_dump_json(indent=2)
         
@@ -230,7 +240,7 @@ async def regenerate_concept_api(request: RegenerateConceptRequest):
             "original_concept_json": original_concept_json_str,
             "feedback": request.feedback,
         }
-        response = regenerate_concept_chain.invoke(llm_input)
+        response = deadline.invoke_chain(regenerate_concept_chain, llm_input)
         concept_data = _parse_concept_from_llm(response['text'])
 
         concept_data["planId"] = request.originalConcept.planId
@@ -238,9 +248,13 @@ async def regenerate_concept_api(request: RegenerateConceptRequest):
         concept_data["projectId"] = request.originalConcept.projectId
         concept_data["createdAt"] = datetime.datetime.now().isoformat(timespec='seconds')
         
+        if speculative.requested(http_request):
+            speculative.speculate_goal(ConceptResponse.model_validate(concept_data).model_dump())
         return concept_data
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"컨셉 재생성 중 서버 오류: {e}")
         raise HTTPException(status_code=500, detail=f"LLM 체인 실행 중 오류 발생: {str(e)}")
\ No newline at end of file
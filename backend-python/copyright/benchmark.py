@@ -0,0 +1,347 @@
+"""
+저작권 검색 엔진 벤치마크 (recall@k / 지연시간 / 처리량 / 메모리)
+
+위험도를 결정하는 검색 엔진을 바꾸기 전에 숫자를 보기 위한 도구. 저장된 인덱스(copyright/cache/<model>) 위에서
+엔진별로 같은 쿼리를 돌려 float32 정확 코사인 top-k(삭제 행 제외)와 비교한다.
+
+엔진
+- float32 / float16 / int8 / ivf : 임베딩 검색 (샤드마다 변형 파일이 있을 때만, 인덱서 --quantize / --ivf)
+                                   --nprobe에 여러 값을 주면 ivf는 ivf(nprobe=N) 행으로 나눠 스윕한다
+- lexical                        : 폴백 TF-IDF (lexical.LexicalIndex)
+- simple                         : 최후 폴백 difflib + 자카드 (느리므로 --simple-queries개만)
+
+쿼리 세트
+- heldout    : 인덱스의 BGG 후보 텍스트를 그대로 쿼리로 쓰고 결과와 정답에서 자기 자신을 뺀다 (leave-one-out)
+- paraphrase : 후보 텍스트의 단어 일부를 지우고 이웃 단어 순서를 바꾼 변형
+- synthetic  : 키워드 사전(keywords.py)으로 만든 기획안 형태(테마 / 메커닉 / 설명) 텍스트
+
+지연시간은 쿼리 1건 검색(임베딩 엔진은 쿼리 인코딩 제외, 인코딩은 queryEncode로 따로), 처리량은 search_batch 기준.
+메모리는 엔진이 검색에 읽는 행렬 크기(희소 행렬은 data + indices + indptr)다.
+
+사용법:
+    python -m copyright.benchmark --models mini12 --queries 200 --k 3 --output bench.json --markdown bench.md
+    python -m copyright.benchmark --models mini,mini12 --engines float32,int8,lexical --backend onnx
+    python -m copyright.benchmark --models mini12 --engines float32,ivf --nprobe 4,8,16,32   # IVF nprobe 스윕
+"""
+import json
+import time
+import argparse
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .keywords import GAMEPLAY_KEYWORDS, MECHANIC_CATEGORIES, THEME_KEYWORDS
+from .search import DEFAULT_NPROBE, DEFAULT_RESCORE_K, EMBEDDINGS_FILE, ENGINES, load_engine, top_k, top_k_rows
+from .shards import FlatIndex, ShardedIndex, ShardedSearch, load_manifest
+
+QUERY_SETS = ("heldout", "paraphrase", "synthetic")
+TEXT_ENGINES = ("lexical", "simple")
+DEFAULT_ENGINES = tuple(ENGINES) + TEXT_ENGINES
+
+SYNTHETIC_TEMPLATES = [
+    "A {theme} board game where players {verb} to earn {goal}.",
+    "Players take turns to {verb} in a {theme} world, racing for {goal}.",
+    "In this {theme} game each player tries to {verb} while watching the opponent, aiming for {goal}.",
+]
+SYNTHETIC_VERBS = ["build an engine", "explore new lands", "trade resources", "fight monsters",
+                   "control territory", "draft cards", "roll dice and move", "cooperate against the game"]
+
+
+# ---------- 인덱스 ----------
+
+def open_index(cache_dir: Path):
+    """분석기와 같은 방식으로 인덱스를 연다 (매니페스트 → 샤드 인덱스, 없으면 이전 단일 디렉터리 형식)."""
+    manifest = load_manifest(cache_dir)
+    if manifest is not None:
+        return ShardedIndex(cache_dir, manifest)
+    from .columnar import ColumnarStore
+    embeddings = np.load(cache_dir / EMBEDDINGS_FILE, mmap_mode="r")
+    store = ColumnarStore(cache_dir / "store")
+    return FlatIndex(None, load_engine(cache_dir, embeddings, "float32"), store.rows(),
+                     store.text_column("candidate_text"), embeddings)
+
+
+def _live_mask(index) -> np.ndarray:
+    mask = np.ones(len(index.candidate_texts), dtype=bool)
+    if isinstance(index, ShardedIndex):
+        for n, dead in enumerate(index.engine.dead):
+            mask[dead + index.offsets[n]] = False
+    return mask
+
+
+def _all_embeddings(index) -> np.ndarray:
+    if isinstance(index, ShardedIndex):
+        return np.concatenate([np.asarray(s.embeddings, dtype=np.float32) for s in index.shards])
+    return np.asarray(index.embeddings, dtype=np.float32)
+
+
+def _array_bytes(engine) -> int:
+    # 양자화 엔진은 양자화 행렬만 훑고(재채점은 후보 행만 읽음), 그 외는 float32 임베딩 + IVF 보조 배열
+    if hasattr(engine, "matrix"):
+        arrays = [engine.matrix, engine.scale]
+    else:
+        arrays = [engine.embeddings] + [getattr(engine, name, None) for name in ("centroids", "order", "offsets")]
+    return sum(int(a.nbytes) for a in arrays if a is not None)
+
+
+def vector_engine(index, cache_dir: Path, variant: str, rescore_k: int, nprobe: int):
+    """(엔진, 메모리 바이트). 변형 파일이 없는 샤드가 있으면 (None, 0)."""
+    if isinstance(index, ShardedIndex):
+        engines = [load_engine(s.directory, s.embeddings, variant, rescore_k=rescore_k, nprobe=nprobe)
+                   for s in index.shards]
+        if any(e.name != variant for e in engines):
+            return None, 0
+        wrapped = ShardedSearch([SimpleNamespace(engine=e) for e in engines], index.offsets, index.engine.dead)
+        return wrapped, sum(_array_bytes(e) for e in engines)
+    engine = load_engine(cache_dir, index.embeddings, variant, rescore_k=rescore_k, nprobe=nprobe)
+    return (engine, _array_bytes(engine)) if engine.name == variant else (None, 0)
+
+
+class TextEngine:
+    """텍스트 쿼리 폴백 엔진을 벡터 엔진과 같은 search / search_batch 형태로 (삭제 행은 점수 -inf)."""
+
+    def __init__(self, name: str, candidate_texts: Sequence[str], live: np.ndarray):
+        self.name = name
+        self.live = live
+        self.texts = list(candidate_texts)
+        self.lexical = None
+        if name == "lexical":
+            from .lexical import LexicalIndex
+            self.lexical = LexicalIndex(self.texts)
+
+    def memory_bytes(self) -> int:
+        if self.lexical is None:
+            return 0
+        matrices = (self.lexical.char_index, self.lexical.word_index)
+        return sum(int(m.data.nbytes + m.indices.nbytes + m.indptr.nbytes) for m in matrices)
+
+    def _score_matrix(self, texts: List[str]) -> np.ndarray:
+        if self.lexical is not None:
+            scores = self.lexical.score_matrix(texts)
+        else:
+            from .simple_similarity import compute_similarity_simple
+            scores = np.array([compute_similarity_simple(t, self.texts) for t in texts], dtype=np.float32)
+        scores[:, ~self.live] = -np.inf
+        return scores
+
+    def search(self, text: str, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        scores = self._score_matrix([text])[0]
+        idx = top_k(scores, k)
+        return idx, scores[idx]
+
+    def search_batch(self, texts: List[str], k: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        idx, scores = top_k_rows(self._score_matrix(texts), k)
+        return list(zip(idx, scores))
+
+
+# ---------- 쿼리 세트 ----------
+
+def _paraphrase(text: str, rng: np.random.Generator) -> str:
+    words = text.split()
+    words = [w for w in words if rng.random() > 0.25] or words
+    for i in range(0, len(words) - 1, 5):
+        if rng.random() < 0.5:
+            words[i], words[i + 1] = words[i + 1], words[i]
+    return " ".join(words)
+
+
+def _synthetic_plan(rng: np.random.Generator) -> str:
+    """analyzer._create_input_text와 같은 형식(테마 / 메커닉 / 설명)의 가상 기획안."""
+    groups = rng.choice(list(THEME_KEYWORDS), size=2, replace=False)
+    theme_words = [str(rng.choice(THEME_KEYWORDS[g])) for g in groups]
+    mechanic_words = rng.choice(sorted({w for ws in MECHANIC_CATEGORIES.values() for w in ws}), size=3, replace=False)
+    goal = str(rng.choice(GAMEPLAY_KEYWORDS["승리 조건"]))
+    description = str(rng.choice(SYNTHETIC_TEMPLATES)).format(
+        theme=" ".join(theme_words), verb=rng.choice(SYNTHETIC_VERBS), goal=goal)
+    mechanics = ", ".join(f"{w.title()} Mechanic" for w in mechanic_words)
+    return f"{', '.join(w.title() for w in theme_words)}\n{mechanics}\n{description}"
+
+
+def make_query_set(kind: str, index, live: np.ndarray, count: int, seed: int) -> Tuple[List[str], Optional[np.ndarray]]:
+    """(쿼리 텍스트, 결과에서 뺄 원본 행 또는 None)."""
+    rng = np.random.default_rng(seed)
+    live_rows = np.flatnonzero(live)
+    if kind == "synthetic":
+        return [_synthetic_plan(rng) for _ in range(count)], None
+    rows = np.sort(rng.choice(live_rows, size=min(count, len(live_rows)), replace=False))
+    texts = [index.candidate_texts[int(i)] for i in rows]
+    if kind == "heldout":
+        return texts, rows
+    if kind == "paraphrase":
+        return [_paraphrase(t, rng) for t in texts], None
+    raise ValueError(f"지원하지 않는 쿼리 세트: {kind} (가능한 값: {QUERY_SETS})")
+
+
+# ---------- 측정 ----------
+
+def _percentiles_ms(values: Sequence[float]) -> dict:
+    return {f"p{q}Ms": round(float(np.percentile(values, q)) * 1000, 3) for q in (50, 95, 99)}
+
+
+def _drop_source(idx: np.ndarray, source: Optional[int], k: int) -> np.ndarray:
+    idx = np.asarray(idx)
+    if source is not None:
+        idx = idx[idx != source]
+    return idx[:k]
+
+
+def exact_truth(embeddings: np.ndarray, live: np.ndarray, queries: np.ndarray, exclude, k: int) -> List[set]:
+    scores = queries @ embeddings.T
+    scores[:, ~live] = -np.inf
+    if exclude is not None:
+        scores[np.arange(len(queries)), exclude] = -np.inf
+    idx, _ = top_k_rows(scores, k)
+    return [set(row.tolist()) for row in idx]
+
+
+def measure_engine(engine, queries, truth: List[set], exclude, k: int) -> dict:
+    """queries는 임베딩 엔진이면 (Q, D) 벡터, 텍스트 엔진이면 텍스트 리스트."""
+    fetch = k + (1 if exclude is not None else 0)
+    hits, latencies = 0, []
+    for i, query in enumerate(queries):
+        started = time.perf_counter()
+        idx, _ = engine.search(query, fetch)
+        latencies.append(time.perf_counter() - started)
+        source = int(exclude[i]) if exclude is not None else None
+        hits += len(truth[i] & set(_drop_source(idx, source, k).tolist()))
+    started = time.perf_counter()
+    engine.search_batch(queries, fetch)
+    batch_seconds = time.perf_counter() - started
+    return {
+        "numQueries": len(queries),
+        f"recall@{k}": round(hits / (k * len(queries)), 4),
+        **_percentiles_ms(latencies),
+        "meanMs": round(float(np.mean(latencies)) * 1000, 3),
+        "batchQps": round(len(queries) / batch_seconds, 1) if batch_seconds > 0 else None,
+    }
+
+
+def _encode(model, texts: List[str]) -> Tuple[np.ndarray, dict]:
+    # 일괄 인코딩이 첫 호출 비용을 치르므로 이후 1건 인코딩만 잰다
+    vectors = np.asarray(model.encode(texts, batch_size=64, normalize_embeddings=True), dtype=np.float32)
+    latencies = []
+    for text in texts[:100]:
+        started = time.perf_counter()
+        model.encode([text], batch_size=1, normalize_embeddings=True)
+        latencies.append(time.perf_counter() - started)
+    return vectors, _percentiles_ms(latencies)
+
+
+def benchmark_model(model_key: str, cache_root: Path, engines: Sequence[str], query_sets: Sequence[str],
+                    num_queries: int, simple_queries: int, k: int, backend: str,
+                    rescore_k: int = DEFAULT_RESCORE_K, nprobes: Sequence[int] = (DEFAULT_NPROBE,),
+                    seed: int = 0) -> dict:
+    from .model_loader import load_model
+
+    cache_dir = cache_root / model_key
+    index = open_index(cache_dir)
+    live = _live_mask(index)
+    embeddings = _all_embeddings(index)
+    model = load_model(model_key, backend)
+
+    built: Dict[str, Tuple[object, int, float]] = {}
+    for name in engines:
+        if name in TEXT_ENGINES:
+            started = time.perf_counter()
+            engine = TextEngine(name, index.candidate_texts, live)
+            built[name] = (engine, engine.memory_bytes(), time.perf_counter() - started)
+            continue
+        for nprobe in (nprobes if name == "ivf" else nprobes[:1]):
+            started = time.perf_counter()
+            engine, memory = vector_engine(index, cache_dir, name, rescore_k, nprobe)
+            if engine is None:
+                print(f"[{model_key}] '{name}' 변형 파일이 없어 건너뜀 (python -m copyright.indexer --quantize / --ivf)")
+                break
+            label = f"ivf(nprobe={nprobe})" if name == "ivf" and len(nprobes) > 1 else name
+            built[label] = (engine, memory, time.perf_counter() - started)
+
+    report = {"modelKey": model_key, "index": index.info(), "numLiveRows": int(live.sum()),
+              "backend": getattr(model, "variant", "torch"), "engines": {}, "querySets": {}}
+    for name, (_, memory, build_seconds) in built.items():
+        report["engines"][name] = {"memoryMb": round(memory / 1024 / 1024, 2),
+                                   "buildSeconds": round(build_seconds, 3)}
+
+    for n, kind in enumerate(query_sets):
+        texts, exclude = make_query_set(kind, index, live, num_queries, seed + n)
+        vectors, encode_latency = _encode(model, texts)
+        truth = exact_truth(embeddings, live, vectors, exclude, k)
+        entry = {"numQueries": len(texts), "queryEncode": encode_latency, "engines": {}}
+        for name, (engine, _, _) in built.items():
+            if isinstance(engine, TextEngine):
+                limit = simple_queries if name == "simple" else len(texts)
+                sub_exclude = exclude[:limit] if exclude is not None else None
+                entry["engines"][name] = measure_engine(engine, texts[:limit], truth[:limit], sub_exclude, k)
+            else:
+                entry["engines"][name] = measure_engine(engine, vectors, truth, exclude, k)
+            print(f"[{model_key}/{kind}] {name}: recall@{k}={entry['engines'][name][f'recall@{k}']} "
+                  f"p50={entry['engines'][name]['p50Ms']}ms")
+        report["querySets"][kind] = entry
+    return report
+
+
+def to_markdown(report: dict) -> str:
+    k = report["k"]
+    lines = [f"# 저작권 검색 엔진 벤치마크 ({report['createdAt']})", "",
+             f"recall@{k}은 float32 정확 코사인 top-{k} 대비. 지연시간은 쿼리 1건 검색(인코딩 제외), QPS는 일괄 검색 기준.", ""]
+    for model_key, model in report["models"].items():
+        lines += [f"## {model_key} ({model['backend']}, 인덱스 {model['index'].get('version') or '단일 디렉터리'}, "
+                  f"{model['numLiveRows']}행)", "",
+                  f"| 쿼리 세트 | 엔진 | recall@{k} | p50 ms | p95 ms | p99 ms | QPS | 메모리 MB |",
+                  "|---|---|---:|---:|---:|---:|---:|---:|"]
+        for kind, entry in model["querySets"].items():
+            for name, m in entry["engines"].items():
+                lines.append(f"| {kind} | {name} | {m[f'recall@{k}']:.4f} | {m['p50Ms']} | {m['p95Ms']} | {m['p99Ms']} "
+                             f"| {m['batchQps']} | {model['engines'][name]['memoryMb']} |")
+        encode = {kind: entry["queryEncode"]["p50Ms"] for kind, entry in model["querySets"].items()}
+        lines += ["", f"쿼리 인코딩 p50 (ms): {json.dumps(encode, ensure_ascii=False)}", ""]
+    return "\n".join(lines)
+
+
+def _split(value: str) -> List[str]:
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def main():
+    from .model_loader import ENCODER_BACKEND
+
+    parser = argparse.ArgumentParser(description="저작권 검색 엔진 recall / 지연시간 / 처리량 / 메모리 벤치마크")
+    parser.add_argument("--models", default="mini12", help="쉼표로 구분한 모델 키 (인덱스가 있어야 함)")
+    parser.add_argument("--cache-root", default=str(Path(__file__).resolve().parent / "cache"))
+    parser.add_argument("--engines", default=",".join(DEFAULT_ENGINES), help="float32,float16,int8,ivf,lexical,simple 중 선택")
+    parser.add_argument("--query-sets", default=",".join(QUERY_SETS), help="heldout,paraphrase,synthetic 중 선택")
+    parser.add_argument("--queries", type=int, default=200, help="쿼리 세트별 쿼리 수")
+    parser.add_argument("--simple-queries", type=int, default=10, help="simple 엔진에 쓸 쿼리 수 (쿼리당 수 초)")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--rescore-k", type=int, default=DEFAULT_RESCORE_K)
+    parser.add_argument("--nprobe", default=str(DEFAULT_NPROBE), help="IVF 탐색 리스트 수 (쉼표로 여러 값이면 스윕)")
+    parser.add_argument("--backend", default=ENCODER_BACKEND, help="쿼리 인코더 백엔드 (torch|onnx|onnx-fp32)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON 저장 경로 (없으면 표준출력)")
+    parser.add_argument("--markdown", help="Markdown 표 저장 경로")
+    args = parser.parse_args()
+
+    engines = _split(args.engines)
+    unknown = set(engines) - set(DEFAULT_ENGINES)
+    if unknown:
+        parser.error(f"지원하지 않는 엔진: {sorted(unknown)}")
+    report = {"createdAt": time.strftime("%Y-%m-%dT%H:%M:%S"), "k": args.k, "models": {}}
+    for model_key in _split(args.models):
+        report["models"][model_key] = benchmark_model(
+            model_key, Path(args.cache_root), engines, _split(args.query_sets), args.queries, args.simple_queries,
+            args.k, args.backend, args.rescore_k, [int(v) for v in _split(args.nprobe)], args.seed)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    if args.markdown:
+        with open(args.markdown, "w", encoding="utf-8") as f:
+            f.write(to_markdown(report))
+
+
+if __name__ == "__main__":
+    main()
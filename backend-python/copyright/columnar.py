@@ -0,0 +1,285 @@
+"""
+저작권 검사용 후보 데이터 컬럼 저장소 (candidates.json / meta.json 대체)
+
+JSON은 워커마다 전체를 파이썬 리스트/딕셔너리로 파싱해야 하지만, 실제로 상세 정보가 필요한 것은 상위 몇 건뿐이다.
+컬럼별로 바이너리 파일을 만들고 런타임에서는 mmap으로 열어 필요한 행만 그때그때 디코딩한다.
+(페이지 캐시를 통해 여러 워커/프로세스가 같은 물리 메모리를 공유)
+
+파일 구성 (store/ 디렉터리):
+- store.json                       : 행 수와 컬럼 목록
+- <text>.offsets.npy / <text>.blob : 텍스트 컬럼 (int64 오프셋 N+1개 + UTF-8 바이트)
+- <int>.npy                        : 정수 컬럼 (결측은 -1)
+- <list>.ids.npy / <list>.offsets.npy / <list>.vocab.json
+                                   : "['A', 'B']" 형태 리스트 문자열 컬럼 (어휘 id로 압축)
+- <list>.fallback.npy + <list>.raw.*: 리스트로 정확히 복원되지 않는 값은 원문 그대로 보관
+"""
+import ast
+import json
+import mmap
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+STORE_FORMAT = "columnar-v1"
+MANIFEST_FILE = "store.json"
+
+# 저작권 후보 저장소 스키마
+TEXT_COLUMNS = ("title", "Description", "candidate_text")
+LIST_COLUMNS = ("category", "mechanic")
+INT_COLUMNS = ("game_id",)
+
+
+def _parse_list(value: Any) -> Optional[List[str]]:
+    """"['A', 'B']" 문자열을 리스트로. str(리스트)로 원문이 그대로 복원될 때만 성공으로 본다."""
+    if not isinstance(value, str) or not value.startswith("["):
+        return None
+    try:
+        parsed = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return None
+    if not isinstance(parsed, list) or not all(isinstance(v, str) for v in parsed):
+        return None
+    return parsed if str(parsed) == value else None
+
+
+def _to_text(value: Any) -> str:
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ""
+    return str(value)
+
+
+def _to_int(value: Any) -> int:
+    try:
+        if value is None or (isinstance(value, float) and np.isnan(value)):
+            return -1
+        return int(value)
+    except (TypeError, ValueError):
+        return -1
+
+
+class _TextColumnWriter:
+    def __init__(self, directory: Path, name: str):
+        self.directory = directory
+        self.name = name
+        self.blob = open(directory / f"{name}.blob", "wb")
+        self.offsets = [0]
+
+    def append(self, text: str):
+        encoded = text.encode("utf-8")
+        self.blob.write(encoded)
+        self.offsets.append(self.offsets[-1] + len(encoded))
+
+    def close(self):
+        self.blob.close()
+        np.save(self.directory / f"{self.name}.offsets.npy", np.asarray(self.offsets, dtype=np.int64))
+
+
+class _ListColumnWriter:
+    def __init__(self, directory: Path, name: str):
+        self.directory = directory
+        self.name = name
+        self.vocab: Dict[str, int] = {}
+        self.ids: List[int] = []
+        self.offsets = [0]
+        self.fallback: List[bool] = []
+        self.raw = _TextColumnWriter(directory, f"{name}.raw")
+
+    def append(self, value: Any):
+        items = _parse_list(value)
+        if items is None:
+            # 원문 보관 (ids는 비워둠)
+            self.fallback.append(True)
+            self.raw.append(_to_text(value))
+            self.offsets.append(self.offsets[-1])
+            return
+        self.fallback.append(False)
+        self.raw.append("")
+        for item in items:
+            self.ids.append(self.vocab.setdefault(item, len(self.vocab)))
+        self.offsets.append(len(self.ids))
+
+    def close(self):
+        self.raw.close()
+        id_dtype = np.uint16 if len(self.vocab) <= np.iinfo(np.uint16).max else np.uint32
+        np.save(self.directory / f"{self.name}.ids.npy", np.asarray(self.ids, dtype=id_dtype))
+        np.save(self.directory / f"{self.name}.offsets.npy", np.asarray(self.offsets, dtype=np.int64))
+        np.save(self.directory / f"{self.name}.fallback.npy", np.asarray(self.fallback, dtype=bool))
+        with open(self.directory / f"{self.name}.vocab.json", "w", encoding="utf-8") as f:
+            json.dump(sorted(self.vocab, key=self.vocab.get), f, ensure_ascii=False)
+
+
+class ColumnarWriter:
+    """행을 순서대로 받아 컬럼 파일로 기록한다. 텍스트는 바로 파일로 흘려보내므로 메모리를 거의 쓰지 않는다."""
+
+    def __init__(self, directory, text_columns: Sequence[str] = TEXT_COLUMNS,
+                 list_columns: Sequence[str] = LIST_COLUMNS, int_columns: Sequence[str] = INT_COLUMNS):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.text = {name: _TextColumnWriter(self.directory, name) for name in text_columns}
+        self.lists = {name: _ListColumnWriter(self.directory, name) for name in list_columns}
+        self.ints: Dict[str, List[int]] = {name: [] for name in int_columns}
+        self.num_rows = 0
+
+    def append(self, row: Dict[str, Any]):
+        for name, writer in self.text.items():
+            writer.append(_to_text(row.get(name)))
+        for name, writer in self.lists.items():
+            writer.append(row.get(name))
+        for name, values in self.ints.items():
+            values.append(_to_int(row.get(name)))
+        self.num_rows += 1
+
+    def extend(self, rows: Iterable[Dict[str, Any]]):
+        for row in rows:
+            self.append(row)
+
+    def close(self):
+        for writer in list(self.text.values()) + list(self.lists.values()):
+            writer.close()
+        for name, values in self.ints.items():
+            np.save(self.directory / f"{name}.npy", np.asarray(values, dtype=np.int64))
+        with open(self.directory / MANIFEST_FILE, "w", encoding="utf-8") as f:
+            json.dump({
+                "format": STORE_FORMAT,
+                "num_rows": self.num_rows,
+                "text_columns": list(self.text),
+                "list_columns": list(self.lists),
+                "int_columns": list(self.ints),
+            }, f, ensure_ascii=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+
+class TextColumn(Sequence):
+    """mmap 위의 텍스트 컬럼. 인덱싱할 때만 해당 행을 디코딩한다."""
+
+    def __init__(self, directory: Path, name: str):
+        self.offsets = np.load(directory / f"{name}.offsets.npy", mmap_mode="r")
+        path = directory / f"{name}.blob"
+        self._file = open(path, "rb")
+        # 빈 파일은 mmap 할 수 없다
+        self._blob = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if path.stat().st_size else b""
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        return self._blob[start:end].decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+class ListColumn:
+    """어휘 id로 압축된 리스트 문자열 컬럼."""
+
+    def __init__(self, directory: Path, name: str):
+        self.ids = np.load(directory / f"{name}.ids.npy", mmap_mode="r")
+        self.offsets = np.load(directory / f"{name}.offsets.npy", mmap_mode="r")
+        self.fallback = np.load(directory / f"{name}.fallback.npy", mmap_mode="r")
+        self.raw = TextColumn(directory, f"{name}.raw")
+        with open(directory / f"{name}.vocab.json", "r", encoding="utf-8") as f:
+            self.vocab: List[str] = json.load(f)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def items(self, i: int) -> Optional[List[str]]:
+        if self.fallback[i]:
+            return None
+        return [self.vocab[t] for t in self.ids[int(self.offsets[i]):int(self.offsets[i + 1])]]
+
+    def __getitem__(self, i: int) -> str:
+        """원래 CSV 값과 같은 문자열로 복원한다."""
+        items = self.items(i)
+        return self.raw[i] if items is None else str(items)
+
+
+class RowView(Sequence):
+    """meta.json 리스트 자리에 쓰는 지연 디코딩 뷰. store.rows()[i] → 딕셔너리."""
+
+    def __init__(self, store: "ColumnarStore"):
+        self.store = store
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return self.store.row(int(i))
+
+
+class ColumnarStore:
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        with open(self.directory / MANIFEST_FILE, "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format") != STORE_FORMAT:
+            raise ValueError(f"지원하지 않는 저장소 형식: {self.manifest.get('format')}")
+        self.text = {name: TextColumn(self.directory, name) for name in self.manifest["text_columns"]}
+        self.lists = {name: ListColumn(self.directory, name) for name in self.manifest["list_columns"]}
+        self.ints = {name: np.load(self.directory / f"{name}.npy", mmap_mode="r") for name in self.manifest["int_columns"]}
+
+    @staticmethod
+    def exists(directory) -> bool:
+        return (Path(directory) / MANIFEST_FILE).exists()
+
+    def __len__(self) -> int:
+        return int(self.manifest["num_rows"])
+
+    def text_column(self, name: str) -> TextColumn:
+        return self.text[name]
+
+    def row(self, i: int) -> Dict[str, Any]:
+        # 음수 인덱스는 여기서 한 번만 정규화한다 (리스트 컬럼 offsets[i + 1]이 음수에서 어긋난다)
+        n = len(self)
+        if not -n <= i < n:
+            raise IndexError(f"행 번호 범위 밖: {i}")
+        i %= n
+        row: Dict[str, Any] = {name: column[i] for name, column in self.text.items()}
+        row.update({name: column[i] for name, column in self.lists.items()})
+        for name, values in self.ints.items():
+            value = int(values[i])
+            row[name] = value if value >= 0 else None
+        return row
+
+    def rows(self) -> RowView:
+        return RowView(self)
+
+
+def write_copyright_store(directory, meta: Iterable[Dict[str, Any]], candidate_texts: Iterable[str]) -> int:
+    """meta 행(title/game_id/category/mechanic/Description)과 후보 텍스트로 저장소를 만든다."""
+    with ColumnarWriter(directory) as writer:
+        for row, text in zip(meta, candidate_texts):
+            writer.append({**row, "candidate_text": text})
+    return writer.num_rows
+
+
+if __name__ == "__main__":
+    # 기존 candidates.json / meta.json 캐시를 재인코딩 없이 컬럼 저장소로 변환
+    import argparse
+
+    parser = argparse.ArgumentParser(description="candidates.json / meta.json → 컬럼 저장소 변환")
+    parser.add_argument("cache_dir", help="예: copyright/cache/mini12")
+    args = parser.parse_args()
+
+    cache_dir = Path(args.cache_dir)
+    with open(cache_dir / "candidates.json", "r", encoding="utf-8") as f:
+        candidates = json.load(f)
+    with open(cache_dir / "meta.json", "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    count = write_copyright_store(cache_dir / "store", meta, candidates)
+    print(f"컬럼 저장소 생성 완료: {cache_dir / 'store'} ({count}행)")
@@ -1,66 +1,181 @@
 import os
 import json
+import hashlib
+import asyncio
 import time
+import threading
 import numpy as np
 import pandas as pd
-from typing import List
+from typing import List, Optional, Tuple
 from pathlib import Path
 from .schemas import TranslatedGameData, SimilarGame, PlanCopyrightCheckResponse, RiskLevel
 
-# 임베딩이 없는 경우 폴백으로 사용할 간단 유사도
+# 임베딩이 없는 경우 폴백으로 사용할 어휘 유사도 (TF-IDF 인덱스를 만들 수 없으면 간단 유사도)
 from .simple_similarity import compute_similarity_simple
+from .columnar import ColumnarStore
+from .search import load_engine, top_k
+from .shards import FlatIndex, ShardedIndex, load_manifest, read_current
+from .encoder import MicroBatchEncoder
+from .embedding_cache import EmbeddingCache
+from .rescreen import PLAN_STORE_ENABLED, RESCREEN_ON_SWAP, PlanVectorStore, plan_record, rescreen
+from .keywords import LEXICON_FINGERPRINT, Masks, candidate_masks, overlapping_elements, query_masks
 
 # 선택한 모델키(인덱서와 동일 키여야 함). 환경변수로도 오버라이드 가능.
 DEFAULT_MODEL_KEY = os.getenv("COPYRIGHT_MODEL_KEY", "mini12")
+# 일괄 검사 시 SentenceTransformer encode 배치 크기
+ENCODE_BATCH_SIZE = int(os.getenv("COPYRIGHT_ENCODE_BATCH_SIZE", "64"))
+# 새 인덱스 버전(CURRENT) 확인 주기(초)
+INDEX_POLL_SECONDS = float(os.getenv("COPYRIGHT_INDEX_POLL_SECONDS", "10"))
+# 최고 유사도(0~1) 이상이면 해당 위험도 (높은 것부터)
+RISK_THRESHOLDS = ((0.8, RiskLevel.HIGH_RISK), (0.6, RiskLevel.CAUTION), (0.4, RiskLevel.LOW_RISK))
+# 이 점수 이하인 후보는 유사 게임 목록에서 뺀다
+MIN_SIMILAR_SCORE = 0.10
+TOP_K = 3
+# 판정 규칙(임계값 / 후보 수 / 키워드 사전) 지문: 바뀌면 판정 결과 캐시가 자동으로 무효화된다
+VERDICT_RULES_FINGERPRINT = hashlib.sha256(json.dumps(
+    [[[t, r.value] for t, r in RISK_THRESHOLDS], MIN_SIMILAR_SCORE, TOP_K, LEXICON_FINGERPRINT]
+).encode("utf-8")).hexdigest()[:16]
+
+def determine_risk_level(max_score: float) -> RiskLevel:
+    for threshold, risk in RISK_THRESHOLDS:
+        if max_score >= threshold:
+            return risk
+    return RiskLevel.NO_RISK
+
 
 class CopyrightAnalyzer:
-    def __init__(self, model_key: str = DEFAULT_MODEL_KEY):
+    def __init__(self, model_key: str = DEFAULT_MODEL_KEY, record_plans: bool = PLAN_STORE_ENABLED):
         self.model_key = model_key
         self.use_transformer = True
         self.model = None
+        self.encoder = None
+        self.lexical = None
+        self.index = None
+        self._last_index_check = time.monotonic()
+        self._reload_lock = threading.Lock()
 
         # 캐시/리소스 로드
         self.cache_dir = Path(__file__).resolve().parent / "cache" / self.model_key
         self._load_cached_index()     # 임베딩/메타/후보텍스트
         self._load_model_for_query()  # 입력 1건 인코딩용(가벼움)
+        if not self.use_transformer:
+            self._build_lexical_index()
+        # 검사한 기획안 벡터 (인덱스가 커지면 추가된 행과만 다시 채점, rescreen.py)
+        self.plans = PlanVectorStore(self.model_key) if record_plans and self.use_transformer else None
 
     # ---------- 캐시/모델 로딩 ----------
-    def _load_cached_index(self):
-        """오프라인 생성된 임베딩과 메타 정보를 로드."""
-        try:
-            emb_path = self.cache_dir / "embeddings.npy"
-            cand_path = self.cache_dir / "candidates.json"
-            meta_path = self.cache_dir / "meta.json"
+    def _open_index(self):
+        """CURRENT 매니페스트가 있으면 샤드 인덱스, 없으면 이전 형식(단일 디렉터리) 캐시를 연다."""
+        manifest = load_manifest(self.cache_dir)
+        if manifest is not None:
+            if manifest["model_key"] != self.model_key:
+                raise ValueError(f"매니페스트 모델 키({manifest['model_key']})가 분석기 모델 키({self.model_key})와 다릅니다.")
+            return ShardedIndex(self.cache_dir, manifest)
 
-            if not emb_path.exists() or not cand_path.exists() or not meta_path.exists():
-                raise FileNotFoundError(
-                    f"임베딩 캐시가 없습니다. 먼저 인덱스를 생성하세요: python -m copyright.indexer --model {self.model_key}"
-                )
+        emb_path = self.cache_dir / "embeddings.npy"
+        store_dir = self.cache_dir / "store"
+        cand_path = self.cache_dir / "candidates.json"
+        meta_path = self.cache_dir / "meta.json"
 
-            # (N, D) normalized float32
-            self.embeddings = np.load(emb_path)  # 이미 정규화되어 있음
+        if ColumnarStore.exists(store_dir) and emb_path.exists():
+            # (N, D) normalized float32, 컬럼 저장소와 함께 mmap (프로세스 간 페이지 공유)
+            embeddings = np.load(emb_path, mmap_mode="r")
+            store = ColumnarStore(store_dir)
+            candidate_texts = store.text_column("candidate_text")
+            meta = store.rows()
+        elif emb_path.exists() and cand_path.exists() and meta_path.exists():
+            # 이전 형식 캐시 (python -m copyright.columnar <cache_dir> 로 변환 가능)
+            embeddings = np.load(emb_path)  # 이미 정규화되어 있음
             with open(cand_path, "r", encoding="utf-8") as f:
-                self.candidate_texts = json.load(f)
+                candidate_texts = json.load(f)
             with open(meta_path, "r", encoding="utf-8") as f:
-                self.meta = json.load(f)
+                meta = json.load(f)
+        else:
+            raise FileNotFoundError(
+                f"임베딩 캐시가 없습니다. 먼저 인덱스를 생성하세요: python -m copyright.indexer --model {self.model_key}"
+            )
+
+        # 안전장치
+        assert embeddings.shape[0] == len(candidate_texts) == len(meta)
+        return FlatIndex(None, load_engine(self.cache_dir, embeddings), meta, candidate_texts, embeddings)
 
-            # 안전장치
-            assert self.embeddings.shape[0] == len(self.candidate_texts) == len(self.meta)
-            print(f"📦 캐시 로드 완료: {self.embeddings.shape[0]}개 항목")
+    def _load_cached_index(self):
+        """오프라인 생성된 임베딩과 메타 정보를 로드."""
+        try:
+            self.index = self._open_index()
+            print(f"🔎 검색 엔진: {self.index.engine.name} (버전: {self.index.version or '단일 디렉터리'})")
+            print(f"📦 캐시 로드 완료: {len(self.index.candidate_texts)}개 항목")
         except Exception as e:
-            # 캐시가 없으면 폴백으로 CSV 로드 + simple 유사도만 사용
+            # 캐시가 없으면 폴백으로 CSV 로드 + 어휘 유사도만 사용
             print(f"임베딩 캐시 로드 실패: {e}\n→ simple 유사도 모드로 동작합니다.")
             self.use_transformer = False
-            self.embeddings = None
-            self.meta = None
             # CSV를 읽어 후보텍스트만 만들어서 simple 비교에 사용
             csv_path = Path(__file__).resolve().parent.parent / "pricing" / "data" / "bgg_data.csv"
             df = pd.read_csv(csv_path, encoding="latin1")
-            self.candidate_texts = [
+            candidate_texts = [
                 f"{str(r.get('category',''))} {str(r.get('mechanic',''))} {str(r.get('Description',''))}"
                 for _, r in df.iterrows()
             ]
-            self.meta = df.to_dict(orient="records")
+            self.index = FlatIndex(None, None, df.to_dict(orient="records"), candidate_texts)
+
+    def current_index(self):
+        """
+        요청 하나가 처음부터 끝까지 같은 버전을 쓰도록 인덱스 객체를 돌려준다.
+        INDEX_POLL_SECONDS마다 CURRENT를 확인해 새 버전이 발행됐으면 새 샤드만 열어 교체한다 (재시작 불필요).
+        """
+        index = self.index
+        now = time.monotonic()
+        if index.engine is None or now - self._last_index_check < INDEX_POLL_SECONDS:
+            return index
+        if not self._reload_lock.acquire(blocking=False):
+            return index  # 다른 스레드가 교체 중이면 기존 버전으로 처리
+        try:
+            self._last_index_check = now
+            name = read_current(self.cache_dir)
+            if name is None or name == index.version:
+                return index
+            manifest = load_manifest(self.cache_dir, name)
+            if manifest["model_key"] != self.model_key:
+                print(f"새 매니페스트({name})의 모델 키가 달라 무시합니다: {manifest['model_key']}")
+                return index
+            self.index = ShardedIndex(self.cache_dir, manifest, index.opened_shards())
+            print(f"♻️ 저작권 인덱스 교체: {index.version} → {name} ({self.index.num_live_rows}개 항목)")
+            if self.plans is not None and RESCREEN_ON_SWAP:
+                threading.Thread(target=self.rescreen_plans, args=(self.index,), daemon=True,
+                                 name=f"copyright-rescreen-{self.model_key}").start()
+            return self.index
+        except Exception as e:
+            print(f"저작권 인덱스 교체 실패, 기존 버전 유지: {e}")
+            return index
+        finally:
+            self._reload_lock.release()
+
+    def verdict_version(self, index=None) -> str:
+        """판정 결과 캐시 키에 넣는 버전: 모델 키 + 인코더 변형 + 인덱스 버전 + 판정 규칙 지문."""
+        index = index or self.index
+        if not self.use_transformer:
+            source = "simple"
+        else:
+            # 이전 형식(단일 디렉터리) 캐시는 매니페스트 버전이 없으므로 행 수로 구분
+            source = index.version or f"flat-{len(index.candidate_texts)}"
+        variant = getattr(self.model, "variant", "torch")
+        return f"{self.model_key}-{variant}:{source}:{VERDICT_RULES_FINGERPRINT}"
+
+    def rescreen_plans(self, index=None, force: bool = False) -> dict:
+        """저장된 기획안을 현재 인덱스의 추가 행과만 다시 채점해 위험도가 바뀐 목록을 반환 (rescreen.py)."""
+        if self.plans is None:
+            raise ValueError("기획안 벡터 저장소가 꺼져 있습니다 (COPYRIGHT_PLAN_STORE_DIR 미설정 / simple 유사도 모드).")
+        index = index or self.current_index()
+        if not isinstance(index, ShardedIndex):
+            raise ValueError("증분 재검사는 샤드 인덱스(매니페스트)에서만 가능합니다.")
+        try:
+            report = rescreen(self.plans, index, self.cache_dir, determine_risk_level, TOP_K, force)
+        except Exception as e:
+            print(f"기획안 재검사 실패 ({index.version}): {e}")
+            raise
+        print(f"🔁 기획안 재검사 완료 ({index.version}): {report['numPlans']}건, 추가 행 {report['addedRows']}개, "
+              f"위험도 변경 {len(report['changed'])}건, {report['seconds']}초")
+        return report
 
     def _load_model_for_query(self):
         """입력 텍스트 1건을 임베딩하기 위한 모델(가볍게 한 번만 로드)."""
@@ -70,111 +185,68 @@ class CopyrightAnalyzer:
         try:
             from .model_loader import load_model
             self.model = load_model(self.model_key)  # sentence-transformers 이름 매핑 사용
-            print("SentenceTransformer 로드 완료(입력 인코딩용).")
+            # 동시 요청의 입력 인코딩을 짧은 시간창 단위로 모아 한 번에 처리 (같은 입력은 캐시에서 바로 반환)
+            # ONNX(int8) 임베딩은 torch와 미세하게 다르므로 캐시 키를 분리
+            cache_key = f"{self.model_key}-{self.model.variant}" if hasattr(self.model, "variant") else self.model_key
+            self.encoder = MicroBatchEncoder(self.model, cache=EmbeddingCache(cache_key))
+            print(f"{type(self.model).__name__} 로드 완료(입력 인코딩용).")
         except Exception as e:
             print(f"모델 로드 실패: {e} → simple 유사도 모드로 전환")
             self.use_transformer = False
             self.model = None
 
+    def _build_lexical_index(self):
+        """폴백 모드: 후보 텍스트로 TF-IDF 희소 인덱스를 한 번 만들어 쿼리를 ms 단위로 채점."""
+        try:
+            from .lexical import LexicalIndex
+            t0 = time.time()
+            self.lexical = LexicalIndex(self.index.candidate_texts)
+            print(f"어휘 유사도 인덱스 생성 완료: {len(self.lexical)}개 항목, {time.time()-t0:.2f}초")
+        except Exception as e:
+            print(f"어휘 유사도 인덱스 생성 실패: {e} → 간단 유사도(difflib) 사용")
+            self.lexical = None
+
+    # ---------- 모델 레지스트리 (registry.py) ----------
+    def memory_bytes(self) -> int:
+        """상주 메모리 추정치: 모델 파라미터/버퍼 + 인덱스 배열(mmap 포함) + 어휘 인덱스 행렬."""
+        total = 0
+        if hasattr(self.model, "memory_bytes"):
+            total += self.model.memory_bytes()  # ONNX 인코더: 모델 파일 크기
+        elif self.model is not None:
+            tensors = list(self.model.parameters()) + list(self.model.buffers())
+            total += sum(t.numel() * t.element_size() for t in tensors)
+        index = self.index
+        engines = [s.engine for s in index.shards] if isinstance(index, ShardedIndex) else [index.engine]
+        # 엔진과 인덱스가 같은 임베딩 배열을 공유하므로 id로 중복 제거
+        arrays = {id(v): v for engine in engines if engine is not None
+                  for v in vars(engine).values() if isinstance(v, np.ndarray)}
+        if getattr(index, "embeddings", None) is not None:
+            arrays[id(index.embeddings)] = index.embeddings
+        total += sum(v.nbytes for v in arrays.values())
+        if self.lexical is not None:
+            for matrix in (self.lexical.char_index, self.lexical.word_index):
+                total += matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+        return total
+
+    def close(self):
+        """레지스트리에서 내려갈 때 호출: 인코더 스레드를 끝내 모델을 해제할 수 있게 한다."""
+        if self.encoder is not None:
+            self.encoder.close()
+
     # ---------- 유틸 ----------
     def _create_input_text(self, game_data: TranslatedGameData) -> str:
         return f"{game_data.theme}\n{', '.join(game_data.mechanics)}\n{game_data.description}"
 
     def _determine_risk_level(self, max_score: float) -> RiskLevel:
-        if max_score >= 0.8: return RiskLevel.HIGH_RISK
-        if max_score >= 0.6: return RiskLevel.CAUTION
-        if max_score >= 0.4: return RiskLevel.LOW_RISK
-        return RiskLevel.NO_RISK
+        return determine_risk_level(max_score)
     
-    def _extract_overlapping_elements(self, game_data: TranslatedGameData, similar_game_data: dict) -> List[str]:
-        """두 게임 간 중복되는 요소를 자세히 추출합니다."""
-        overlapping = []
-        
-        # 1. 테마/카테고리 중복 검사
-        game_theme_lower = game_data.theme.lower()
-        similar_category = similar_game_data.get('category', '').lower()
-        
-        # 구체적인 테마 키워드들
-        theme_keywords = {
-            'fantasy': ['fantasy', 'magic', 'dragon', 'wizard', 'medieval'],
-            'sci-fi': ['science', 'space', 'future', 'robot', 'alien'],
-            'war': ['war', 'battle', 'military', 'combat', 'conflict'],
-            'economic': ['economic', 'trade', 'business', 'money', 'market'],
-            'adventure': ['adventure', 'exploration', 'quest', 'journey'],
-            'horror': ['horror', 'zombie', 'monster', 'dark', 'evil'],
-            'historical': ['ancient', 'historical', 'civilization', 'empire']
-        }
-        
-        for theme_name, keywords in theme_keywords.items():
-            game_has_theme = any(keyword in game_theme_lower for keyword in keywords)
-            similar_has_theme = any(keyword in similar_category for keyword in keywords)
-            if game_has_theme and similar_has_theme:
-                matching_keywords = [kw for kw in keywords if kw in game_theme_lower and kw in similar_category]
-                if matching_keywords:
-                    overlapping.append(f"테마 유사성: {theme_name} 테마 (키워드: {', '.join(matching_keywords)})")
-                else:
-                    # 키워드가 직접 매칭되지 않았지만 카테고리적으로 유사한 경우
-                    overlapping.append(f"테마 유사성: {theme_name} 계열 테마")
-        
-        # 2. 게임 규칙 중복 검사 (더 구체적으로)
-        game_mechanics_text = ' '.join(game_data.mechanics).lower()
-        similar_mechanic = similar_game_data.get('mechanic', '').lower()
-        
-        # 구체적인 규칙 카테고리들
-        mechanic_categories = {
-            '카드 게임': ['card', 'deck', 'hand', 'draw'],
-            '타일 배치': ['tile', 'placement', 'grid', 'board'],
-            '주사위': ['dice', 'roll', 'random'],
-            '전략': ['strategy', 'tactical', 'planning'],
-            '협력': ['cooperative', 'collaboration', 'team'],
-            '경쟁': ['competitive', 'versus', 'against'],
-            '자원 관리': ['resource', 'management', 'collect'],
-            '영역 확장': ['area', 'territory', 'control', 'expansion'],
-            '워커 플레이스먼트': ['worker', 'placement', 'action'],
-            '덱 빌딩': ['deck', 'building', 'construct']
-        }
-        
-        for mechanic_name, keywords in mechanic_categories.items():
-            game_has_mechanic = any(keyword in game_mechanics_text for keyword in keywords)
-            similar_has_mechanic = any(keyword in similar_mechanic for keyword in keywords)
-            if game_has_mechanic and similar_has_mechanic:
-                matching_keywords = [kw for kw in keywords if kw in game_mechanics_text and kw in similar_mechanic]
-                if matching_keywords:
-                    overlapping.append(f"규칙 유사성: {mechanic_name} (공통 키워드: {', '.join(matching_keywords)})")
-                else:
-                    overlapping.append(f"규칙 유사성: {mechanic_name} 계열")
-        
-        # 3. 게임 설명/목표 중복 검사
-        game_description = game_data.description.lower()
-        similar_description = similar_game_data.get('Description', '').lower()
-        
-        # 게임 목표나 플레이 스타일 키워드들
-        gameplay_keywords = {
-            '승리 조건': ['win', 'victory', 'goal', 'objective', 'points'],
-            '플레이어 상호작용': ['player', 'opponent', 'interaction', 'compete'],
-            '게임 진행': ['turn', 'round', 'phase', 'sequence'],
-            '난이도': ['easy', 'simple', 'complex', 'difficult', 'strategy'],
-            '시간': ['quick', 'fast', 'long', 'time', 'minutes']
-        }
-        
-        for aspect_name, keywords in gameplay_keywords.items():
-            game_has_aspect = any(keyword in game_description for keyword in keywords)
-            similar_has_aspect = any(keyword in similar_description for keyword in keywords)
-            if game_has_aspect and similar_has_aspect:
-                matching_keywords = [kw for kw in keywords if kw in game_description and kw in similar_description]
-                if matching_keywords:
-                    overlapping.append(f"게임플레이 유사성: {aspect_name} (공통: {', '.join(matching_keywords)})")
-        
-        # 4. 특별한 게임 요소들
-        special_elements = ['miniature', 'component', 'board', 'token', 'marker', 'piece']
-        game_text = f"{game_theme_lower} {game_mechanics_text} {game_description}"
-        similar_text = f"{similar_category} {similar_mechanic} {similar_description}"
-        
-        for element in special_elements:
-            if element in game_text and element in similar_text:
-                overlapping.append(f"구성 요소 유사성: {element}")
-        
-        return overlapping[:5]  # 최대 5개까지 반환 (더 자세한 정보 제공)
+    def _extract_overlapping_elements(self, game_data: TranslatedGameData, similar_game_data: dict,
+                                      candidate: Masks = None, query: Masks = None) -> List[str]:
+        """두 게임 간 중복되는 요소를 자세히 추출합니다. (키워드 비트셋 AND, keywords.py 참고)"""
+        query = query or query_masks(game_data.theme, game_data.mechanics, game_data.description)
+        candidate = candidate or candidate_masks(similar_game_data)
+        return overlapping_elements(query, candidate)  # 최대 5개까지 반환 (더 자세한 정보 제공)
+
     def _generate_analysis_summary(self, risk_level: RiskLevel, similar_games: List[SimilarGame]) -> str:
         """상세한 분석 요약을 생성합니다."""
         if not similar_games:
@@ -273,40 +345,81 @@ class CopyrightAnalyzer:
         
         return '\n'.join(summary_parts)
 
-    def _compute_similarity_fast(self, input_text: str) -> List[float]:
+    def record_cached_plan(self, content_key: str, plan_id: int, index) -> bool:
         """
-        캐시된 임베딩(정규화 완료)과 입력 1건 임베딩(정규화)을 dot-product로 빠르게 코사인 유사도 계산.
+        판정 캐시에서 바로 답한 검사를 기획안 저장소에 남긴다 (같은 내용의 기록을 plan_id로 복사).
+        저장할 기록이 없으면 False → 호출하는 쪽이 분석을 다시 돌려 벡터를 남긴다.
         """
+        if not self._records_plans(index):
+            return True
+        try:
+            return self.plans.copy_content(content_key, plan_id)
+        except Exception as e:
+            print(f"기획안 벡터 저장 실패: {e}")
+            return True
+
+    def _records_plans(self, index) -> bool:
+        return self.plans is not None and self._uses_vectors(index) and isinstance(index, ShardedIndex)
+
+    def _uses_vectors(self, index) -> bool:
+        return bool(self.use_transformer and self.model and index.engine is not None)
+
+    def _record_plans(self, games: List[TranslatedGameData], queries: np.ndarray, hits, results, index,
+                      content_keys: Optional[List[Optional[str]]] = None):
+        """검사 결과와 쿼리 벡터를 기획안 저장소에 남긴다 (실패해도 검사 결과는 그대로 반환)."""
+        content_keys = content_keys or [None] * len(games)
+        try:
+            self.plans.put([plan_record(g.planId, g.title, q, r.riskLevel.value, idx, scores, index, key)
+                            for g, q, (idx, scores), r, key in zip(games, queries, hits, results, content_keys)])
+        except Exception as e:
+            print(f"기획안 벡터 저장 실패: {e}")
+
+    def _compute_similarity_fast(self, input_text: str, k: int = 3, index=None,
+                                 query: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        입력 1건 임베딩(정규화)으로 검색 엔진에서 상위 k개 (인덱스, 코사인 유사도)를 찾는다.
+        """
+        index = index or self.index
         # 캐시/모델이 없으면 simple로
-        if not (self.use_transformer and self.model and self.embeddings is not None):
-            return compute_similarity_simple(input_text, self.candidate_texts)
+        if not self._uses_vectors(index):
+            if self.lexical is not None:
+                return self.lexical.search(input_text, k)
+            scores = np.asarray(compute_similarity_simple(input_text, index.candidate_texts), dtype=np.float32)
+            idx = top_k(scores, k)
+            return idx, scores[idx]
 
-        # 입력 1건을 벡터화 + 정규화
-        q = self.model.encode([input_text], convert_to_numpy=True, normalize_embeddings=True)  # (1, D)
-        # 코사인 유사도 = 정규화된 벡터 끼리 내적
-        sims = np.dot(q, self.embeddings.T)[0]  # (N,)
-        return sims.tolist()
+        # 입력 1건을 벡터화 + 정규화 (마이크로 배칭 인코더가 동시 요청과 묶어서 encode)
+        q = self.encoder.encode_one(input_text) if query is None else query  # (D,)
+        # 코사인 유사도 = 정규화된 벡터 끼리 내적 (엔진 설정에 따라 양자화 후보 + float32 재채점)
+        return index.engine.search(q, k)
 
-    # ---------- 메인 ----------
-    async def analyze_copyright(self, game_data: TranslatedGameData) -> PlanCopyrightCheckResponse:
-        start_time = time.time()
-        print(f"📊 저작권 분석 시작 - Plan ID: {game_data.planId}")
+    def _compute_similarity_batch(self, input_texts: List[str], k: int = 3, index=None,
+                                  queries: np.ndarray = None) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        여러 입력을 한 번의 encode 호출로 임베딩하고, 검색 엔진의 배치 검색(행렬-행렬 곱)으로 상위 k개를 찾는다.
+        """
+        index = index or self.index
+        if not self._uses_vectors(index):
+            if self.lexical is not None:
+                return self.lexical.search_batch(input_texts, k)
+            return [self._compute_similarity_fast(text, k, index) for text in input_texts]
 
-        # 1) 유사도 계산
-        t0 = time.time()
-        input_text = self._create_input_text(game_data)
-        scores = self._compute_similarity_fast(input_text)
-        print(f"⚡ 유사도 계산 완료: {time.time()-t0:.2f}초 (총 {len(scores)}개 비교)")
+        if queries is None:
+            queries = self.encoder.encode_many(input_texts, batch_size=ENCODE_BATCH_SIZE)  # (Q, D)
+        return index.engine.search_batch(queries, k)
 
-        # 2) 상위 3개 추출
-        top_idx = np.argsort(scores)[::-1][:3]
+    def _build_response(self, game_data: TranslatedGameData, top_idx, top_scores, meta_rows=None,
+                        index=None) -> PlanCopyrightCheckResponse:
+        """상위 후보 (인덱스, 점수)로 유사 게임 목록 / 위험도 / 요약을 만든다."""
+        index = index or self.index
         similar_games = []
-        for i in top_idx:
-            score = scores[i]
-            if score <= 0.10:
+        # 입력 기획안은 한 번만 스캔하고 후보는 인덱스에 저장된 비트셋을 사용
+        query = query_masks(game_data.theme, game_data.mechanics, game_data.description)
+        for i, score in zip(top_idx, top_scores):
+            if score <= MIN_SIMILAR_SCORE:
                 continue
-            meta = self.meta[i]
-            overlapping = self._extract_overlapping_elements(game_data, meta)
+            meta = (meta_rows if meta_rows is not None else index.meta)[i]
+            overlapping = self._extract_overlapping_elements(game_data, meta, index.keyword_masks(i, meta), query)
             similar_games.append(
                 SimilarGame(
                     title=meta.get("title", "Unknown Game"),
@@ -316,16 +429,59 @@ class CopyrightAnalyzer:
                 )
             )
 
-        max_score = float(scores[top_idx[0]]) if len(top_idx) else 0.0
+        max_score = float(top_scores[0]) if len(top_idx) else 0.0
         risk = self._determine_risk_level(max_score)
         summary = self._generate_analysis_summary(risk, similar_games)
 
-        print(f"🔍 결과 분석 완료: {time.time()-t0:.2f}초 (유사 {len(similar_games)}개)")
-        print(f"✅ 총 소요시간: {time.time()-start_time:.2f}초, 위험도: {risk.value}")
-
         return PlanCopyrightCheckResponse(
             planId=game_data.planId,
             riskLevel=risk,
             similarGames=similar_games,
             analysisSummary=summary
         )
+
+    # ---------- 메인 ----------
+    async def analyze_copyright(self, game_data: TranslatedGameData, index=None,
+                                content_key: Optional[str] = None) -> PlanCopyrightCheckResponse:
+        """content_key: 판정 캐시 키 (기획안 저장소 기록에 같이 남겨 캐시 적중 때 복사에 쓴다)."""
+        start_time = time.time()
+        print(f"📊 저작권 분석 시작 - Plan ID: {game_data.planId}")
+
+        # 1) 유사도 계산
+        t0 = time.time()
+        input_text = self._create_input_text(game_data)
+        index = index or self.current_index()
+        # 인코딩 대기 중에도 이벤트 루프가 다른 요청을 받을 수 있도록 스레드에서 실행
+        # 기획안 저장소가 있으면 쿼리 벡터를 따로 받아 검색과 저장에 같이 쓴다
+        query = None
+        if self._records_plans(index):
+            query = await asyncio.to_thread(self.encoder.encode_one, input_text)
+        top_idx, top_scores = await asyncio.to_thread(self._compute_similarity_fast, input_text, TOP_K, index, query)
+        print(f"⚡ 유사도 계산 완료: {time.time()-t0:.2f}초 (총 {len(index.candidate_texts)}개 비교)")
+
+        # 2) 상위 3개 추출
+        result = self._build_response(game_data, top_idx, top_scores, index.meta, index)
+
+        if query is not None:
+            await asyncio.to_thread(self._record_plans, [game_data], [query], [(top_idx, top_scores)], [result], index,
+                                    [content_key])
+
+        print(f"🔍 결과 분석 완료: {time.time()-t0:.2f}초 (유사 {len(result.similarGames)}개)")
+        print(f"✅ 총 소요시간: {time.time()-start_time:.2f}초, 위험도: {result.riskLevel.value}")
+        return result
+
+    def analyze_batch(self, games: List[TranslatedGameData], index=None,
+                      content_keys: Optional[List[str]] = None) -> List[PlanCopyrightCheckResponse]:
+        """여러 기획안을 한 번에 분석 (CPU 작업이므로 호출하는 쪽에서 스레드풀로 실행)."""
+        if not games:
+            return []
+        t0 = time.time()
+        index = index or self.current_index()
+        texts = [self._create_input_text(g) for g in games]
+        queries = self.encoder.encode_many(texts, batch_size=ENCODE_BATCH_SIZE) if self._records_plans(index) else None
+        hits = self._compute_similarity_batch(texts, TOP_K, index, queries)
+        results = [self._build_response(g, idx, scores, index.meta, index) for g, (idx, scores) in zip(games, hits)]
+        if queries is not None:
+            self._record_plans(games, queries, hits, results, index, content_keys)
+        print(f"⚡ 일괄 유사도 계산 완료: {len(games)}건, {time.time()-t0:.2f}초")
+        return results
@@ -0,0 +1,108 @@
+"""
+쿼리 임베딩 캐시 (메모리 LRU + 선택적 디스크 계층)
+
+같은 기획안을 다시 검사하거나 Spring이 재시도하면 _create_input_text 결과가 그대로 같아
+동일한 문자열을 매번 다시 인코딩하게 된다. 입력 텍스트(공백 정규화) 해시 → 정규화된 임베딩을 보관해
+적중하면 트랜스포머 forward를 완전히 건너뛴다.
+
+- 키에 모델 키를 포함하고 디스크 계층도 모델 키별 디렉터리를 쓰므로, 모델이 바뀌면 이전 벡터는 쓰이지 않는다
+- COPYRIGHT_EMBED_CACHE_SIZE : 메모리 LRU 항목 수 (기본 4096, 0이면 끔)
+- COPYRIGHT_EMBED_CACHE_DIR  : 디스크 계층 경로 (비어 있으면 메모리만 사용, 워커/재시작 간 공유용)
+"""
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+EMBED_CACHE_SIZE = int(os.getenv("COPYRIGHT_EMBED_CACHE_SIZE", "4096"))
+EMBED_CACHE_DIR = os.getenv("COPYRIGHT_EMBED_CACHE_DIR", "")
+
+
+def normalize_text(text: str) -> str:
+    """임베딩 결과가 달라지지 않는 공백 차이만 정규화한다."""
+    return " ".join(text.split())
+
+
+class EmbeddingCache:
+    def __init__(self, model_key: str, capacity: int = EMBED_CACHE_SIZE, disk_dir: str = EMBED_CACHE_DIR):
+        self.model_key = model_key
+        self.capacity = max(capacity, 0)
+        self.disk_dir = Path(disk_dir) / model_key if disk_dir else None
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memoryHits": 0, "diskHits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_key}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.npy"
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        key = self.key(text)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.stats["memoryHits"] += 1
+                return vector
+        if self.disk_dir is not None:
+            try:
+                vector = np.load(self._disk_path(key))
+            except (OSError, ValueError):
+                vector = None
+            if vector is not None:
+                self._remember(key, vector)
+                with self._lock:
+                    self.stats["diskHits"] += 1
+                return vector
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def put(self, text: str, vector: np.ndarray):
+        key = self.key(text)
+        vector = np.asarray(vector, dtype=np.float32)
+        vector.setflags(write=False)
+        self._remember(key, vector)
+        with self._lock:
+            self.stats["stores"] += 1
+        if self.disk_dir is not None:
+            path = self._disk_path(key)
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # 다른 워커가 읽는 중에 반쯤 쓴 파일이 보이지 않도록 임시 파일에 쓰고 교체
+                tmp = path.with_name(f"{key}.{os.getpid()}.tmp.npy")
+                np.save(tmp, vector)
+                os.replace(tmp, path)
+            except OSError as e:
+                print(f"임베딩 디스크 캐시 저장 실패: {e}")
+
+    def _remember(self, key: str, vector: np.ndarray):
+        if self.capacity == 0:
+            return
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            size = len(self._entries)
+        lookups = stats["memoryHits"] + stats["diskHits"] + stats["misses"]
+        hits = stats["memoryHits"] + stats["diskHits"]
+        return {
+            "modelKey": self.model_key,
+            "capacity": self.capacity,
+            "size": size,
+            "diskDir": str(self.disk_dir) if self.disk_dir is not None else None,
+            **stats,
+            "hitRate": round(hits / lookups, 4) if lookups else 0.0,
+        }
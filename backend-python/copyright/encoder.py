@@ -0,0 +1,173 @@
+"""
+쿼리 임베딩 마이크로 배칭
+
+/copyright-plan 요청은 입력 1건마다 model.encode([text])를 호출하므로 동시 요청이 많아도
+트랜스포머 forward 고정 비용(토크나이저, 스레드풀 기동, 작은 행렬 연산)을 건마다 다시 치른다.
+
+MicroBatchEncoder는 전용 스레드 하나가 큐를 비우며
+첫 텍스트가 도착한 뒤 window_ms 동안(또는 max_batch건이 모일 때까지) 들어온 텍스트를 모아
+한 번의 encode 호출로 처리하고 각 호출자의 Future를 채운다.
+부하가 낮으면 1건씩, 높으면 자동으로 큰 배치가 되어 처리량이 부하에 맞춰 늘어난다.
+
+- COPYRIGHT_ENCODE_WINDOW_MS : 배치 수집 대기 시간 (기본 5ms, 0이면 이미 대기 중인 것만 모음)
+- COPYRIGHT_ENCODE_MAX_BATCH : 한 번에 encode 할 최대 건수 (기본 32)
+
+임베딩 캐시(embedding_cache.EmbeddingCache)가 주어지면 적중한 텍스트는 큐에 넣지 않고 바로 돌려준다.
+모델 레지스트리에서 내려간(evict) 인코더는 close()로 스레드를 끝내고, 이후 호출은 스레드 없이 바로 encode 한다.
+"""
+import os
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .embedding_cache import EmbeddingCache
+
+ENCODE_WINDOW_MS = float(os.getenv("COPYRIGHT_ENCODE_WINDOW_MS", "5"))
+ENCODE_MAX_BATCH = int(os.getenv("COPYRIGHT_ENCODE_MAX_BATCH", "32"))
+
+# 배치 크기 분포 구간 (상한 포함)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+
+class MicroBatchEncoder:
+    """정규화된 float32 임베딩을 돌려주는 마이크로 배칭 인코더 (SentenceTransformer 앞단)."""
+
+    def __init__(self, model, window_ms: float = ENCODE_WINDOW_MS, max_batch: int = ENCODE_MAX_BATCH,
+                 cache: Optional[EmbeddingCache] = None):
+        self.model = model
+        self.cache = cache
+        self.window = max(window_ms, 0.0) / 1000.0
+        self.max_batch = max(1, max_batch)
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Tuple[str, Future, float]]" = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._closed = False
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.stats = {"batches": 0, "items": 0, "failedBatches": 0,
+                      "waitSeconds": 0.0, "encodeSeconds": 0.0, "maxBatch": 0}
+        self.histogram: Dict[str, int] = {f"<={b}": 0 for b in BATCH_SIZE_BUCKETS}
+        self.histogram[f">{BATCH_SIZE_BUCKETS[-1]}"] = 0
+
+    def _ensure_worker(self):
+        # fork 이후의 워커 프로세스에는 스레드가 없으므로 프로세스별로 새로 띄운다 (self._lock 안에서 호출)
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        if self._pid != os.getpid():
+            self._queue = queue.Queue()
+            self._reset_stats()
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name="copyright-encoder", daemon=True)
+        self._thread.start()
+
+    def submit(self, text: str) -> Future:
+        """텍스트 1건을 큐에 넣고 (D,) 임베딩을 돌려줄 Future를 반환."""
+        future: Future = Future()
+        cached = self.cache.get(text) if self.cache is not None else None
+        if cached is not None:
+            future.set_result(cached)
+            return future
+        with self._lock:
+            if not self._closed:
+                self._ensure_worker()
+                self._queue.put((text, future, time.perf_counter()))
+                return future
+        # 내려간 뒤에도 진행 중이던 요청은 끝까지 처리 (배칭 없이)
+        future.set_result(self.encode_many([text])[0])
+        return future
+
+    def encode_one(self, text: str) -> np.ndarray:
+        return self.submit(text).result()
+
+    def encode_many(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """이미 모여 있는 여러 건(일괄 검사)은 큐를 거치지 않고 캐시 미적중분만 한 번에 encode. (N, D) 반환."""
+        cached = [self.cache.get(t) if self.cache is not None else None for t in texts]
+        missing = [i for i, v in enumerate(cached) if v is None]
+        if missing:
+            vectors = self.model.encode([texts[i] for i in missing], batch_size=batch_size,
+                                        convert_to_numpy=True, normalize_embeddings=True)
+            for i, vector in zip(missing, vectors):
+                cached[i] = np.asarray(vector, dtype=np.float32)
+                if self.cache is not None:
+                    self.cache.put(texts[i], cached[i])
+        return np.stack(cached) if cached else np.empty((0, 0), dtype=np.float32)
+
+    def close(self):
+        """배칭 스레드를 끝내 모델 참조를 놓는다. 이미 큐에 들어온 텍스트는 처리하고 끝난다."""
+        with self._lock:
+            self._closed = True
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                self._queue.put(None)
+
+    def _collect(self) -> List[Tuple[str, Future, float]]:
+        first = self._queue.get()
+        if first is None:
+            return []
+        batch = [first]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # 이번 배치를 처리한 뒤 종료
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if not batch:
+                return
+            started = time.perf_counter()
+            try:
+                vectors = self.model.encode([text for text, _, _ in batch], batch_size=len(batch),
+                                            convert_to_numpy=True, normalize_embeddings=True)
+            except Exception as e:
+                self.stats["failedBatches"] += 1
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            finished = time.perf_counter()
+            for (text, future, _), vector in zip(batch, vectors):
+                vector = np.asarray(vector, dtype=np.float32)
+                if self.cache is not None:
+                    self.cache.put(text, vector)
+                future.set_result(vector)
+            self._record(batch, started, finished)
+
+    def _record(self, batch, started: float, finished: float):
+        size = len(batch)
+        self.stats["batches"] += 1
+        self.stats["items"] += size
+        self.stats["waitSeconds"] += sum(started - queued for _, _, queued in batch)
+        self.stats["encodeSeconds"] += finished - started
+        self.stats["maxBatch"] = max(self.stats["maxBatch"], size)
+        bucket = next((f"<={b}" for b in BATCH_SIZE_BUCKETS if size <= b), f">{BATCH_SIZE_BUCKETS[-1]}")
+        self.histogram[bucket] += 1
+
+    def snapshot(self) -> dict:
+        batches, items = self.stats["batches"], self.stats["items"]
+        return {
+            "windowMs": self.window * 1000.0,
+            "maxBatchSize": self.max_batch,
+            "queueDepth": self._queue.qsize(),
+            "batches": batches,
+            "items": items,
+            "failedBatches": self.stats["failedBatches"],
+            "meanBatchSize": round(items / batches, 2) if batches else 0.0,
+            "largestBatch": self.stats["maxBatch"],
+            "meanWaitMs": round(self.stats["waitSeconds"] / items * 1000, 3) if items else 0.0,
+            "meanEncodeMsPerBatch": round(self.stats["encodeSeconds"] / batches * 1000, 3) if batches else 0.0,
+            "meanEncodeMsPerItem": round(self.stats["encodeSeconds"] / items * 1000, 3) if items else 0.0,
+            "batchSizeHistogram": dict(self.histogram),
+        }
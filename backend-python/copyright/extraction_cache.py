@@ -0,0 +1,140 @@
+"""
+기획안 추출 결과 캐시 (summaryText 해시 → TranslatedGameData, 메모리 LRU + TTL + 선택적 디스크 계층)
+
+Spring은 기획안을 저장할 때마다 저작권 검사를 다시 부르므로 summaryText가 그대로인 재검사가 많다.
+추출(+번역) 결과를 summaryText 해시로 보관해 두면 재검사는 GPT 호출 없이 바로 벡터 검색으로 넘어간다.
+
+- 키: 추출 방식(번역 여부, single/two-step) + 프롬프트 버전 + 공백 정규화한 summaryText.
+  planId는 키에 넣지 않고 적중 시 바꿔 끼운다. 두 방식은 프롬프트가 달라 결과도 다르므로 섞어 쓰지 않는다
+- 저장/만료 로직(ResultCache)은 판정 결과 캐시(verdict_cache.py)와 같이 쓴다
+- COPYRIGHT_EXTRACT_CACHE_SIZE : 메모리 LRU 항목 수 (기본 2048, 0이면 끔)
+- COPYRIGHT_EXTRACT_CACHE_TTL  : 항목 유효 시간(초, 기본 7일). GPT 프롬프트/모델을 바꾸면 EXTRACT_PROMPT_VERSION도 올린다
+- COPYRIGHT_EXTRACT_CACHE_DIR  : 디스크 계층 경로 (비어 있으면 메모리만 사용, 워커/재시작 간 공유용)
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Generic, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+
+from .embedding_cache import normalize_text
+from .schemas import TranslatedGameData
+
+T = TypeVar("T", bound=BaseModel)
+
+EXTRACT_CACHE_SIZE = int(os.getenv("COPYRIGHT_EXTRACT_CACHE_SIZE", "2048"))
+EXTRACT_CACHE_TTL = float(os.getenv("COPYRIGHT_EXTRACT_CACHE_TTL", str(7 * 24 * 3600)))
+EXTRACT_CACHE_DIR = os.getenv("COPYRIGHT_EXTRACT_CACHE_DIR", "")
+# 추출/번역 프롬프트나 GPT 모델을 바꾸면 올려서 이전 결과를 무효화
+EXTRACT_PROMPT_VERSION = "2"
+
+
+class ResultCache(Generic[T]):
+    """planId만 다른 같은 입력의 결과(pydantic 모델)를 보관하는 LRU + TTL + 디스크 캐시. 키는 하위 클래스가 만든다."""
+
+    def __init__(self, model: Type[T], capacity: int, ttl: float, disk_dir: str):
+        self.model = model
+        self.capacity = max(capacity, 0)
+        self.ttl = ttl
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        # 키 → (저장 시각, planId를 뺀 필드)
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memoryHits": 0, "diskHits": 0, "misses": 0, "expired": 0, "stores": 0, "evictions": 0}
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def _count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def get(self, key: str, plan_id: int) -> Optional[T]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.stats["memoryHits"] += 1
+                    return self.model(planId=plan_id, **entry[1])
+                del self._entries[key]
+                self.stats["expired"] += 1
+        if self.disk_dir is not None:
+            try:
+                with open(self._disk_path(key), "r", encoding="utf-8") as f:
+                    stored = json.load(f)
+            except (OSError, ValueError):
+                stored = None
+            if stored is not None:
+                if now - stored["storedAt"] <= self.ttl:
+                    self._remember(key, stored["storedAt"], stored["data"])
+                    self._count("diskHits")
+                    return self.model(planId=plan_id, **stored["data"])
+                self._count("expired")
+        self._count("misses")
+        return None
+
+    def put(self, key: str, result: T):
+        data = result.model_dump(mode="json", exclude={"planId"})
+        stored_at = time.time()
+        self._remember(key, stored_at, data)
+        self._count("stores")
+        if self.disk_dir is not None:
+            path = self._disk_path(key)
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # 다른 워커가 읽는 중에 반쯤 쓴 파일이 보이지 않도록 임시 파일에 쓰고 교체
+                tmp = path.with_name(f"{key}.{os.getpid()}.tmp")
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump({"storedAt": stored_at, "data": data}, f, ensure_ascii=False)
+                os.replace(tmp, path)
+            except OSError as e:
+                print(f"{type(self).__name__} 디스크 캐시 저장 실패: {e}")
+
+    def _remember(self, key: str, stored_at: float, data: dict):
+        if self.capacity == 0:
+            return
+        with self._lock:
+            self._entries[key] = (stored_at, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            size = len(self._entries)
+        lookups = stats["memoryHits"] + stats["diskHits"] + stats["misses"]
+        hits = stats["memoryHits"] + stats["diskHits"]
+        return {
+            "capacity": self.capacity,
+            "ttlSeconds": self.ttl,
+            "size": size,
+            "diskDir": str(self.disk_dir) if self.disk_dir is not None else None,
+            **stats,
+            "hitRate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class ExtractionCache(ResultCache[TranslatedGameData]):
+    def __init__(self, capacity: int = EXTRACT_CACHE_SIZE, ttl: float = EXTRACT_CACHE_TTL,
+                 disk_dir: str = EXTRACT_CACHE_DIR):
+        super().__init__(TranslatedGameData, capacity, ttl, disk_dir)
+
+    @staticmethod
+    def key(summary_text: str, translate: bool, extract_mode: str) -> str:
+        # 원문 추출(다국어 모델)은 추출 방식과 무관
+        mode = f"en-{extract_mode}" if translate else "src"
+        return hashlib.sha256(
+            f"{EXTRACT_PROMPT_VERSION}\0{mode}\0{normalize_text(summary_text)}".encode("utf-8")
+        ).hexdigest()
+
+    def snapshot(self) -> dict:
+        return {**super().snapshot(), "promptVersion": EXTRACT_PROMPT_VERSION}
@@ -1,20 +1,46 @@
+import re
 import json
-from openai import OpenAI
+import asyncio
+from openai import AsyncOpenAI
 from typing import Dict, Any
 from .schemas import ExtractedGameData, TranslatedGameData
+from .extraction_cache import ExtractionCache
 import os
 from dotenv import load_dotenv
+from utils import deadline
 
 # .env 파일 로드
 load_dotenv()
 
+# single: 추출과 영어 번역을 GPT 호출 한 번으로 / two-step: 추출 후 번역 (기존 방식)
+EXTRACT_MODE = os.getenv("COPYRIGHT_EXTRACT_MODE", "single").lower()
+# 한글 / (한글 + 라틴 문자) 비율이 이 값보다 작으면 영어 기획안으로 보고 번역하지 않는다
+ENGLISH_HANGUL_RATIO = float(os.getenv("COPYRIGHT_ENGLISH_HANGUL_RATIO", "0.05"))
+
+_HANGUL = re.compile(r"[\uac00-\ud7a3\u3131-\u318e]")
+_LATIN = re.compile(r"[A-Za-z]")
+
+
+def is_english(text: str) -> bool:
+    """한글이 거의 없고 라틴 문자가 있으면 영어 입력으로 본다 (번역 호출 생략 판단용)."""
+    hangul = len(_HANGUL.findall(text))
+    latin = len(_LATIN.findall(text))
+    return latin > 0 and hangul / (hangul + latin) < ENGLISH_HANGUL_RATIO
+
+
 class GameDataExtractor:
     def __init__(self):
-        # OpenAI 클라이언트 초기화
+        # OpenAI 클라이언트 초기화 (비동기: 일괄 검사 시 여러 기획안의 추출/번역을 동시에 진행)
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("OPENAI_API_KEY 환경변수가 설정되지 않았습니다.")
-        self.client = OpenAI(api_key=api_key)
+        self.client = AsyncOpenAI(api_key=api_key)
+        # summaryText 해시 → 추출 결과 (재검사는 GPT 호출 없이)
+        self.cache = ExtractionCache()
+        # 같은 summaryText를 동시에 검사하면 GPT 호출 하나를 함께 기다린다
+        self._inflight: Dict[str, list] = {}  # 키 → [Task, 기다리는 요청 수]
+        self.stats = {"requests": 0, "cacheHits": 0, "joinedInflight": 0, "llmCalls": 0,
+                      "singlePass": 0, "twoStep": 0, "englishInput": 0}
         
     async def extract_game_data(self, plan_id: int, summary_text: str) -> ExtractedGameData:
         """summaryText에서 구조화된 게임 데이터를 추출합니다."""
@@ -35,13 +61,14 @@ class GameDataExtractor:
 """
 
         try:
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": "당신은 보드게임 기획서를 분석하여 구조화된 데이터를 추출하는 전문가입니다. 반드시 유효한 JSON 형식으로만 응답해주세요."},
                     {"role": "user", "content": prompt}
                 ],
-                temperature=0.1
+                temperature=0.1,
+                timeout=deadline.timeout_for("llm")
             )
             
             response_content = response.choices[0].message.content.strip()
@@ -64,6 +91,8 @@ class GameDataExtractor:
                 description=extracted_data.get("description", "보드게임 설명이 없습니다.")
             )
             
+        except deadline.DeadlineExceeded:
+            raise
         except Exception as e:
             raise Exception(f"데이터 추출 중 오류 발생: {str(e)}")
 
@@ -87,13 +116,14 @@ class GameDataExtractor:
 """
 
         try:
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": "당신은 보드게임 관련 내용을 정확하게 영어로 번역하는 전문 번역가입니다. 반드시 유효한 JSON 형식으로만 응답해주세요."},
                     {"role": "user", "content": prompt}
                 ],
-                temperature=0.1
+                temperature=0.1,
+                timeout=deadline.timeout_for("llm")
             )
             
             response_content = response.choices[0].message.content.strip()
@@ -116,11 +146,124 @@ class GameDataExtractor:
                 description=translated_data.get("description", game_data.description)
             )
             
+        except deadline.DeadlineExceeded:
+            raise
         except Exception as e:
             raise Exception(f"번역 중 오류 발생: {str(e)}")
 
-    async def process_plan(self, plan_id: int, summary_text: str) -> TranslatedGameData:
-        """전체 프로세스: 추출 + 번역"""
+    async def extract_english_game_data(self, plan_id: int, summary_text: str) -> TranslatedGameData:
+        """summaryText에서 구조화된 데이터를 추출하면서 값을 영어로 작성합니다 (GPT 호출 1회)."""
+
+        prompt = f"""
+다음 보드게임 기획서에서 필요한 정보를 추출하고, 모든 값을 자연스러운 영어로 작성해주세요.
+기획서가 이미 영어라면 번역하지 말고 원문 표현을 그대로 사용해주세요.
+
+기획서:
+{summary_text}
+
+아래 JSON 형식으로 정확히 반환해주세요 (값은 모두 영어):
+{{
+  "title": "Game title",
+  "theme": "Themes separated by commas (e.g. Magic, Technology, School, Puzzle, Cooperation)",
+  "mechanics": ["Mechanic 1", "Mechanic 2", "Mechanic 3"],
+  "description": "Detailed description of the game"
+}}
+"""
+
+        try:
+            response = await self.client.chat.completions.create(
+                model="gpt-4",
+                messages=[
+                    {"role": "system", "content": "당신은 보드게임 기획서를 분석하여 구조화된 데이터를 영어로 추출하는 전문가입니다. 반드시 유효한 JSON 형식으로만 응답해주세요."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.1,
+                timeout=deadline.timeout_for("llm")
+            )
+
+            response_content = response.choices[0].message.content.strip()
+
+            try:
+                extracted_data = json.loads(response_content)
+            except json.JSONDecodeError as e:
+                print(f"JSON 파싱 오류: {e}")
+                print(f"원본 응답: {response_content}")
+                raise Exception(f"GPT 응답이 유효한 JSON이 아닙니다: {response_content[:200]}...")
+
+            return TranslatedGameData(
+                planId=plan_id,
+                title=extracted_data.get("title", "Unknown Game"),
+                theme=extracted_data.get("theme", "Game, Board Game"),
+                mechanics=extracted_data.get("mechanics", ["Turn-based", "Card Play"]),
+                description=extracted_data.get("description", "No description available.")
+            )
+
+        except deadline.DeadlineExceeded:
+            raise
+        except Exception as e:
+            raise Exception(f"데이터 추출 중 오류 발생: {str(e)}")
+
+    async def _run_extraction(self, plan_id: int, summary_text: str, translate: bool) -> TranslatedGameData:
+        if not translate:
+            # 다국어 모델: 원문 언어 그대로 추출만
+            self.stats["llmCalls"] += 1
+            extracted_data = await self.extract_game_data(plan_id, summary_text)
+            return TranslatedGameData(**extracted_data.model_dump())
+        english = is_english(summary_text)
+        if english:
+            self.stats["englishInput"] += 1
+        if english or EXTRACT_MODE != "two-step":
+            # 영어 기획안이거나 single 모드: 영어로 바로 추출 (번역 호출 없음)
+            self.stats["singlePass"] += 1
+            self.stats["llmCalls"] += 1
+            return await self.extract_english_game_data(plan_id, summary_text)
+        self.stats["twoStep"] += 1
+        self.stats["llmCalls"] += 2
         extracted_data = await self.extract_game_data(plan_id, summary_text)
-        translated_data = await self.translate_to_english(extracted_data)
-        return translated_data
\ No newline at end of file
+        return await self.translate_to_english(extracted_data)
+
+    async def process_plan(self, plan_id: int, summary_text: str, translate: bool = True) -> TranslatedGameData:
+        """
+        전체 프로세스: 추출 + 번역
+
+        - summaryText가 이전 검사와 같으면 캐시된 결과를 그대로 사용 (GPT 호출 없음)
+        - translate=False(다국어 모델)면 원문 언어로 추출만
+        - 그 외에는 COPYRIGHT_EXTRACT_MODE=single(기본)이면 추출+번역을 한 번에, 영어 기획안은 모드와 관계없이 한 번에
+        """
+        self.stats["requests"] += 1
+        key = self.cache.key(summary_text, translate, EXTRACT_MODE)
+        cached = self.cache.get(key, plan_id)
+        if cached is not None:
+            self.stats["cacheHits"] += 1
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            inflight = self._inflight[key] = [asyncio.create_task(
+                self._extract_and_store(key, plan_id, summary_text, translate)), 0]
+        else:
+            self.stats["joinedInflight"] += 1
+        task = inflight[0]
+        inflight[1] += 1
+        try:
+            # 한 요청이 취소돼도 같은 텍스트를 기다리는 다른 요청의 GPT 호출은 계속되도록 shield
+            result = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # 기다리는 요청이 모두 떠나면 (스트림 끊김 등) GPT 호출도 취소
+            if inflight[1] == 1:
+                task.cancel()
+            raise
+        finally:
+            inflight[1] -= 1
+        return result.model_copy(update={"planId": plan_id})
+
+    async def _extract_and_store(self, key: str, plan_id: int, summary_text: str, translate: bool) -> TranslatedGameData:
+        try:
+            result = await self._run_extraction(plan_id, summary_text, translate)
+            self.cache.put(key, result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    def snapshot(self) -> dict:
+        return {"mode": EXTRACT_MODE, **self.stats, "inflight": len(self._inflight), "cache": self.cache.snapshot()}
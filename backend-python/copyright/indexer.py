@@ -1,80 +1,323 @@
+"""
+저작권 임베딩 인덱서 (증분 / 스트리밍 / 병렬 / 재개 가능)
+
+1. CSV를 CSV_CHUNK_ROWS행씩 읽으며 후보 텍스트와 메타를 벡터화로 조립하고, 이전 매니페스트와 비교해 새로 생기거나 바뀐 행만 모은다
+2. 모은 행을 ENCODE_PART_ROWS행 단위 작업으로 나눠 프로세스 풀(워커마다 모델 1개)에서 인코딩한다
+   - 작업 하나가 끝날 때마다 .build/<작업 해시>/part-NNNNN.npy로 저장 → 중단 후 같은 입력으로 다시 실행하면 남은 작업만 인코딩
+   - 진행률과 rows/sec를 출력하고 stats.json에도 기록
+3. 새 샤드를 쓰고 매니페스트를 원자적으로 발행한다 (shards.py 참고)
+
+사용법:
+    python -m copyright.indexer --model mini12 --workers 4
+    python -m copyright.indexer --model t5 --full --quantize int8 --ivf
+"""
 import os
 import json
+import time
+import shutil
+import hashlib
 import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import List
-from sentence_transformers import SentenceTransformer
-from tqdm import tqdm
+from typing import Dict, List, Optional, Set, Tuple
+from .columnar import STORE_FORMAT, write_copyright_store
+from .keywords import write_keyword_bits
+from .search import write_ivf, write_quantized
+from .shards import (KEYS_FILE, SHARD_DIR, content_hash, hash_directory, live_rows, load_manifest, new_manifest,
+                     publish_manifest, unique_keys)
 
 MODEL_NAMES = {
     "mini": "paraphrase-MiniLM-L6-v2",
     "mini12": "all-MiniLM-L12-v2",
     "qa": "multi-qa-MiniLM-L6-cos-v1",
     "t5": "sentence-transformers/gtr-t5-base",
+    "multi": "paraphrase-multilingual-MiniLM-L12-v2",
+}
+
+CSV_CHUNK_ROWS = 5000
+ENCODE_PART_ROWS = 2048
+BUILD_DIR = ".build"
+
+# 메타 컬럼: 저장 이름 → (CSV 컬럼, 컬럼이 없을 때 기본값)
+META_COLUMNS = {
+    "title": ("name", "Unknown Game"),
+    "game_id": ("game_id", None),
+    "category": ("category", ""),
+    "mechanic": ("mechanic", ""),
+    "Description": ("Description", ""),
 }
 
+
+def _text_column(df: pd.DataFrame, name: str) -> pd.Series:
+    # str(row.get(name, ''))와 같은 결과 (결측은 'nan', 컬럼이 없으면 빈 문자열)
+    return df[name].astype(str) if name in df.columns else pd.Series("", index=df.index)
+
+
 def build_candidate_texts(df: pd.DataFrame) -> List[str]:
     """CSV에서 후보 텍스트를 미리 조립한다(카테고리/메커닉/설명)."""
-    return [
-        f"{str(row.get('category',''))} {str(row.get('mechanic',''))} {str(row.get('Description',''))}"
-        for _, row in df.iterrows()
-    ]
+    return (_text_column(df, "category") + " " + _text_column(df, "mechanic") + " "
+            + _text_column(df, "Description")).tolist()
+
+
+def build_meta(df: pd.DataFrame) -> List[dict]:
+    """행→게임 식별자/이름/링크 메타."""
+    columns = {key: (df[src] if src in df.columns else default) for key, (src, default) in META_COLUMNS.items()}
+    return pd.DataFrame(columns, index=df.index).to_dict(orient="records")
+
+
+# ---------- 인코딩 (프로세스 풀, 작업 단위 체크포인트) ----------
+
+_worker_model = None
+
+
+def _init_worker(model_name: str, torch_threads: int):
+    """워커 프로세스마다 모델을 한 번 로드한다. 코어를 워커끼리 나눠 쓰도록 torch 스레드 수를 제한."""
+    global _worker_model
+    import torch
+    from sentence_transformers import SentenceTransformer
+    torch.set_num_threads(torch_threads)
+    _worker_model = SentenceTransformer(model_name)
+
+
+def _encode_part(texts: List[str], batch_size: int) -> np.ndarray:
+    # NOTE: normalize_embeddings=True 로 코사인유사도 점수 계산을 빠르게(dot) 가능하게
+    return _worker_model.encode(texts, batch_size=batch_size, convert_to_numpy=True,
+                                normalize_embeddings=True).astype(np.float32)
+
+
+def default_workers() -> int:
+    return max(1, (os.cpu_count() or 1) // 2)
+
+
+def encode_resumable(model_name: str, texts: List[str], work_dir: Path, workers: int = 1,
+                     batch_size: int = 256, part_rows: int = ENCODE_PART_ROWS) -> Tuple[np.ndarray, dict]:
+    """texts를 part_rows 단위로 인코딩하며 부분 결과를 work_dir에 남긴다. (임베딩, 처리량 통계)를 반환."""
+    work_dir.mkdir(parents=True, exist_ok=True)
+    parts = [(n, start, min(start + part_rows, len(texts))) for n, start in enumerate(range(0, len(texts), part_rows))]
+    part_path = lambda n: work_dir / f"part-{n:05d}.npy"
+    todo = [p for p in parts if not part_path(p[0]).exists()]
+    if len(todo) < len(parts):
+        print(f"이전 빌드 이어서 진행: {len(parts) - len(todo)}/{len(parts)}개 작업 완료됨")
 
-def main(model_key: str, csv_path: str, out_dir: str):
+    started = time.perf_counter()
+    encoded = 0
+
+    def save(part, vectors):
+        nonlocal encoded
+        n, start, end = part
+        # 반쯤 쓴 파일이 완료된 작업으로 보이지 않도록 임시 파일에 쓰고 교체
+        tmp = work_dir / f".part-{n:05d}.tmp.npy"
+        np.save(tmp, vectors)
+        os.replace(tmp, part_path(n))
+        encoded += end - start
+        finished = sum(part_path(m).exists() for m, _, _ in parts)
+        print(f"  [{finished}/{len(parts)}] {encoded}행 인코딩, {encoded / (time.perf_counter() - started):.1f} rows/sec")
+
+    # 남은 작업보다 많은 워커는 모델 로드 비용만 든다 (작업 1개면 풀 없이 현재 프로세스에서 인코딩)
+    workers = max(1, min(workers, len(todo)))
+    if todo and workers == 1:
+        _init_worker(model_name, os.cpu_count() or 1)
+        for n, start, end in todo:
+            save((n, start, end), _encode_part(texts[start:end], batch_size))
+    elif todo:
+        torch_threads = max(1, (os.cpu_count() or 1) // workers)
+        # fork 후 torch 스레드풀이 멈추는 문제를 피하려고 spawn 사용
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker, initargs=(model_name, torch_threads)) as pool:
+            futures = {pool.submit(_encode_part, texts[start:end], batch_size): (n, start, end) for n, start, end in todo}
+            for future in as_completed(futures):
+                save(futures[future], future.result())
+
+    seconds = time.perf_counter() - started
+    embeddings = np.concatenate([np.load(part_path(n)) for n, _, _ in parts]) if parts else np.empty((0, 0), np.float32)
+    return embeddings, {
+        "rows": len(texts),
+        "encoded_rows": encoded,
+        "resumed_rows": len(texts) - encoded,
+        "workers": workers,
+        "encode_seconds": round(seconds, 2),
+        "rows_per_sec": round(encoded / seconds, 1) if encoded and seconds > 0 else None,
+    }
+
+
+def build_work_id(model_name: str, keys: List[str], hashes: List[str], part_rows: int) -> str:
+    """같은 모델 / 같은 인코딩 대상 목록이면 같은 id → 중단된 빌드를 이어서 사용."""
+    digest = hashlib.sha256(f"{model_name}\0{part_rows}".encode("utf-8"))
+    for key, value in zip(keys, hashes):
+        digest.update(f"\0{key}\0{value}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def scan_csv(csv_path: str, live: Dict[str, Tuple[str, int, str]], chunk_rows: int = CSV_CHUNK_ROWS):
+    """CSV를 청크 단위로 읽으며 인코딩이 필요한 행(신규/변경)만 모은다. 전체 키 집합도 함께 반환."""
+    seen: Dict[str, int] = {}
+    all_keys: Set[str] = set()
+    changed = {"texts": [], "meta": [], "keys": [], "hashes": []}
+    total = 0
+    for chunk in pd.read_csv(csv_path, encoding="latin1", chunksize=chunk_rows):
+        texts = build_candidate_texts(chunk)
+        meta = build_meta(chunk)
+        keys = unique_keys(meta, seen)
+        for text, row, key in zip(texts, meta, keys):
+            digest = content_hash(text, row)
+            all_keys.add(key)
+            if live.get(key, (None, None, None))[2] != digest:
+                changed["texts"].append(text)
+                changed["meta"].append(row)
+                changed["keys"].append(key)
+                changed["hashes"].append(digest)
+        total += len(chunk)
+    return changed, all_keys, total
+
+
+def write_shard(shard_dir: Path, embeddings: np.ndarray, meta: List[dict], candidates: List[str],
+                keys: List[str], hashes: List[str], quantize: List[str] = (), ivf_lists: int = None) -> Optional[int]:
+    """샤드를 임시 디렉터리에 모두 쓴 뒤 이름을 바꿔 한 번에 나타나게 한다. 사용한 IVF nlist를 반환."""
+    tmp_dir = shard_dir.with_name(f".{shard_dir.name}.tmp")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+
+    np.save(tmp_dir / "embeddings.npy", embeddings)  # (N, D) float32
+    if quantize:
+        # 양자화 변형 (검색 시 후보 추림용, 최종 점수는 float32로 재채점)
+        write_quantized(tmp_dir, embeddings, quantize)
+    if ivf_lists is not None:
+        # IVF 근사 검색 인덱스 (0이면 nlist = 4·√N 자동 결정)
+        ivf_lists = write_ivf(tmp_dir, embeddings, ivf_lists or None)
+    # 메타(행→게임 식별자/이름/링크)와 후보 텍스트는 mmap 컬럼 저장소로 저장 (런타임에서 필요한 행만 디코딩)
+    write_copyright_store(tmp_dir / "store", meta, candidates)
+    # 공통 요소 추출용 키워드 비트셋 (쿼리 시 후보 텍스트를 다시 스캔하지 않도록)
+    write_keyword_bits(tmp_dir, meta)
+    with open(tmp_dir / KEYS_FILE, "w", encoding="utf-8") as f:
+        json.dump([[k, h] for k, h in zip(keys, hashes)], f, ensure_ascii=False)
+
+    if shard_dir.exists():
+        # 발행되지 못하고 남은 같은 번호의 샤드 (이전 실행이 매니페스트 발행 전에 중단됨)
+        shutil.rmtree(shard_dir)
+    os.replace(tmp_dir, shard_dir)
+    return ivf_lists
+
+
+def prune_shards(out_dir: Path, manifest: dict) -> List[str]:
+    """현재 매니페스트가 참조하지 않는 샤드 디렉터리를 지운다 (열려 있는 mmap은 Linux에서 계속 유효)."""
+    referenced = {s["id"] for s in manifest["shards"]}
+    removed = []
+    for shard_dir in sorted((out_dir / SHARD_DIR).iterdir()):
+        if shard_dir.is_dir() and shard_dir.name not in referenced:
+            shutil.rmtree(shard_dir)
+            removed.append(shard_dir.name)
+    return removed
+
+
+def main(model_key: str, csv_path: str, out_dir: str, quantize: List[str] = (), ivf_lists: int = None,
+         full: bool = False, prune: bool = False, workers: int = 1, chunk_rows: int = CSV_CHUNK_ROWS,
+         batch_size: int = 256):
     if model_key not in MODEL_NAMES:
         raise ValueError(f"지원하지 않는 모델: {model_key}")
 
     model_name = MODEL_NAMES[model_key]
     out_dir = Path(out_dir) / model_key
-    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / SHARD_DIR).mkdir(parents=True, exist_ok=True)
 
-    # 1) 데이터 적재
-    df = pd.read_csv(csv_path, encoding="latin1")
-    candidates = build_candidate_texts(df)
+    # 1) 이전 버전 (모델이 바뀌었거나 --full이면 전체 재생성, 버전 번호는 계속 증가)
+    build_started = time.perf_counter()
+    latest = load_manifest(out_dir)
+    previous = None if full else latest
+    if previous is not None and previous["model_key"] != model_key:
+        print(f"모델 키가 바뀌어 전체 재생성합니다: {previous['model_key']} → {model_key}")
+        previous = None
+    live = live_rows(out_dir, previous) if previous else {}
 
-    # 2) 모델 로드 + 임베딩 계산(배치)
-    model = SentenceTransformer(model_name)
-    # NOTE: normalize_embeddings=True 로 코사인유사도 점수 계산을 빠르게(dot) 가능하게
-    embeddings = model.encode(
-        candidates,
-        batch_size=256,
-        show_progress_bar=True,
-        convert_to_numpy=True,
-        normalize_embeddings=True
-    )
-
-    # 3) 결과 저장
-    np.save(out_dir / "embeddings.npy", embeddings)  # (N, D) float32
-    with open(out_dir / "candidates.json", "w", encoding="utf-8") as f:
-        json.dump(candidates, f, ensure_ascii=False)
-    # 메타(행→게임 식별자/이름/링크)도 함께 저장해두면 런타임에서 바로 사용 가능
-    meta = []
-    for _, row in df.iterrows():
-        meta.append({
-            "title": row.get("name", "Unknown Game"),
-            "game_id": row.get("game_id", None),
-            "category": row.get("category", ""),
-            "mechanic": row.get("mechanic", ""),
-            "Description": row.get("Description", "")
+    # 2) CSV 스트리밍: 행 식별자 / 내용 해시 비교로 신규·변경 행만 수집
+    changed, current_keys, total_rows = scan_csv(csv_path, live, chunk_rows)
+    tombstones = {sid: set(rows) for sid, rows in previous["tombstones"].items()} if previous else {}
+    changed_keys = set(changed["keys"])
+    retired = 0
+    for key, (shard_id, local, _) in live.items():
+        # 내용이 바뀐 행(새 샤드에 다시 들어감)과 CSV에서 사라진 행은 이전 위치를 삭제 표시
+        if key in changed_keys or key not in current_keys:
+            tombstones.setdefault(shard_id, set()).add(local)
+            retired += 1
+
+    if previous is not None and not changed_keys and not retired:
+        print(f"변경 없음: 현재 버전 {previous['name']} 유지")
+        return
+
+    manifest = new_manifest(latest, model_key, model_name)
+    manifest["shards"] = list(previous["shards"]) if previous else []
+    num_rows = previous["num_rows"] if previous else 0
+    num_changed = len(changed["keys"])
+    print(f"신규/변경 {num_changed}행, 삭제 표시 {retired}행 (전체 {total_rows}행)")
+    build_stats = None
+
+    # 3) 바뀐 행만 인코딩해서 새 샤드로 저장
+    work_dir = out_dir / BUILD_DIR / build_work_id(model_name, changed["keys"], changed["hashes"], ENCODE_PART_ROWS)
+    if num_changed:
+        print(f"인코딩: 워커 {workers}개, 작업 단위 {ENCODE_PART_ROWS}행 (체크포인트: {work_dir})")
+        embeddings, build_stats = encode_resumable(model_name, changed["texts"], work_dir, workers, batch_size)
+        shard_id = f"s{manifest['version']:06d}"
+        shard_dir = out_dir / SHARD_DIR / shard_id
+        ivf_lists = write_shard(shard_dir, embeddings, changed["meta"], changed["texts"],
+                                changed["keys"], changed["hashes"], quantize, ivf_lists)
+        manifest["shards"].append({
+            "id": shard_id,
+            "rows": [num_rows, num_rows + num_changed],
+            "num_rows": num_changed,
+            "content_hash": hash_directory(shard_dir),
         })
-    with open(out_dir / "meta.json", "w", encoding="utf-8") as f:
-        json.dump(meta, f, ensure_ascii=False)
+        num_rows += num_changed
 
-    with open(out_dir / "stats.json", "w", encoding="utf-8") as f:
+    # 4) 매니페스트 발행 (CURRENT 교체 → 실행 중인 분석기가 다음 확인 때 새 버전으로 전환)
+    manifest["tombstones"] = {sid: sorted(rows) for sid, rows in tombstones.items() if rows}
+    manifest["num_rows"] = num_rows
+    manifest["num_live_rows"] = num_rows - sum(len(rows) for rows in manifest["tombstones"].values())
+    name = publish_manifest(out_dir, manifest)
+
+    with open(out_dir / "stats.json.tmp", "w", encoding="utf-8") as f:
         json.dump({
             "model_key": model_key,
             "model_name": model_name,
-            "num_items": len(candidates)
+            "num_items": manifest["num_live_rows"],
+            "manifest": name,
+            "num_shards": len(manifest["shards"]),
+            "quantized": list(quantize),
+            "ivf_lists": ivf_lists,
+            "store_format": STORE_FORMAT,
+            "build": {**(build_stats or {}), "total_seconds": round(time.perf_counter() - build_started, 2)},
         }, f, ensure_ascii=False)
+    os.replace(out_dir / "stats.json.tmp", out_dir / "stats.json")
+    # 발행까지 끝났으므로 체크포인트 정리
+    shutil.rmtree(out_dir / BUILD_DIR, ignore_errors=True)
+
+    if prune:
+        removed = prune_shards(out_dir, manifest)
+        if removed:
+            print(f"참조되지 않는 샤드 삭제: {', '.join(removed)}")
+    print(f"임베딩 인덱스 발행 완료: {out_dir.resolve()} ({name}, 샤드 {len(manifest['shards'])}개, "
+          f"유효 {manifest['num_live_rows']}행)")
+    if build_stats and build_stats["rows_per_sec"]:
+        print(f"인코딩 처리량: {build_stats['rows_per_sec']} rows/sec "
+              f"({build_stats['encoded_rows']}행 / {build_stats['encode_seconds']}초, 워커 {build_stats['workers']}개)")
 
-    print(f"임베딩 인덱스 생성 완료: {out_dir.resolve()}")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("--model", default="mini12", help="mini|mini12|qa|t5 중 선택")
+    parser.add_argument("--model", default="mini12", help="mini|mini12|qa|t5|multi 중 선택")
     parser.add_argument("--csv", default=str(Path(__file__).resolve().parent.parent / "pricing" / "data" / "bgg_data.csv"))
     parser.add_argument("--out", default=str(Path(__file__).resolve().parent / "cache"))
+    parser.add_argument("--quantize", default="", help="추가로 만들 양자화 변형 (예: int8,float16)")
+    parser.add_argument("--ivf", type=int, nargs="?", const=0, default=None,
+                        help="IVF 근사 검색 인덱스도 생성 (리스트 수, 생략 시 4·√N)")
+    parser.add_argument("--full", action="store_true",
+                        help="이전 버전을 무시하고 전체를 한 샤드로 재생성 (삭제 표시가 많이 쌓였을 때 압축 용도)")
+    parser.add_argument("--prune", action="store_true", help="발행 후 현재 버전이 참조하지 않는 샤드 삭제")
+    parser.add_argument("--workers", type=int, default=default_workers(), help="인코딩 프로세스 수 (워커마다 모델 1개)")
+    parser.add_argument("--chunk-rows", type=int, default=CSV_CHUNK_ROWS, help="CSV를 한 번에 읽을 행 수")
+    parser.add_argument("--batch-size", type=int, default=256, help="encode 배치 크기")
     args = parser.parse_args()
-    main(args.model, args.csv, args.out)
+    main(args.model, args.csv, args.out, [v for v in args.quantize.split(",") if v], args.ivf, args.full, args.prune,
+         args.workers, args.chunk_rows, args.batch_size)
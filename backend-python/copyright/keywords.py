@@ -0,0 +1,273 @@
+"""
+저작권 검사 공통 요소(overlappingElements) 추출용 키워드 사전 / 비트셋
+
+기존에는 상위 후보마다 카테고리·메커닉·설명을 다시 소문자화하고
+사전(테마/규칙/게임플레이/구성 요소)별로 any(keyword in text) 부분 문자열 검사를 중첩해서 돌렸다.
+
+- 사전 전체를 어휘 하나로 모아 트라이 형태 정규식 하나(위치마다 lookahead, 긴 키워드 우선)로 컴파일한다.
+  한 위치에서 가장 긴 키워드가 맞으면 그 키워드의 접두사인 키워드도 같은 위치에서 맞으므로
+  키워드별 "접두사 닫힘" 비트를 미리 OR 해 두면 한 번의 스캔으로 `keyword in text`와 같은 결과를 얻는다.
+- 후보 쪽 비트셋(카테고리/메커닉/설명 3개 필드)은 인덱서가 샤드마다 keywords.npy로 저장한다.
+  쿼리 시에는 입력 기획안만 한 번 스캔하고 후보별 공통 요소는 비트 AND로 계산한다.
+- 사전이 바뀌면 지문(LEXICON_FINGERPRINT)이 달라져 이전 샤드의 비트셋은 쓰지 않고 메타에서 다시 계산한다.
+- 다국어 모델(번역 없이 한국어 입력)을 위해 한국어 별칭(KEYWORD_ALIASES)도 같은 영어 키워드 비트를 켠다.
+"""
+import re
+import json
+import hashlib
+import operator
+import functools
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 구체적인 테마 키워드들 (입력 테마 ↔ 후보 카테고리)
+THEME_KEYWORDS = {
+    'fantasy': ['fantasy', 'magic', 'dragon', 'wizard', 'medieval'],
+    'sci-fi': ['science', 'space', 'future', 'robot', 'alien'],
+    'war': ['war', 'battle', 'military', 'combat', 'conflict'],
+    'economic': ['economic', 'trade', 'business', 'money', 'market'],
+    'adventure': ['adventure', 'exploration', 'quest', 'journey'],
+    'horror': ['horror', 'zombie', 'monster', 'dark', 'evil'],
+    'historical': ['ancient', 'historical', 'civilization', 'empire']
+}
+
+# 구체적인 규칙 카테고리들 (입력 메커닉 ↔ 후보 메커닉)
+MECHANIC_CATEGORIES = {
+    '카드 게임': ['card', 'deck', 'hand', 'draw'],
+    '타일 배치': ['tile', 'placement', 'grid', 'board'],
+    '주사위': ['dice', 'roll', 'random'],
+    '전략': ['strategy', 'tactical', 'planning'],
+    '협력': ['cooperative', 'collaboration', 'team'],
+    '경쟁': ['competitive', 'versus', 'against'],
+    '자원 관리': ['resource', 'management', 'collect'],
+    '영역 확장': ['area', 'territory', 'control', 'expansion'],
+    '워커 플레이스먼트': ['worker', 'placement', 'action'],
+    '덱 빌딩': ['deck', 'building', 'construct']
+}
+
+# 게임 목표나 플레이 스타일 키워드들 (입력 설명 ↔ 후보 설명)
+GAMEPLAY_KEYWORDS = {
+    '승리 조건': ['win', 'victory', 'goal', 'objective', 'points'],
+    '플레이어 상호작용': ['player', 'opponent', 'interaction', 'compete'],
+    '게임 진행': ['turn', 'round', 'phase', 'sequence'],
+    '난이도': ['easy', 'simple', 'complex', 'difficult', 'strategy'],
+    '시간': ['quick', 'fast', 'long', 'time', 'minutes']
+}
+
+# 특별한 게임 요소들 (세 필드 전체)
+SPECIAL_ELEMENTS = ['miniature', 'component', 'board', 'token', 'marker', 'piece']
+
+# 한국어 별칭 → 영어 키워드 (번역하지 않은 기획안도 영어 후보와 같은 키워드로 비교)
+# 별칭은 한국어만 둔다: 영어 별칭은 영어 텍스트의 부분 문자열(예: 'sf' ⊂ 'transfer')로 잡혀 번역 경로 결과까지 바뀐다
+KEYWORD_ALIASES = {
+    'fantasy': ['판타지'], 'magic': ['마법'], 'dragon': ['드래곤'], 'wizard': ['마법사'], 'medieval': ['중세'],
+    'science': ['과학'], 'space': ['우주'], 'future': ['미래'], 'robot': ['로봇'], 'alien': ['외계'],
+    'war': ['전쟁'], 'battle': ['전투'], 'military': ['군사', '군대'], 'combat': ['격투'], 'conflict': ['분쟁', '갈등'],
+    'economic': ['경제'], 'trade': ['교역', '무역', '거래'], 'business': ['사업', '비즈니스'], 'money': ['돈', '화폐'],
+    'market': ['시장'], 'adventure': ['모험'], 'exploration': ['탐험', '탐사'], 'quest': ['퀘스트'], 'journey': ['여정'],
+    'horror': ['호러', '공포'], 'zombie': ['좀비'], 'monster': ['몬스터', '괴물'], 'dark': ['어둠'], 'evil': ['악마'],
+    'ancient': ['고대'], 'historical': ['역사'], 'civilization': ['문명'], 'empire': ['제국'],
+    'card': ['카드'], 'deck': ['덱'], 'hand': ['핸드'], 'draw': ['드로우'],
+    'tile': ['타일'], 'placement': ['배치'], 'grid': ['격자'], 'board': ['보드', '게임판'],
+    'dice': ['주사위'], 'roll': ['굴림', '굴리'], 'random': ['무작위', '랜덤'],
+    'strategy': ['전략'], 'tactical': ['전술'], 'planning': ['계획'],
+    'cooperative': ['협력', '협동'], 'collaboration': ['공동'], 'team': ['팀'],
+    'competitive': ['경쟁'], 'versus': ['대결'], 'against': ['대항'],
+    'resource': ['자원'], 'management': ['관리'], 'collect': ['수집', '모으'],
+    'area': ['영역', '지역'], 'territory': ['영토'], 'control': ['장악', '통제'], 'expansion': ['확장'],
+    'worker': ['일꾼', '워커'], 'action': ['액션', '행동'], 'building': ['건설', '빌딩'], 'construct': ['건축'],
+    'win': ['승리'], 'goal': ['목표'], 'objective': ['목적'], 'points': ['점수'],
+    'player': ['플레이어'], 'opponent': ['상대'], 'interaction': ['상호작용'], 'compete': ['겨루'],
+    'turn': ['차례'], 'round': ['라운드'], 'phase': ['단계'], 'sequence': ['순서'],
+    'easy': ['쉬운', '쉽'], 'simple': ['간단', '단순'], 'complex': ['복잡'], 'difficult': ['어려운', '어렵'],
+    'quick': ['빠른', '빠르'], 'fast': ['신속'], 'long': ['오래'], 'time': ['시간'],
+    'miniature': ['미니어처'], 'component': ['구성품', '컴포넌트'], 'token': ['토큰'], 'marker': ['마커'],
+    'piece': ['피스'],
+}
+
+# 후보 비트셋 필드 순서 (keywords.npy의 두 번째 축)
+CANDIDATE_FIELDS = ("category", "mechanic", "Description")
+KEYWORDS_FILE = "keywords.npy"
+KEYWORDS_META_FILE = "keywords.json"
+
+Masks = Tuple[int, int, int]  # (테마/카테고리, 메커닉, 설명)
+
+
+def _vocabulary() -> List[str]:
+    words = set(SPECIAL_ELEMENTS)
+    for lexicon in (THEME_KEYWORDS, MECHANIC_CATEGORIES, GAMEPLAY_KEYWORDS):
+        for keywords in lexicon.values():
+            words.update(keywords)
+    return sorted(words)
+
+
+VOCABULARY = _vocabulary()
+LEXICON_FINGERPRINT = hashlib.sha256(json.dumps(
+    [THEME_KEYWORDS, MECHANIC_CATEGORIES, GAMEPLAY_KEYWORDS, SPECIAL_ELEMENTS, KEYWORD_ALIASES], ensure_ascii=False
+).encode("utf-8")).hexdigest()[:16]
+MASK_WORDS = (len(VOCABULARY) + 63) // 64  # 필드당 uint64 개수
+
+
+def _trie_pattern(words: Sequence[str]) -> str:
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}  # 키워드 끝
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            return (body if len(branches) > 1 else "(?:" + body + ")") + "?"
+        return body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """어휘 전체를 한 번에 찾는 다중 패턴 매처. mask(text)는 text에 부분 문자열로 들어 있는 키워드 비트 OR."""
+
+    def __init__(self, vocabulary: Sequence[str] = VOCABULARY, aliases: Dict[str, List[str]] = KEYWORD_ALIASES):
+        self.vocabulary = list(vocabulary)
+        self.bit = {word: 1 << i for i, word in enumerate(self.vocabulary)}
+        # 찾을 문자열 → 켤 비트 (별칭은 영어 키워드의 비트)
+        targets = dict(self.bit)
+        for word, words in aliases.items():
+            for alias in words:
+                targets[alias] = targets.get(alias, 0) | self.bit[word]
+        # 트라이 형태 정규식: 위치마다 첫 글자 하나로 분기하고, 더 긴 키워드를 먼저 시도(탐욕적 선택 그룹)
+        self.pattern = re.compile("(?=(" + _trie_pattern(list(targets)) + "))")
+        # 같은 위치에서 함께 맞는 키워드 = 잡힌 문자열의 접두사인 문자열
+        self.closure = {
+            word: functools.reduce(operator.or_, (bits for other, bits in targets.items() if word.startswith(other)), 0)
+            for word in targets
+        }
+
+    def mask(self, text: str) -> int:
+        mask = 0
+        for match in self.pattern.finditer(text.lower()):
+            mask |= self.closure[match.group(1)]
+        return mask
+
+    def words(self, mask: int, keywords: Sequence[str]) -> List[str]:
+        """keywords 순서를 유지한 채 mask에 포함된 것만."""
+        return [kw for kw in keywords if mask & self.bit[kw]]
+
+    def group_mask(self, keywords: Sequence[str]) -> int:
+        return sum(self.bit[kw] for kw in set(keywords))
+
+
+MATCHER = KeywordMatcher()
+
+
+def _field_text(row: Dict[str, Any], name: str) -> str:
+    value = row.get(name, '')
+    return value if isinstance(value, str) else ('' if value is None else str(value))
+
+
+def query_masks(theme: str, mechanics: Sequence[str], description: str) -> Masks:
+    """입력 기획안 1건의 (테마, 메커닉, 설명) 비트셋."""
+    return MATCHER.mask(theme), MATCHER.mask(' '.join(mechanics)), MATCHER.mask(description)
+
+
+def candidate_masks(row: Dict[str, Any]) -> Masks:
+    """후보 메타 1행의 (카테고리, 메커닉, 설명) 비트셋."""
+    return tuple(MATCHER.mask(_field_text(row, name)) for name in CANDIDATE_FIELDS)
+
+
+# ---------- 공통 요소 ----------
+
+def _groups(lexicon: Dict[str, List[str]]) -> List[Tuple[str, List[str], int]]:
+    return [(name, keywords, MATCHER.group_mask(keywords)) for name, keywords in lexicon.items()]
+
+
+_THEME_GROUPS = _groups(THEME_KEYWORDS)
+_MECHANIC_GROUPS = _groups(MECHANIC_CATEGORIES)
+_GAMEPLAY_GROUPS = _groups(GAMEPLAY_KEYWORDS)
+
+
+def overlapping_elements(query: Masks, candidate: Masks, limit: int = 5) -> List[str]:
+    """두 게임 간 중복되는 요소 (비트 AND만 사용)."""
+    overlapping = []
+
+    # 1. 테마/카테고리
+    for theme_name, keywords, group in _THEME_GROUPS:
+        if query[0] & group and candidate[0] & group:
+            matching_keywords = MATCHER.words(query[0] & candidate[0], keywords)
+            if matching_keywords:
+                overlapping.append(f"테마 유사성: {theme_name} 테마 (키워드: {', '.join(matching_keywords)})")
+            else:
+                # 키워드가 직접 매칭되지 않았지만 카테고리적으로 유사한 경우
+                overlapping.append(f"테마 유사성: {theme_name} 계열 테마")
+
+    # 2. 게임 규칙
+    for mechanic_name, keywords, group in _MECHANIC_GROUPS:
+        if query[1] & group and candidate[1] & group:
+            matching_keywords = MATCHER.words(query[1] & candidate[1], keywords)
+            if matching_keywords:
+                overlapping.append(f"규칙 유사성: {mechanic_name} (공통 키워드: {', '.join(matching_keywords)})")
+            else:
+                overlapping.append(f"규칙 유사성: {mechanic_name} 계열")
+
+    # 3. 게임 설명/목표
+    for aspect_name, keywords, group in _GAMEPLAY_GROUPS:
+        matching_keywords = MATCHER.words(query[2] & candidate[2], keywords)
+        if matching_keywords:
+            overlapping.append(f"게임플레이 유사성: {aspect_name} (공통: {', '.join(matching_keywords)})")
+
+    # 4. 특별한 게임 요소 (키워드에 공백이 없으므로 세 필드 OR = 이어 붙인 텍스트 검사와 같음)
+    common = (query[0] | query[1] | query[2]) & (candidate[0] | candidate[1] | candidate[2])
+    for element in MATCHER.words(common, SPECIAL_ELEMENTS):
+        overlapping.append(f"구성 요소 유사성: {element}")
+
+    return overlapping[:limit]
+
+
+# ---------- 인덱스 저장 / 로드 ----------
+
+def _to_words(mask: int) -> List[int]:
+    return [(mask >> (64 * w)) & 0xFFFFFFFFFFFFFFFF for w in range(MASK_WORDS)]
+
+
+def _from_words(words: np.ndarray) -> int:
+    return int.from_bytes(np.ascontiguousarray(words, dtype="<u8").tobytes(), "little")
+
+
+def encode_masks(rows: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """후보 메타 행들의 비트셋 (N, 3, MASK_WORDS) uint64."""
+    bits = np.zeros((len(rows), len(CANDIDATE_FIELDS), MASK_WORDS), dtype="<u8")
+    for i, row in enumerate(rows):
+        for f, mask in enumerate(candidate_masks(row)):
+            bits[i, f] = _to_words(mask)
+    return bits
+
+
+def write_keyword_bits(directory: Path, rows: Sequence[Dict[str, Any]]):
+    np.save(Path(directory) / KEYWORDS_FILE, encode_masks(rows))
+    with open(Path(directory) / KEYWORDS_META_FILE, "w", encoding="utf-8") as f:
+        json.dump({"fingerprint": LEXICON_FINGERPRINT, "fields": list(CANDIDATE_FIELDS),
+                   "vocabulary": VOCABULARY}, f, ensure_ascii=False)
+
+
+def load_keyword_bits(directory: Path) -> Optional[np.ndarray]:
+    """저장된 비트셋(mmap). 없거나 사전이 바뀌었으면 None (메타에서 다시 계산)."""
+    try:
+        with open(Path(directory) / KEYWORDS_META_FILE, "r", encoding="utf-8") as f:
+            info = json.load(f)
+    except FileNotFoundError:
+        return None
+    if info.get("fingerprint") != LEXICON_FINGERPRINT or info.get("vocabulary") != VOCABULARY:
+        print(f"키워드 사전이 바뀌어 저장된 비트셋을 쓰지 않습니다: {directory}")
+        return None
+    return np.load(Path(directory) / KEYWORDS_FILE, mmap_mode="r")
+
+
+def row_masks(bits: np.ndarray, i: int) -> Masks:
+    row = bits[i]
+    return tuple(_from_words(row[f]) for f in range(len(CANDIDATE_FIELDS)))
@@ -0,0 +1,129 @@
+"""
+저작권 검사 폴백용 어휘(lexical) 유사도 엔진
+
+임베딩 캐시나 SentenceTransformer가 없을 때 simple_similarity.compute_similarity_simple은
+후보 ~1만 건마다 difflib.SequenceMatcher + 정규식 자카드를 파이썬으로 계산해 요청당 수 초 이상 걸린다.
+
+LexicalIndex는 후보 텍스트로 희소 TF-IDF 행렬 두 개를 한 번만 만들어 두고 쿼리는 희소 행렬-벡터 곱으로 채점한다.
+행렬은 (어휘, 후보) CSR(역색인)로 전치해 보관하므로 쿼리에 등장한 n-gram 행만 읽는다.
+절반 이상의 후보에 나오는 n-gram(max_df=0.5)은 변별력이 거의 없고 곱셈 비용만 키우므로 제외한다.
+- 문자 n-gram(char_wb 3~5) TF-IDF 코사인 : 철자/어형 변화에 강한 문자열 유사도 (SequenceMatcher 자리)
+- 단어 TF-IDF 코사인                        : 키워드 겹침 (자카드 자리)
+기존과 같이 70% / 30% 가중 평균한 0~1 점수를 후보 순서대로 돌려준다.
+
+벤치마크:
+    python -m copyright.lexical <store 디렉터리 또는 CSV> --queries 20
+"""
+import time
+import argparse
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from .search import top_k, top_k_rows
+
+CHAR_WEIGHT = 0.7
+WORD_WEIGHT = 0.3
+
+
+class LexicalIndex:
+    def __init__(self, candidate_texts: Sequence[str]):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        texts = list(candidate_texts)
+        self.char_vectorizer = TfidfVectorizer(analyzer="char_wb", ngram_range=(3, 5), sublinear_tf=True,
+                                               min_df=2, max_df=0.5, dtype=np.float32)
+        self.word_vectorizer = TfidfVectorizer(token_pattern=r"(?u)\b\w+\b", sublinear_tf=True, dtype=np.float32)
+        # 행 단위 L2 정규화된 (N, V) 행렬 → 내적이 곧 코사인 유사도. (V, N) 역색인으로 보관
+        self.char_index = self.char_vectorizer.fit_transform(texts).T.tocsr()
+        self.word_index = self.word_vectorizer.fit_transform(texts).T.tocsr()
+
+    def __len__(self) -> int:
+        return self.char_index.shape[1]
+
+    def score_matrix(self, input_texts: List[str]) -> np.ndarray:
+        """(Q, N) 점수 행렬."""
+        char = self.char_vectorizer.transform(input_texts) @ self.char_index
+        word = self.word_vectorizer.transform(input_texts) @ self.word_index
+        return (CHAR_WEIGHT * char + WORD_WEIGHT * word).toarray().astype(np.float32, copy=False)
+
+    def scores(self, input_text: str) -> np.ndarray:
+        """compute_similarity_simple(input_text, candidate_texts)와 같은 자리에 쓰는 후보별 0~1 점수."""
+        return self.score_matrix([input_text])[0]
+
+    def search(self, input_text: str, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        scores = self.scores(input_text)
+        idx = top_k(scores, k)
+        return idx, scores[idx]
+
+    def search_batch(self, input_texts: List[str], k: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        idx, scores = top_k_rows(self.score_matrix(input_texts), k)
+        return list(zip(idx, scores))
+
+
+def _load_texts(path: Path) -> List[str]:
+    if path.is_dir():
+        from .columnar import ColumnarStore
+        return list(ColumnarStore(path).text_column("candidate_text"))
+    import pandas as pd
+    df = pd.read_csv(path, encoding="latin1")
+    return [
+        f"{str(r.get('category',''))} {str(r.get('mechanic',''))} {str(r.get('Description',''))}"
+        for _, r in df.iterrows()
+    ]
+
+
+def main():
+    from .simple_similarity import compute_similarity_simple
+
+    parser = argparse.ArgumentParser(description="어휘 유사도 엔진 vs 기존 simple 유사도 벤치마크")
+    parser.add_argument("source", help="컬럼 저장소(store/) 디렉터리 또는 bgg_data.csv")
+    parser.add_argument("--queries", type=int, default=20, help="측정할 쿼리 수 (후보 일부를 변형해서 사용)")
+    parser.add_argument("--baseline-queries", type=int, default=3, help="기존 구현으로 측정할 쿼리 수 (느림)")
+    parser.add_argument("--k", type=int, default=3)
+    args = parser.parse_args()
+
+    texts = _load_texts(Path(args.source))
+    rng = np.random.default_rng(0)
+    # 후보 텍스트의 단어 일부를 지워 "비슷하지만 같지 않은" 쿼리를 만든다
+    queries, sources = [], rng.choice(len(texts), size=args.queries, replace=False)
+    for i in sources:
+        words = texts[i].split()
+        keep = rng.random(len(words)) > 0.3
+        queries.append(" ".join(w for w, kept in zip(words, keep) if kept))
+
+    started = time.perf_counter()
+    index = LexicalIndex(texts)
+    build_seconds = time.perf_counter() - started
+
+    latencies, results = [], []
+    for q in queries:
+        started = time.perf_counter()
+        results.append(index.search(q, args.k)[0])
+        latencies.append(time.perf_counter() - started)
+
+    baseline, baseline_hits, agree = [], 0, 0
+    for q, source, lexical_idx in zip(queries[:args.baseline_queries], sources, results):
+        started = time.perf_counter()
+        scores = np.asarray(compute_similarity_simple(q, texts), dtype=np.float32)
+        baseline.append(time.perf_counter() - started)
+        simple_idx = top_k(scores, args.k)
+        baseline_hits += int(source in simple_idx)
+        agree += len(set(simple_idx.tolist()) & set(lexical_idx.tolist()))
+    # 원본 후보가 top-k 안에 들어오는 비율 (변형 쿼리의 정답)
+    hits = sum(int(source in idx) for source, idx in zip(sources, results))
+
+    print(f"후보 {len(texts)}건, 문자 n-gram {index.char_index.shape[0]}개 / 단어 {index.word_index.shape[0]}개")
+    print(f"인덱스 생성: {build_seconds:.2f}초, "
+          f"행렬 {(index.char_index.data.nbytes + index.word_index.data.nbytes) / 1024 / 1024:.1f}MB")
+    print(f"LexicalIndex  쿼리 평균 {np.mean(latencies) * 1000:.1f}ms, p99 {np.percentile(latencies, 99) * 1000:.1f}ms, "
+          f"원본 hit@{args.k} {hits / len(queries):.2f}")
+    if baseline:
+        print(f"기존 simple   쿼리 평균 {np.mean(baseline) * 1000:.1f}ms ({len(baseline)}건), "
+              f"원본 hit@{args.k} {baseline_hits / len(baseline):.2f}")
+        print(f"top-{args.k} 일치율(기존 대비): {agree / (args.k * len(baseline)):.2f}")
+
+
+if __name__ == "__main__":
+    main()
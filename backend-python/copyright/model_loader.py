@@ -1,13 +1,30 @@
-from sentence_transformers import SentenceTransformer
+import os
 
 MODEL_NAMES = {
     "mini": "paraphrase-MiniLM-L6-v2",
     "mini12": "all-MiniLM-L12-v2",
     "qa": "multi-qa-MiniLM-L6-cos-v1",
-    "t5": "sentence-transformers/gtr-t5-base"
+    "t5": "sentence-transformers/gtr-t5-base",
+    # 한국어 기획안을 번역 없이 영어 BGG 후보와 같은 공간에 임베딩
+    "multi": "paraphrase-multilingual-MiniLM-L12-v2"
 }
 
-def load_model(name: str):
+# 입력을 영어로 번역하지 않아도 되는 모델 키 (GPT 번역 단계를 건너뜀)
+MULTILINGUAL_MODEL_KEYS = {"multi"}
+
+# 쿼리 인코더 백엔드: torch(SentenceTransformer) | onnx(int8 양자화) | onnx-fp32
+ENCODER_BACKEND = os.getenv("COPYRIGHT_ENCODER_BACKEND", "torch").lower()
+
+def load_model(name: str, backend: str = ENCODER_BACKEND):
     if name not in MODEL_NAMES:
         raise ValueError(f"지원하지 않는 모델: {name}")
-    return SentenceTransformer(MODEL_NAMES[name])
\ No newline at end of file
+    if backend in ("onnx", "onnx-fp32"):
+        # 내보낸 ONNX 모델이 있으면 torch 없이 onnxruntime으로 (python -m copyright.onnx_encoder --model <name>)
+        from .onnx_encoder import load_onnx_encoder
+        model = load_onnx_encoder(name, quantized=backend == "onnx")
+        if model is not None:
+            return model
+        print(f"ONNX 모델이 없어 torch 백엔드를 사용합니다: python -m copyright.onnx_encoder --model {name}")
+    # sentence-transformers(torch) import는 무거우므로 실제 로드할 때만
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(MODEL_NAMES[name])
@@ -0,0 +1,142 @@
+"""
+다국어 인코더(번역 생략) vs 기존 경로(GPT 번역 + 영어 인코더) 결과 비교 리포트
+
+같은 기획안을 두 경로로 채점해 결과가 얼마나 같은지와, 번역 단계를 빼서 아끼는 시간을 본다.
+- 기준: GPT 추출 → GPT 번역 → --baseline 모델 (기본 mini12)
+- 비교: GPT 추출 → --model 다국어 모델 (기본 multi, 한국어 그대로)
+- 지표: top-k 유사 게임 겹침 비율, top-1 일치율, 위험도 일치율, 최고 점수 차이, GPT 추출/번역 지연시간
+
+입력은 JSONL 한 줄에 기획안 하나:
+    {"planId": 1, "summaryText": "..."}                          # GPT로 추출/번역 (OPENAI_API_KEY 필요)
+    {"planId": 1, "extracted": {...}, "translated": {...}}       # 저장해 둔 추출/번역 결과 (GPT 호출 없음)
+--save-pairs로 GPT 결과를 두 번째 형식으로 저장해 두면 이후에는 GPT 없이 다시 비교할 수 있다.
+
+사용법 (두 모델의 인덱스가 먼저 있어야 함: python -m copyright.indexer --model multi):
+    python -m copyright.multilingual_report plans.jsonl --k 3 --save-pairs pairs.jsonl --output multi.json
+"""
+import json
+import time
+import asyncio
+import argparse
+from typing import List, Optional
+
+import numpy as np
+
+from .schemas import ExtractedGameData, TranslatedGameData
+
+
+async def _run_gpt(plans: List[dict], concurrency: int) -> List[dict]:
+    """summaryText만 있는 기획안을 GPT로 추출/번역하고 호출별 지연시간을 기록한다."""
+    from .gpt_processor import GameDataExtractor
+
+    extractor = GameDataExtractor()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(plan: dict) -> dict:
+        if "extracted" in plan:
+            return plan
+        async with semaphore:
+            started = time.perf_counter()
+            extracted = await extractor.extract_game_data(plan["planId"], plan["summaryText"])
+            extracted_at = time.perf_counter()
+            translated = await extractor.translate_to_english(extracted)
+            finished = time.perf_counter()
+        return {**plan, "extracted": extracted.model_dump(), "translated": translated.model_dump(),
+                "extractSeconds": round(extracted_at - started, 3),
+                "translateSeconds": round(finished - extracted_at, 3)}
+
+    return await asyncio.gather(*(run(plan) for plan in plans))
+
+
+def _latency(values: List[float]) -> Optional[dict]:
+    if not values:
+        return None
+    return {"p50Ms": round(float(np.percentile(values, 50)) * 1000, 1),
+            "p99Ms": round(float(np.percentile(values, 99)) * 1000, 1),
+            "meanMs": round(float(np.mean(values)) * 1000, 1)}
+
+
+def run_report(plans: List[dict], baseline_key: str, model_key: str, k: int) -> dict:
+    from .copyright_analyzer import CopyrightAnalyzer
+
+    translated = [TranslatedGameData(**plan["translated"]) for plan in plans]
+    # 다국어 경로: 추출 결과(한국어)를 번역 없이 그대로 채점 (서비스의 process_plan(translate=False)와 같은 변환)
+    untranslated = [TranslatedGameData(**ExtractedGameData(**plan["extracted"]).model_dump()) for plan in plans]
+
+    # 비교용 실행이 기획안 벡터 저장소(rescreen.py)에 남지 않도록
+    baseline = CopyrightAnalyzer(baseline_key, record_plans=False)
+    started = time.perf_counter()
+    expected = baseline.analyze_batch(translated)
+    baseline_seconds = time.perf_counter() - started
+    baseline.close()
+
+    multilingual = CopyrightAnalyzer(model_key, record_plans=False)
+    started = time.perf_counter()
+    actual = multilingual.analyze_batch(untranslated)
+    model_seconds = time.perf_counter() - started
+    multilingual.close()
+
+    overlap, top1, risk, score_diff, per_plan = [], [], [], [], []
+    for plan, ref, res in zip(plans, expected, actual):
+        ref_titles = [g.title for g in ref.similarGames[:k]]
+        titles = [g.title for g in res.similarGames[:k]]
+        ref_top = ref.similarGames[0].similarityScore if ref.similarGames else 0.0
+        top = res.similarGames[0].similarityScore if res.similarGames else 0.0
+        overlap.append(len(set(ref_titles) & set(titles)) / max(len(ref_titles), 1))
+        top1.append(bool(ref_titles) and bool(titles) and ref_titles[0] == titles[0])
+        risk.append(ref.riskLevel == res.riskLevel)
+        score_diff.append(abs(ref_top - top))
+        per_plan.append({"planId": plan["planId"], "baseline": ref_titles, "multilingual": titles,
+                         "baselineRisk": ref.riskLevel, "multilingualRisk": res.riskLevel,
+                         "baselineTopScore": ref_top, "multilingualTopScore": top})
+
+    extract_times = [p["extractSeconds"] for p in plans if "extractSeconds" in p]
+    translate_times = [p["translateSeconds"] for p in plans if "translateSeconds" in p]
+    report = {
+        "numPlans": len(plans), "k": k, "baseline": baseline_key, "multilingual": model_key,
+        "agreement": {
+            f"top{k}Overlap": round(float(np.mean(overlap)), 4) if plans else None,
+            "top1Match": round(float(np.mean(top1)), 4) if plans else None,
+            "riskLevelMatch": round(float(np.mean(risk)), 4) if plans else None,
+            "topScoreAbsDiffMean": round(float(np.mean(score_diff)), 2) if plans else None,
+        },
+        "scoringSeconds": {"baseline": round(baseline_seconds, 3), "multilingual": round(model_seconds, 3)},
+        "gpt": {"extract": _latency(extract_times), "translate": _latency(translate_times)},
+        "plans": per_plan,
+    }
+    if extract_times and translate_times:
+        # 번역 단계를 빼면 기획안 1건의 GPT 대기시간이 추출만큼으로 줄어든다
+        total = np.mean(extract_times) + np.mean(translate_times)
+        report["gpt"]["translateShareOfGpt"] = round(float(np.mean(translate_times) / total), 4)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="다국어 인코더(번역 생략) vs 번역 + 영어 인코더 비교 리포트")
+    parser.add_argument("plans", help="기획안 JSONL (summaryText 또는 extracted/translated)")
+    parser.add_argument("--model", default="multi", help="번역 없이 쓸 다국어 모델 키")
+    parser.add_argument("--baseline", default="mini12", help="번역 후 쓰는 기준 모델 키")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=4, help="GPT 추출/번역 동시 호출 수")
+    parser.add_argument("--save-pairs", help="추출/번역 결과를 저장할 JSONL (다음 실행의 입력으로 사용)")
+    parser.add_argument("--output", help="JSON 저장 경로 (없으면 표준출력)")
+    args = parser.parse_args()
+
+    with open(args.plans, "r", encoding="utf-8") as f:
+        plans = [json.loads(line) for line in f if line.strip()]
+    if any("extracted" not in plan for plan in plans):
+        plans = asyncio.run(_run_gpt(plans, args.concurrency))
+    if args.save_pairs:
+        with open(args.save_pairs, "w", encoding="utf-8") as f:
+            for plan in plans:
+                f.write(json.dumps(plan, ensure_ascii=False) + "\n")
+
+    report = json.dumps(run_report(plans, args.baseline, args.model, args.k), ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
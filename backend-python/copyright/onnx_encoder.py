@@ -0,0 +1,181 @@
+"""
+저작권 쿼리 인코더 ONNX(int8) CPU 백엔드
+
+요청마다 PyTorch로 MiniLM forward를 돌리면 torch import 시간/메모리가 워커마다 붙는다.
+SentenceTransformer 파이프라인(트랜스포머 + 풀링 + Dense)을 그래프 하나로 ONNX 내보내기 한 뒤
+가중치를 int8 동적 양자화해서 onnxruntime CPU로 실행한다. 토크나이저는 tokenizers(Rust)만 쓴다.
+
+- 풀링/Dense는 SentenceTransformer 모듈을 그대로 그래프에 넣어 내보내므로 torch 경로와 같은 연산이다
+- 정규화는 SentenceTransformer와 같은 L2 정규화(eps=1e-12)를 numpy로 적용한다
+- 토큰화도 SentenceTransformer와 같게: 앞뒤 공백 제거, max_seq_length로 자르기, 배치 내 최장 길이로 패딩
+
+내보내기 (torch / sentence-transformers / onnx 필요, 서비스 워커에는 onnxruntime + tokenizers만 필요):
+    python -m copyright.onnx_encoder --model mini12
+    python -m copyright.onnx_encoder --model mini12 --source /models/all-MiniLM-L12-v2   # 로컬 모델 경로
+
+사용: COPYRIGHT_ENCODER_BACKEND=onnx (model_loader.load_model 참고). torch 경로와의 비교는 copyright.onnx_parity
+"""
+import os
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+ONNX_ROOT = Path(os.getenv("COPYRIGHT_ONNX_DIR", str(Path(__file__).resolve().parent / "onnx")))
+# 0이면 onnxruntime 기본값(물리 코어 수)
+ONNX_THREADS = int(os.getenv("COPYRIGHT_ONNX_THREADS", "0"))
+ONNX_CONFIG_FILE = "onnx_config.json"
+ONNX_FP32_FILE = "model.onnx"
+ONNX_INT8_FILE = "model.int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+
+
+def onnx_dir(model_key: str) -> Path:
+    return ONNX_ROOT / model_key
+
+
+class OnnxSentenceEncoder:
+    """SentenceTransformer.encode와 같은 인자로 쓰는 ONNX 인코더 (MicroBatchEncoder / 분석기에서 그대로 사용)."""
+
+    def __init__(self, model_dir, quantized: bool = True, threads: int = ONNX_THREADS):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_dir = Path(model_dir)
+        with open(model_dir / ONNX_CONFIG_FILE, "r", encoding="utf-8") as f:
+            self.config = json.load(f)
+        self.model_path = model_dir / (ONNX_INT8_FILE if quantized else ONNX_FP32_FILE)
+        self.variant = "onnx-int8" if quantized else "onnx-fp32"
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(str(self.model_path), options, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+        self.tokenizer = Tokenizer.from_file(str(model_dir / TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=self.config["max_seq_length"])
+        self.tokenizer.enable_padding(pad_id=self.config["pad_token_id"], pad_token=self.config["pad_token"])
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.config["dimension"]
+
+    def memory_bytes(self) -> int:
+        return self.model_path.stat().st_size
+
+    def _forward(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch([t.strip() for t in texts])
+        feeds = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        return self.session.run(None, {name: feeds[name] for name in self.input_names})[0]
+
+    def encode(self, sentences, batch_size: int = 32, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = False, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.empty((0, self.config["dimension"]), dtype=np.float32)
+        # SentenceTransformer처럼 길이순으로 묶어 패딩을 줄이고 원래 순서로 되돌린다
+        order = np.argsort([-len(t) for t in texts], kind="stable")
+        out = np.empty((len(texts), self.config["dimension"]), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            chunk = order[start:start + batch_size]
+            out[chunk] = self._forward([texts[i] for i in chunk])
+        if normalize_embeddings:
+            # torch.nn.functional.normalize(p=2, eps=1e-12)와 동일
+            out /= np.maximum(np.linalg.norm(out, axis=1, keepdims=True), 1e-12)
+        return out[0] if single else out
+
+
+def load_onnx_encoder(model_key: str, quantized: bool = True) -> Optional[OnnxSentenceEncoder]:
+    """내보낸 ONNX 모델이 있으면 인코더, 없으면 None."""
+    model_dir = onnx_dir(model_key)
+    if not (model_dir / ONNX_CONFIG_FILE).exists():
+        return None
+    return OnnxSentenceEncoder(model_dir, quantized=quantized)
+
+
+# ---------- 내보내기 ----------
+
+def export_onnx(model_key: str, source: Optional[str] = None, out_dir: Optional[Path] = None,
+                quantize: bool = True, opset: int = 17) -> Path:
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from .model_loader import MODEL_NAMES
+
+    out_dir = Path(out_dir or onnx_dir(model_key))
+    out_dir.mkdir(parents=True, exist_ok=True)
+    model = SentenceTransformer(source or MODEL_NAMES[model_key], device="cpu")
+    model.eval()
+    tokenizer = model.tokenizer
+    input_names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in tokenizer.model_input_names]
+
+    class _Pipeline(torch.nn.Module):
+        """Normalize 이전까지의 SentenceTransformer 모듈(트랜스포머 → 풀링 → Dense)을 그대로 실행."""
+
+        def __init__(self):
+            super().__init__()
+            self.modules_ = torch.nn.ModuleList(m for m in model if type(m).__name__ != "Normalize")
+
+        def forward(self, *tensors):
+            features = dict(zip(input_names, tensors))
+            for module in self.modules_:
+                features = module(features)
+            return features["sentence_embedding"]
+
+    sample = tokenizer(["board game warm-up", "a longer sample sentence for export"], padding=True,
+                       return_tensors="pt")
+    args = tuple(sample[n] for n in input_names)
+    dynamic_axes = {n: {0: "batch", 1: "sequence"} for n in input_names}
+    dynamic_axes["sentence_embedding"] = {0: "batch"}
+    fp32_path = out_dir / ONNX_FP32_FILE
+    with torch.no_grad():
+        torch.onnx.export(_Pipeline(), args, str(fp32_path), input_names=input_names,
+                          output_names=["sentence_embedding"], dynamic_axes=dynamic_axes,
+                          opset_version=opset, dynamo=False)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(str(fp32_path), str(out_dir / ONNX_INT8_FILE), weight_type=QuantType.QInt8)
+
+    tokenizer.backend_tokenizer.save(str(out_dir / TOKENIZER_FILE))
+    with open(out_dir / ONNX_CONFIG_FILE, "w", encoding="utf-8") as f:
+        json.dump({
+            "model_key": model_key,
+            "source": source or MODEL_NAMES[model_key],
+            "dimension": model.get_sentence_embedding_dimension(),
+            "max_seq_length": model.max_seq_length,
+            "pad_token": tokenizer.pad_token,
+            "pad_token_id": tokenizer.pad_token_id,
+            "input_names": input_names,
+            "modules": [type(m).__name__ for m in model],
+            "exported_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }, f, ensure_ascii=False, indent=2)
+    return out_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="저작권 쿼리 인코더를 ONNX(int8)로 내보내기")
+    parser.add_argument("--model", default="mini12", help="mini|mini12|qa|t5|multi 중 선택")
+    parser.add_argument("--source", default=None, help="모델 이름 대신 쓸 로컬 SentenceTransformer 경로")
+    parser.add_argument("--out", default=None, help=f"출력 디렉터리 (기본: {ONNX_ROOT}/<model>)")
+    parser.add_argument("--no-quantize", action="store_true", help="int8 양자화 모델을 만들지 않음")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    out_dir = export_onnx(args.model, args.source, Path(args.out) if args.out else None, not args.no_quantize)
+    sizes = {p.name: f"{p.stat().st_size / 1024 / 1024:.1f}MB" for p in sorted(out_dir.glob("*.onnx"))}
+    print(f"ONNX 내보내기 완료: {out_dir} {sizes} ({time.perf_counter() - started:.1f}초)")
+    print(f"비교: python -m copyright.onnx_parity --model {args.model}"
+          + (f" --source {args.source}" if args.source else ""))
+
+
+if __name__ == "__main__":
+    main()
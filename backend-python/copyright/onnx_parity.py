@@ -0,0 +1,191 @@
+"""
+ONNX(int8/fp32) 쿼리 인코더 vs PyTorch SentenceTransformer 일치도 / 지연시간 / 메모리 리포트
+
+- 일치도: 같은 텍스트 임베딩의 코사인, 쿼리 × 후보 코사인 점수 차이(최대/평균), top-k 일치율
+- 지연시간: 쿼리 1건 encode p50/p99 (/copyright-plan 경로와 같은 호출)
+- 메모리: 백엔드마다 별도 프로세스에서 import + 로드 + encode 1회 후 RSS / 최대 RSS(VmHWM)와 로드 시간
+
+텍스트는 저작권 인덱스(copyright/cache/<model>)의 후보 텍스트를 쓰고, 없으면 내장 예문을 쓴다.
+쿼리는 후보 텍스트에서 단어 일부를 지운 변형이다.
+
+사용법 (먼저 python -m copyright.onnx_encoder --model mini12):
+    python -m copyright.onnx_parity --model mini12 --texts 500 --output parity.json
+"""
+import sys
+import json
+import time
+import argparse
+import subprocess
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from .onnx_encoder import ONNX_FP32_FILE, onnx_dir
+from .search import top_k_rows
+
+SAMPLE_TEXTS = [
+    "Fantasy adventure with dragons and wizards exploring a medieval kingdom",
+    "Economic trading game where players manage resources and build markets",
+    "Cooperative horror game fighting zombies in a dark abandoned city",
+    "Deck building card game with tactical combat and hand management",
+    "Worker placement strategy game about building an ancient empire",
+    "Dice rolling space exploration with alien encounters and robots",
+    "Tile placement game creating a territory map of medieval cities",
+    "Quick party game with simple rules for large groups of players",
+]
+
+
+def _load_texts(model_key: str, count: int, candidates: Optional[str] = None) -> List[str]:
+    cache_dir = Path(__file__).resolve().parent / "cache" / model_key
+    try:
+        if candidates:
+            from .lexical import _load_texts as load_candidate_texts
+            texts = load_candidate_texts(Path(candidates))
+        else:
+            from .shards import ShardedIndex, load_manifest
+            manifest = load_manifest(cache_dir)
+            texts = list(ShardedIndex(cache_dir, manifest).candidate_texts) if manifest else []
+    except Exception as e:
+        print(f"후보 텍스트를 읽지 못해 내장 예문 사용: {e}", file=sys.stderr)
+        texts = []
+    texts = [t for t in texts if t.strip()] or SAMPLE_TEXTS
+    rng = np.random.default_rng(0)
+    picks = rng.choice(len(texts), size=count, replace=count > len(texts))
+    return [texts[i] for i in picks]
+
+
+def _perturb(texts: List[str], seed: int = 1) -> List[str]:
+    rng = np.random.default_rng(seed)
+    queries = []
+    for text in texts:
+        words = text.split()
+        keep = rng.random(len(words)) > 0.3
+        queries.append(" ".join(w for w, kept in zip(words, keep) if kept) or text)
+    return queries
+
+
+def _latency(model, queries: List[str], runs: int) -> dict:
+    model.encode([queries[0]], normalize_embeddings=True)  # 첫 호출 비용 제외
+    latencies = []
+    for i in range(runs):
+        started = time.perf_counter()
+        model.encode([queries[i % len(queries)]], batch_size=1, normalize_embeddings=True)
+        latencies.append(time.perf_counter() - started)
+    return {"p50Ms": round(float(np.percentile(latencies, 50)) * 1000, 2),
+            "p99Ms": round(float(np.percentile(latencies, 99)) * 1000, 2),
+            "meanMs": round(float(np.mean(latencies)) * 1000, 2)}
+
+
+def _parity(reference: np.ndarray, ref_scores: np.ndarray, vectors: np.ndarray, queries: np.ndarray,
+            candidates: np.ndarray, k: int) -> dict:
+    cosine = np.sum(reference * vectors, axis=1)
+    scores = queries @ candidates.T
+    ref_top, _ = top_k_rows(ref_scores, k)
+    top, _ = top_k_rows(scores, k)
+    agree = np.mean([len(set(a) & set(b)) / k for a, b in zip(ref_top.tolist(), top.tolist())])
+    diff = np.abs(scores - ref_scores)
+    return {
+        "embeddingCosineMin": round(float(cosine.min()), 5),
+        "embeddingCosineMean": round(float(cosine.mean()), 5),
+        "scoreAbsDiffMax": round(float(diff.max()), 5),
+        "scoreAbsDiffMean": round(float(diff.mean()), 5),
+        f"top{k}Agreement": round(float(agree), 4),
+    }
+
+
+def _load(backend: str, model_key: str, source: str):
+    if backend == "torch":
+        from sentence_transformers import SentenceTransformer
+        from .model_loader import MODEL_NAMES
+        return SentenceTransformer(source or MODEL_NAMES[model_key], device="cpu")
+    from .onnx_encoder import OnnxSentenceEncoder
+    return OnnxSentenceEncoder(onnx_dir(model_key), quantized=backend == "onnx-int8")
+
+
+def _proc_status_mb(*fields: str) -> dict:
+    # getrusage의 ru_maxrss는 exec 이전(부모) 값을 물려받으므로 /proc/self/status의 현재 주소공간 값을 쓴다
+    values = {}
+    with open("/proc/self/status", "r") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in fields:
+                values[key] = round(int(rest.split()[0]) / 1024, 1)
+    return values
+
+
+def _measure_process(backend: str, model_key: str, source: str) -> dict:
+    """--measure-process 모드: 이 프로세스에서 백엔드 하나만 import/로드해 RSS를 잰다."""
+    started = time.perf_counter()
+    model = _load(backend, model_key, source)
+    model.encode(["board game warm-up"], normalize_embeddings=True)
+    memory = _proc_status_mb("VmRSS", "VmHWM")
+    return {"loadSeconds": round(time.perf_counter() - started, 2),
+            "rssMb": memory.get("VmRSS"), "maxRssMb": memory.get("VmHWM")}
+
+
+def run_report(model_key: str, source: str, num_texts: int, num_queries: int, k: int, runs: int,
+               candidates: Optional[str] = None) -> dict:
+    texts = _load_texts(model_key, num_texts, candidates)
+    queries = _perturb(texts[:num_queries])
+    backends = ["torch", "onnx-int8"] + (["onnx-fp32"] if (onnx_dir(model_key) / ONNX_FP32_FILE).exists() else [])
+
+    report = {"modelKey": model_key, "numTexts": len(texts), "numQueries": len(queries), "k": k, "backends": {}}
+    reference = ref_queries = ref_scores = None
+    for backend in backends:
+        model = _load(backend, model_key, source)
+        vectors = model.encode(texts, batch_size=64, normalize_embeddings=True)
+        query_vectors = model.encode(queries, batch_size=64, normalize_embeddings=True)
+        entry = {"latency": _latency(model, queries, runs)}
+        if reference is None:
+            reference, ref_queries, ref_scores = vectors, query_vectors, query_vectors @ vectors.T
+        else:
+            # 후보는 torch로 만든 인덱스를 그대로 쓰므로 쿼리만 바뀐 점수와, 양쪽 모두 바뀐 점수를 함께 본다
+            entry["parityQueryOnly"] = _parity(ref_queries, ref_scores, query_vectors, query_vectors, reference, k)
+            entry["parityBothSides"] = _parity(reference, ref_scores, vectors, query_vectors, vectors, k)
+        report["backends"][backend] = entry
+        del model
+
+    for backend in backends:
+        cmd = [sys.executable, "-m", "copyright.onnx_parity", "--model", model_key, "--measure-process", backend]
+        if source:
+            cmd += ["--source", source]
+        out = subprocess.run(cmd, capture_output=True, text=True, cwd=Path(__file__).resolve().parent.parent)
+        try:
+            report["backends"][backend]["process"] = json.loads(out.stdout.strip().splitlines()[-1])
+        except (IndexError, ValueError):
+            report["backends"][backend]["process"] = {"error": out.stderr.strip()[-300:]}
+
+    torch_p50 = report["backends"]["torch"]["latency"]["p50Ms"]
+    for backend, entry in report["backends"].items():
+        entry["speedupVsTorch"] = round(torch_p50 / entry["latency"]["p50Ms"], 2) if entry["latency"]["p50Ms"] else None
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ONNX 쿼리 인코더 vs torch 일치도 / 지연시간 / RSS 리포트")
+    parser.add_argument("--model", default="mini12", help="mini|mini12|qa|t5|multi 중 선택")
+    parser.add_argument("--source", default=None, help="모델 이름 대신 쓸 로컬 SentenceTransformer 경로")
+    parser.add_argument("--candidates", default=None, help="후보 텍스트를 읽을 store/ 디렉터리 또는 CSV (기본: 모델 인덱스)")
+    parser.add_argument("--texts", type=int, default=300, help="후보 텍스트 수")
+    parser.add_argument("--num-queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--runs", type=int, default=100, help="지연시간 측정 반복 수")
+    parser.add_argument("--measure-process", choices=["torch", "onnx-int8", "onnx-fp32"], help=argparse.SUPPRESS)
+    parser.add_argument("--output", help="JSON 저장 경로 (없으면 표준출력)")
+    args = parser.parse_args()
+
+    if args.measure_process:
+        print(json.dumps(_measure_process(args.measure_process, args.model, args.source)))
+        return
+
+    report = json.dumps(run_report(args.model, args.source, args.texts, args.num_queries, args.k, args.runs,
+                                   args.candidates), ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+저작권 분석기(모델 + 인덱스) 다중 상주 레지스트리
+
+프로세스 하나가 COPYRIGHT_MODEL_KEY 모델 하나만 서비스하던 것을, 요청의 modelKey로 고를 수 있게 한다.
+(예: 대화형 검사는 빠른 mini, 정밀 감사는 t5)
+
+- 모델 키별 CopyrightAnalyzer(인코더 + cache/<model_key> 인덱스)를 처음 요청될 때 로드한다 (같은 키 동시 요청은 한 번만 로드)
+- 상주 메모리 추정치(CopyrightAnalyzer.memory_bytes) 합이 COPYRIGHT_MODEL_MEMORY_MB를 넘으면
+  가장 오래 쓰이지 않은 분석기부터 내린다. 기본 모델 키는 내리지 않는다
+- 내려간 분석기를 잡고 있던 진행 중 요청은 그대로 끝까지 처리된다 (close 후에는 배칭 없이 encode)
+- 기본 키가 아닌 모델은 임베딩 인덱스가 있어야 한다 (없으면 simple 유사도로 대신하지 않고 503)
+"""
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from utils.resources import RESOURCE_RETRY_SECONDS, ResourceUnavailable
+from .copyright_analyzer import DEFAULT_MODEL_KEY, CopyrightAnalyzer
+from .model_loader import MODEL_NAMES
+
+# 상주 분석기들의 메모리 예산 (MB)
+MODEL_MEMORY_MB = float(os.getenv("COPYRIGHT_MODEL_MEMORY_MB", "2048"))
+# 요청에서 고를 수 있는 모델 키 (비우면 model_loader.MODEL_NAMES 전체)
+ALLOWED_MODEL_KEYS = [k.strip() for k in os.getenv("COPYRIGHT_MODEL_KEYS", "").split(",") if k.strip()] or list(MODEL_NAMES)
+
+
+class UnknownModelKey(ValueError):
+    pass
+
+
+class AnalyzerRegistry:
+    def __init__(self, default_key: str = DEFAULT_MODEL_KEY, budget_mb: float = MODEL_MEMORY_MB,
+                 allowed_keys: List[str] = ALLOWED_MODEL_KEYS):
+        self.default_key = default_key
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self.allowed_keys = list(dict.fromkeys([default_key, *allowed_keys]))
+        self._resident: "OrderedDict[str, CopyrightAnalyzer]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {key: threading.Lock() for key in self.allowed_keys}
+        self._failures: Dict[str, tuple] = {}
+        self.stats = {"hits": 0, "loads": 0, "evictions": 0, "failedLoads": 0}
+
+    def resolve(self, model_key: Optional[str]) -> str:
+        key = model_key or self.default_key
+        if key not in self.allowed_keys:
+            raise UnknownModelKey(f"지원하지 않는 modelKey: {key} (사용 가능: {', '.join(self.allowed_keys)})")
+        return key
+
+    def peek(self, model_key: Optional[str] = None) -> Optional[CopyrightAnalyzer]:
+        """로드하지 않고 상주 중인 분석기만 반환 (통계 조회용)."""
+        with self._lock:
+            return self._resident.get(self.resolve(model_key))
+
+    def get(self, model_key: Optional[str] = None) -> CopyrightAnalyzer:
+        """modelKey의 분석기. 상주하지 않으면 로드한다 (블로킹이므로 이벤트 루프에서는 스레드로 호출)."""
+        key = self.resolve(model_key)
+        with self._lock:
+            analyzer = self._resident.get(key)
+            if analyzer is not None:
+                self._resident.move_to_end(key)
+                self.stats["hits"] += 1
+                return analyzer
+
+        with self._load_locks[key]:
+            with self._lock:
+                analyzer = self._resident.get(key)
+                if analyzer is not None:
+                    # 기다리는 동안 다른 요청이 로드함
+                    self._resident.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return analyzer
+            failure = self._failures.get(key)
+            if failure is not None and time.time() - failure[0] < RESOURCE_RETRY_SECONDS:
+                raise ResourceUnavailable(f"copyright.model.{key}", failure[1])
+
+            started = time.perf_counter()
+            try:
+                analyzer = CopyrightAnalyzer(key)
+                if key != self.default_key and not analyzer.use_transformer:
+                    analyzer.close()
+                    raise RuntimeError(f"임베딩 인덱스 또는 모델이 없습니다. 먼저 생성하세요: python -m copyright.indexer --model {key}")
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                self._failures[key] = (time.time(), error)
+                with self._lock:
+                    self.stats["failedLoads"] += 1
+                raise ResourceUnavailable(f"copyright.model.{key}", error) from e
+            self._failures.pop(key, None)
+            size = analyzer.memory_bytes()
+            print(f"🧠 저작권 모델 로드: {key} ({size / 1024 / 1024:.0f}MB, {time.perf_counter() - started:.1f}초)")
+
+            with self._lock:
+                self._resident[key] = analyzer
+                self._sizes[key] = size
+                self.stats["loads"] += 1
+                evicted = self._evict_over_budget(keep=key)
+        for old_key, old in evicted:
+            old.close()
+            print(f"🧹 저작권 모델 내림(LRU): {old_key}")
+        return analyzer
+
+    def _evict_over_budget(self, keep: str) -> list:
+        """예산을 넘는 동안 가장 오래 쓰이지 않은 분석기부터 목록에서 뺀다 (self._lock 안에서 호출)."""
+        evicted = []
+        for key in list(self._resident):
+            if sum(self._sizes.values()) <= self.budget_bytes:
+                break
+            if key in (keep, self.default_key):
+                continue
+            evicted.append((key, self._resident.pop(key)))
+            self._sizes.pop(key)
+            self.stats["evictions"] += 1
+        if sum(self._sizes.values()) > self.budget_bytes:
+            print(f"저작권 모델 메모리 예산 초과 상태로 유지: {sum(self._sizes.values()) / 1024 / 1024:.0f}MB "
+                  f"> {self.budget_bytes / 1024 / 1024:.0f}MB")
+        return evicted
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            resident = [{"modelKey": key, "memoryMB": round(self._sizes[key] / 1024 / 1024, 1),
+                         "mode": "transformer" if analyzer.use_transformer else "lexical",
+                         "indexVersion": analyzer.index.version}
+                        for key, analyzer in reversed(self._resident.items())]  # 최근 사용 순
+            used = sum(self._sizes.values())
+            stats = dict(self.stats)
+        return {
+            "defaultModelKey": self.default_key,
+            "availableModelKeys": self.allowed_keys,
+            "budgetMB": round(self.budget_bytes / 1024 / 1024, 1),
+            "usedMB": round(used / 1024 / 1024, 1),
+            "resident": resident,
+            **stats,
+        }
@@ -0,0 +1,334 @@
+"""
+저장된 기획안 증분 재검사 (인덱스에 새 게임이 추가됐을 때 위험도가 바뀐 기획안 찾기)
+
+검사한 기획안마다 쿼리 임베딩과 상위 후보(샤드, 샤드 내 행, 점수)를 저장해 두고,
+인덱스가 새 버전으로 바뀌면 저장된 벡터를 "새로 추가된 행"과만 한 번의 행렬 곱으로 채점한다.
+GPT 추출 / 인코딩 / 전체 스캔 없이 포트폴리오 전체를 다시 판정할 수 있다.
+
+- 추가된 행: 이전 버전 매니페스트에 없던 샤드의 살아있는 행 (샤드는 불변이므로 기존 샤드에는 새 행이 없다)
+- 이전 상위 후보 중 하나라도 삭제/변경됐거나 이전 매니페스트가 없으면 그 기획안만 전체 인덱스로 다시 채점
+  (빠진 자리를 채울 기존 행을 추가된 행만으로는 알 수 없다)
+- 위험도는 현재 임계값으로 다시 계산하므로 임계값 변경도 함께 반영된다
+
+저장소: COPYRIGHT_PLAN_STORE_DIR/<model>/plans.jsonl (기획안당 최신 줄이 유효, 추가만 하고 재검사 때 압축)
+        COPYRIGHT_PLAN_STORE_DIR/<model>/rescreen/<버전>.json (재검사 리포트, 같은 버전은 워커 하나만 실행)
+- COPYRIGHT_PLAN_STORE_DIR    : 저장 경로. 비어 있으면(기본) 저장하지 않는다 (기획안 제목/임베딩이 남으므로 명시적으로 켠다)
+- COPYRIGHT_RESCREEN_ON_SWAP  : 인덱스 교체 직후 백그라운드 재검사 (기본 true)
+
+판정 캐시(verdict_cache.py)에서 바로 답한 검사도 저장소에 남도록 기록에 판정 캐시 키(contentKey)를 같이 둔다.
+캐시 적중 시에는 같은 키의 기록을 그 planId로 복사하고, 복사할 기록이 없으면 서비스가 분석을 다시 돌린다.
+
+사용법 (인덱서 실행 후 서버 밖에서):
+    COPYRIGHT_PLAN_STORE_DIR=/var/lib/boardgame/plans python -m copyright.rescreen --model mini12
+"""
+import os
+import json
+import time
+import base64
+import fcntl
+import argparse
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from .search import top_k_rows
+from .shards import ShardedIndex, load_manifest
+
+PLAN_STORE_DIR = os.getenv("COPYRIGHT_PLAN_STORE_DIR", "")
+PLAN_STORE_ENABLED = bool(PLAN_STORE_DIR)
+RESCREEN_ON_SWAP = os.getenv("COPYRIGHT_RESCREEN_ON_SWAP", "true").lower() == "true"
+PLANS_FILE = "plans.jsonl"
+LOCK_FILE = "plans.lock"
+REPORT_DIR = "rescreen"
+# 재검사 결과에 담을 기획안당 새 유사 게임 수
+NEW_MATCHES = 3
+
+
+def _encode_vector(vector: np.ndarray) -> str:
+    return base64.b64encode(np.asarray(vector, dtype="<f4").tobytes()).decode("ascii")
+
+
+def _decode_vector(text: str) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(text), dtype="<f4")
+
+
+def plan_record(plan_id: int, title: str, vector: np.ndarray, risk_level: str, top_idx, top_scores,
+                index: ShardedIndex, content_key: Optional[str] = None) -> dict:
+    """검사 1건의 저장 기록: 쿼리 벡터 + 상위 후보(샤드 id, 샤드 내 행, 점수) + 판정 당시 인덱스 버전."""
+    return {
+        "planId": int(plan_id), "title": title, "contentKey": content_key,
+        "vector": np.asarray(vector, dtype=np.float32),
+        "riskLevel": risk_level, "maxScore": float(top_scores[0]) if len(top_scores) else 0.0,
+        "hits": [[*index.locate(int(i)), float(s)] for i, s in zip(top_idx, top_scores)],
+        "indexVersion": index.version, "checkedAt": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+class PlanVectorStore:
+    """모델 키별 기획안 벡터 저장소. 여러 워커가 같은 파일에 줄 단위로 추가한다 (flock으로 직렬화)."""
+
+    def __init__(self, model_key: str, root: str = PLAN_STORE_DIR):
+        self.model_key = model_key
+        self.directory = Path(root) / model_key
+        self.path = self.directory / PLANS_FILE
+        self._lock = threading.Lock()
+        self._records: Dict[int, dict] = {}
+        # 판정 캐시 키 → 그 내용으로 검사한 최신 기록 (캐시 적중 시 복사용)
+        self._by_content: Dict[str, dict] = {}
+        self._lines = 0
+        self.reload()
+
+    @contextmanager
+    def _file_lock(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / LOCK_FILE, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def reload(self):
+        """파일에서 기획안별 최신 기록을 다시 읽는다 (다른 워커가 추가한 기록 포함)."""
+        records, by_content, lines = {}, {}, 0
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # 중단된 쓰기의 마지막 줄
+                    record["vector"] = _decode_vector(record["vector"])
+                    records[record["planId"]] = record
+                    if record.get("contentKey"):
+                        by_content[record["contentKey"]] = record
+                    lines += 1
+        with self._lock:
+            self._records, self._by_content, self._lines = records, by_content, lines
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def records(self) -> List[dict]:
+        with self._lock:
+            return list(self._records.values())
+
+    def put(self, records: List[dict]):
+        with self._file_lock():
+            self._append(records)
+
+    def _append(self, records: List[dict]):
+        """파일 잠금을 잡은 상태에서 호출 (flock은 같은 프로세스 안에서도 중복으로 잡을 수 없다)."""
+        if not records:
+            return
+        body = "".join(json.dumps({**r, "vector": _encode_vector(r["vector"])}, ensure_ascii=False) + "\n"
+                       for r in records)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(body)
+        with self._lock:
+            for record in records:
+                self._records[record["planId"]] = record
+                if record.get("contentKey"):
+                    self._by_content[record["contentKey"]] = record
+            self._lines += len(records)
+
+    def copy_content(self, content_key: str, plan_id: int) -> bool:
+        """
+        같은 내용(판정 캐시 키)으로 검사한 기록을 plan_id의 기록으로 남긴다.
+        메모리에 없으면 다른 워커가 남겼을 수 있으므로 한 번 다시 읽고, 그래도 없으면 False.
+        """
+        with self._lock:
+            source = self._by_content.get(content_key)
+            current = self._records.get(plan_id)
+        if source is None:
+            self.reload()
+            with self._lock:
+                source = self._by_content.get(content_key)
+                current = self._records.get(plan_id)
+            if source is None:
+                return False
+        if current is not None and current.get("contentKey") == content_key:
+            return True
+        self.put([{**source, "planId": int(plan_id), "checkedAt": time.strftime("%Y-%m-%dT%H:%M:%S")}])
+        return True
+
+    def compact(self):
+        """기획안당 최신 줄만 남기고 다시 쓴다 (추가된 줄이 기획안 수의 두 배를 넘을 때)."""
+        with self._file_lock():
+            self.reload()
+            if self._lines <= max(2 * len(self._records), 1000):
+                return
+            tmp = self.path.with_name(f".{PLANS_FILE}.{os.getpid()}.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                for record in self.records():
+                    f.write(json.dumps({**record, "vector": _encode_vector(record["vector"])}, ensure_ascii=False) + "\n")
+            os.replace(tmp, self.path)
+            with self._lock:
+                self._lines = len(self._records)
+
+    def report_path(self, version: str) -> Path:
+        return self.directory / REPORT_DIR / version
+
+    def last_report(self) -> Optional[dict]:
+        reports = sorted((self.directory / REPORT_DIR).glob("*.json")) if (self.directory / REPORT_DIR).exists() else []
+        if not reports:
+            return None
+        with open(reports[-1], "r", encoding="utf-8") as f:
+            return json.load(f)
+
+
+# ---------- 재검사 ----------
+
+def _added_rows(index: ShardedIndex, previous: dict) -> np.ndarray:
+    """이전 매니페스트에 없던 샤드의 살아있는 행 (전역 행 번호)."""
+    known = {s["id"] for s in previous["shards"]}
+    rows = []
+    for n, shard in enumerate(index.shards):
+        if shard.id in known:
+            continue
+        local = np.setdiff1d(np.arange(len(shard.embeddings)), index.engine.dead[n])
+        rows.append(local + index.offsets[n])
+    return np.concatenate(rows).astype(np.int64) if rows else np.empty(0, dtype=np.int64)
+
+
+def _rows_matrix(index: ShardedIndex, rows: np.ndarray) -> np.ndarray:
+    parts = []
+    for n in np.unique(np.searchsorted(index.offsets, rows, side="right") - 1):
+        local = rows[(rows >= index.offsets[n]) & (rows < index.offsets[n + 1])] - index.offsets[n]
+        parts.append(np.asarray(index.shards[n].embeddings[local], dtype=np.float32))
+    return np.concatenate(parts) if parts else np.empty((0, 0), dtype=np.float32)
+
+
+def rescreen(store: PlanVectorStore, index: ShardedIndex, cache_dir, risk_of: Callable[[float], object],
+             k: int = 3, force: bool = False) -> dict:
+    """
+    저장된 기획안을 index 버전 기준으로 다시 판정하고 위험도가 바뀐 기획안 목록을 돌려준다.
+    같은 버전의 리포트가 이미 있으면 (다른 워커가 실행) force가 아닌 한 그 리포트를 그대로 반환한다.
+    """
+    report_path = store.report_path(index.version)
+    with store._file_lock():
+        if report_path.exists() and not force:
+            with open(report_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        started = time.perf_counter()
+        store.reload()
+        records = store.records()
+
+        by_version: Dict[str, List[dict]] = {}
+        for record in records:
+            by_version.setdefault(record["indexVersion"], []).append(record)
+
+        updated: Dict[int, dict] = {}
+        full: List[dict] = []
+        added_total = 0
+        for version, group in by_version.items():
+            if version == index.version:
+                for record in group:
+                    updated[record["planId"]] = {"hits": record["hits"], "new": []}
+                continue
+            try:
+                previous = load_manifest(cache_dir, version)
+            except (OSError, ValueError):
+                previous = None
+            delta = []
+            for record in group:
+                # 상위 후보가 하나라도 사라졌으면 그 자리에 올라올 기존 행을 모르므로 전체 재채점
+                hits_alive = all(index.is_live(h[0], h[1]) for h in record["hits"])
+                (delta if previous is not None and hits_alive else full).append(record)
+            if not delta:
+                continue
+            rows = _added_rows(index, previous)
+            added_total += len(rows)
+            if len(rows):
+                # 저장된 벡터 × 추가된 행: 행렬 곱 한 번
+                scores = np.stack([r["vector"] for r in delta]) @ _rows_matrix(index, rows).T
+                top_idx, top_scores = top_k_rows(scores, min(k, len(rows)))
+            for p, record in enumerate(delta):
+                new = [[*index.locate(int(rows[i])), float(s)] for i, s in zip(top_idx[p], top_scores[p])] if len(rows) else []
+                merged = sorted(record["hits"] + new, key=lambda h: -h[2])[:k]
+                updated[record["planId"]] = {"hits": merged, "new": [h for h in merged if h in new]}
+
+        if full:
+            results = index.engine.search_batch(np.stack([r["vector"] for r in full]), k)
+            for record, (idx, scores) in zip(full, results):
+                hits = [[*index.locate(int(i)), float(s)] for i, s in zip(idx, scores)]
+                previous_keys = {(h[0], h[1]) for h in record["hits"]}
+                updated[record["planId"]] = {"hits": hits, "new": [h for h in hits if (h[0], h[1]) not in previous_keys]}
+
+        changed, rewritten = [], []
+        for record in records:
+            result = updated[record["planId"]]
+            max_score = result["hits"][0][2] if result["hits"] else 0.0
+            risk = risk_of(max_score)
+            risk = getattr(risk, "value", risk)
+            if risk != record["riskLevel"]:
+                changed.append({
+                    "planId": record["planId"], "title": record.get("title"),
+                    "previousRiskLevel": record["riskLevel"], "riskLevel": risk,
+                    "previousMaxScore": round(record["maxScore"] * 100, 1), "maxScore": round(max_score * 100, 1),
+                    "newMatches": [_match(index, h) for h in result["new"][:NEW_MATCHES]],
+                })
+            if record["indexVersion"] != index.version or risk != record["riskLevel"]:
+                rewritten.append({**record, "hits": result["hits"], "maxScore": max_score, "riskLevel": risk,
+                                  "indexVersion": index.version})
+
+        store._append(rewritten)
+        report = {
+            "modelKey": store.model_key, "indexVersion": index.version,
+            "createdAt": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "numPlans": len(records), "deltaPlans": len(records) - len(full) - len(by_version.get(index.version, [])),
+            "fullPlans": len(full), "upToDatePlans": len(by_version.get(index.version, [])),
+            "addedRows": added_total, "seconds": round(time.perf_counter() - started, 3),
+            "changed": changed,
+        }
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = report_path.with_name(f".{report_path.name}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, report_path)
+    store.compact()
+    return report
+
+
+def _match(index: ShardedIndex, hit) -> dict:
+    meta = index.meta[index.global_row(hit[0], hit[1])]
+    return {
+        "title": meta.get("title", "Unknown Game"),
+        "similarityScore": round(hit[2] * 100, 1),
+        "bggLink": f"https://boardgamegeek.com/boardgame/{meta.get('game_id','')}" if meta.get("game_id") else None,
+    }
+
+
+def main():
+    from .copyright_analyzer import determine_risk_level
+
+    parser = argparse.ArgumentParser(description="저장된 기획안을 새 인덱스 버전의 추가 행과만 다시 채점")
+    parser.add_argument("--model", default="mini12", help="mini|mini12|qa|t5|multi 중 선택")
+    parser.add_argument("--cache-root", default=str(Path(__file__).resolve().parent / "cache"))
+    parser.add_argument("--store-root", default=PLAN_STORE_DIR, help="기본값 COPYRIGHT_PLAN_STORE_DIR")
+    parser.add_argument("--force", action="store_true", help="같은 버전 리포트가 있어도 다시 실행 (임계값 변경 후 등)")
+    parser.add_argument("--output", help="리포트 JSON 저장 경로 (없으면 표준출력)")
+    args = parser.parse_args()
+    if not args.store_root:
+        raise SystemExit("기획안 저장소 경로가 없습니다 (--store-root 또는 COPYRIGHT_PLAN_STORE_DIR)")
+
+    cache_dir = Path(args.cache_root) / args.model
+    manifest = load_manifest(cache_dir)
+    if manifest is None:
+        raise SystemExit(f"샤드 인덱스가 없습니다: {cache_dir} (python -m copyright.indexer --model {args.model})")
+    report = rescreen(PlanVectorStore(args.model, args.store_root), ShardedIndex(cache_dir, manifest), cache_dir,
+                      determine_risk_level, force=args.force)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+    print(f"기획안 {report['numPlans']}건 재검사 (증분 {report['deltaPlans']}, 전체 {report['fullPlans']}, "
+          f"추가 행 {report['addedRows']}), 위험도 변경 {len(report['changed'])}건, {report['seconds']}초")
+
+
+if __name__ == "__main__":
+    main()
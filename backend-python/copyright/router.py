@@ -1,11 +1,109 @@
-from fastapi import APIRouter, HTTPException
-from .schemas import PlanCopyrightCheckRequest, PlanCopyrightCheckResponse
-from .service import CopyrightService
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from .schemas import PlanCopyrightCheckRequest, PlanCopyrightCheckResponse, PlanCopyrightBatchRequest
+from utils import resources
 
 router = APIRouter(prefix="/api/plans", tags=["plans"])
 
-# 서비스 인스턴스 생성
-copyright_service = CopyrightService()
+
+def _create_copyright_service():
+    # 후보 캐시 + SentenceTransformer 로드가 무거우므로 첫 요청 또는 warm-up 때 생성
+    from .service import CopyrightService
+    return CopyrightService()
+
+
+def _prime_copyright_service(service):
+    # SentenceTransformer 첫 encode 호출 비용(그래프/스레드풀 초기화)을 요청 전에 치른다
+    analyzer = service.copyright_analyzer
+    if analyzer.use_transformer and analyzer.model is not None:
+        analyzer.model.encode(["board game warm-up"], normalize_embeddings=True)
+
+
+copyright_service = resources.register("copyright.service", _create_copyright_service, prime=_prime_copyright_service)
+
+MODEL_KEY_QUERY = Query(None, description="모델 키 (없으면 기본 모델)")
+
+
+def _resolve_model_keys(service, *model_keys: Optional[str]):
+    """요청한 modelKey가 허용 목록에 없으면 422."""
+    from .registry import UnknownModelKey
+    try:
+        for model_key in model_keys:
+            service.analyzers.resolve(model_key)
+    except UnknownModelKey as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+def _resident_analyzer(model_key: Optional[str]):
+    """통계 조회용: 상주 중인 분석기만 (조회 때문에 모델을 로드하지 않음)."""
+    service = copyright_service.get()
+    _resolve_model_keys(service, model_key)
+    analyzer = service.analyzers.peek(model_key)
+    if analyzer is None:
+        raise HTTPException(status_code=404, detail=f"모델 '{model_key}'이(가) 로드되어 있지 않습니다.")
+    return analyzer
+
+@router.get("/copyright/models", summary="상주 중인 저작권 모델 / 메모리 예산")
+def copyright_models():
+    """사용 가능한 모델 키, 메모리 예산과 사용량, 상주 모델(최근 사용 순), 로드/내림 횟수를 반환합니다."""
+    return copyright_service.get().analyzers.snapshot()
+
+@router.get("/copyright/encoder/stats", summary="쿼리 인코더 마이크로 배칭 통계")
+def encoder_stats(modelKey: Optional[str] = MODEL_KEY_QUERY):
+    """배치 수, 평균/최대 배치 크기, 대기/인코딩 시간, 배치 크기 분포를 반환합니다."""
+    encoder = _resident_analyzer(modelKey).encoder
+    if encoder is None:
+        raise HTTPException(status_code=404, detail="SentenceTransformer 인코더가 로드되지 않았습니다 (simple 유사도 모드).")
+    return encoder.snapshot()
+
+@router.get("/copyright/embedding-cache/stats", summary="쿼리 임베딩 캐시 적중률")
+def embedding_cache_stats(modelKey: Optional[str] = MODEL_KEY_QUERY):
+    """메모리/디스크 적중, 미적중, 적중률과 현재 크기를 반환합니다."""
+    encoder = _resident_analyzer(modelKey).encoder
+    if encoder is None or encoder.cache is None:
+        raise HTTPException(status_code=404, detail="SentenceTransformer 인코더가 로드되지 않았습니다 (simple 유사도 모드).")
+    return encoder.cache.snapshot()
+
+@router.get("/copyright/extraction/stats", summary="GPT 추출 캐시 적중률 / 호출 수")
+def extraction_stats():
+    """추출 방식, GPT 호출 수(단일/2단계, 영어 입력), 캐시 적중과 진행 중 합류 수, 캐시 크기를 반환합니다."""
+    return copyright_service.get().data_extractor.snapshot()
+
+@router.get("/copyright/verdict-cache/stats", summary="저작권 판정 결과 캐시 적중률")
+def verdict_cache_stats():
+    """판정 결과 캐시의 메모리/디스크 적중, 미적중, 만료, 적중률과 현재 크기를 반환합니다."""
+    return copyright_service.get().verdicts.snapshot()
+
+@router.post("/copyright/rescreen", summary="저장된 기획안 증분 재검사")
+async def rescreen_plans(modelKey: Optional[str] = MODEL_KEY_QUERY,
+                         force: bool = Query(False, description="같은 인덱스 버전의 리포트가 있어도 다시 실행")):
+    """
+    검사했던 기획안의 쿼리 벡터를 현재 인덱스에 새로 추가된 행과만 채점해 위험도가 바뀐 기획안 목록을 반환합니다.
+    인덱스가 교체되면 자동으로 실행되며 (COPYRIGHT_RESCREEN_ON_SWAP), 같은 버전은 한 번만 실행됩니다.
+    """
+    service = copyright_service.get()
+    _resolve_model_keys(service, modelKey)
+    analyzer = await service.get_analyzer(modelKey)
+    try:
+        return await asyncio.to_thread(analyzer.rescreen_plans, None, force)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.get("/copyright/rescreen", summary="마지막 증분 재검사 리포트")
+def last_rescreen(modelKey: Optional[str] = MODEL_KEY_QUERY):
+    """가장 최근 인덱스 버전의 재검사 리포트(위험도가 바뀐 기획안 목록)를 반환합니다."""
+    analyzer = _resident_analyzer(modelKey)
+    report = analyzer.plans.last_report() if analyzer.plans is not None else None
+    if report is None:
+        raise HTTPException(status_code=404, detail="재검사 리포트가 없습니다.")
+    return report
+
+@router.get("/copyright/index", summary="현재 저작권 인덱스 버전 / 샤드 정보")
+def copyright_index_info(modelKey: Optional[str] = MODEL_KEY_QUERY):
+    """사용 중인 매니페스트 버전, 샤드별 행 범위와 삭제 표시 수를 반환합니다 (새 버전이 발행됐으면 먼저 교체)."""
+    return _resident_analyzer(modelKey).current_index().info()
 
 @router.post("/copyright-plan", response_model=PlanCopyrightCheckResponse)
 async def check_plan_copyright(request: PlanCopyrightCheckRequest):
@@ -13,13 +111,41 @@ async def check_plan_copyright(request: PlanCopyrightCheckRequest):
     보드게임 기획안의 저작권 위험도를 검사합니다.
     
     워크플로우:
-    1. summaryText에서 게임 정보 추출
-    2. GPT-4로 영어 번역
-    3. MiniLM-L12-v2로 기존 게임과의 유사도 검사
-    4. 위험도 및 유사한 게임 목록 반환
+    1. summaryText에서 게임 정보를 영어로 추출 (GPT-4 1회, 같은 summaryText 재검사는 캐시 사용)
+    2. MiniLM-L12-v2로 유사도 검사
+    3. 위험도 및 유사한 게임 목록 반환
+
+    modelKey로 모델을 고를 수 있습니다 (예: 빠른 검사 mini, 정밀 감사 t5). 없으면 서버 기본 모델.
     """
+    _resolve_model_keys(copyright_service.get(), request.modelKey)
     try:
         result = await copyright_service.check_plan_copyright(request)
         return result
+    except HTTPException:
+        # 503(리소스 없음) / 504(시간 예산 초과) 등은 상태 코드와 메시지를 그대로 전달
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"저작권 검사 중 오류 발생: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"저작권 검사 중 오류 발생: {str(e)}")
+
+
+@router.post("/copyright-batch", summary="여러 기획안 저작권 일괄 검사 (NDJSON 스트림)")
+async def check_plans_copyright_batch(request: PlanCopyrightBatchRequest):
+    """
+    여러 기획안(planId, summaryText)의 저작권 위험도를 한 번에 검사합니다.
+
+    GPT 추출/번역은 동시에 실행하고, 완료된 기획안들은 한 번의 임베딩 + 행렬 곱으로 채점합니다.
+    응답은 NDJSON 스트림이며 기획안 한 건이 끝날 때마다 한 줄씩 전송됩니다 (입력 순서와 다를 수 있음).
+    각 줄은 status="ok"면 result, "error"면 error 필드를 가집니다.
+    modelKey는 기획안별로 또는 요청 공통으로 지정할 수 있습니다.
+    """
+    if not request.plans:
+        raise HTTPException(status_code=422, detail="plans가 비어 있습니다.")
+    # 스트림을 시작하기 전에 서비스 준비 여부 / 모델 키를 확인 (준비 안 됐으면 503, 모르는 키면 422)
+    service = copyright_service.get()
+    _resolve_model_keys(service, request.modelKey, *(plan.modelKey for plan in request.plans))
+
+    async def event_stream():
+        async for item in service.check_plans_copyright_stream(request.plans, request.modelKey):
+            yield item.model_dump_json() + "\n"
+
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
@@ -11,6 +11,13 @@ class RiskLevel(str, Enum):
 class PlanCopyrightCheckRequest(BaseModel):
     planId: int
     summaryText: str
+    # 검사에 쓸 임베딩 모델 키 (mini, mini12, qa, t5, multi=번역 없이 한국어 그대로). 없으면 서버 기본값(COPYRIGHT_MODEL_KEY)
+    modelKey: Optional[str] = None
+
+class PlanCopyrightBatchRequest(BaseModel):
+    plans: List[PlanCopyrightCheckRequest]
+    # 기획안별 modelKey가 없을 때 쓸 공통 모델 키
+    modelKey: Optional[str] = None
 
 class SimilarGame(BaseModel):
     title: str
@@ -36,4 +43,11 @@ class TranslatedGameData(BaseModel):
     title: str
     theme: str
     mechanics: List[str]
-    description: str
\ No newline at end of file
+    description: str
+
+class PlanCopyrightBatchItem(BaseModel):
+    """일괄 검사 NDJSON 스트림의 한 줄 (기획안 1건)."""
+    planId: int
+    status: str  # "ok" | "error"
+    result: Optional[PlanCopyrightCheckResponse] = None
+    error: Optional[str] = None
@@ -0,0 +1,351 @@
+"""
+저작권 유사도 검색 엔진
+
+embeddings.npy(정규화된 float32)를 기준으로, 같은 디렉터리에 저장된 변형 인덱스를 골라 검색한다.
+
+- float32 : 전체 행렬 내적 (정확)
+- float16 : 반정밀도 행렬로 후보를 추린 뒤 float32로 재채점
+- int8    : 차원별 스케일로 양자화한 행렬로 후보를 추린 뒤 float32로 재채점
+- ivf     : k-means 조대 양자화기(coarse quantizer)로 가까운 nprobe개 리스트의 행만 채점 (근사)
+
+양자화 행렬은 블록 단위로 float32 변환해 내적하므로 쿼리당 읽는 메모리는 2~4배 줄고,
+재채점은 후보 rescore_k개 행만 float32 memmap에서 읽는다.
+
+변형은 COPYRIGHT_INDEX_VARIANT(float32|float16|int8|ivf), 재채점 후보 수는 COPYRIGHT_RESCORE_K,
+IVF 탐색 리스트 수는 COPYRIGHT_IVF_NPROBE로 설정한다.
+모든 엔진은 exclude(제외할 행 번호, 샤드의 삭제 표시)를 받아 상위 k개를 고르기 전에 그 행의 점수를 -inf로 둔다.
+NumPy의 float16 → float32 변환은 CPU에서 느리므로 지연시간까지 줄이려면 int8을 권장한다.
+"""
+import os
+from pathlib import Path
+from typing import Dict, List, Tuple, Type
+
+import numpy as np
+
+DEFAULT_VARIANT = os.getenv("COPYRIGHT_INDEX_VARIANT", "float32")
+DEFAULT_RESCORE_K = int(os.getenv("COPYRIGHT_RESCORE_K", "100"))
+DEFAULT_NPROBE = int(os.getenv("COPYRIGHT_IVF_NPROBE", "16"))
+# 블록 단위 float32 변환 크기 (L2 캐시에 들어가는 크기가 가장 빠름)
+SCORE_BLOCK_ROWS = 1024
+# 배치 검색 시 한 번에 곱하는 쿼리 수 ((블록, N) float32 점수 행렬 크기를 제한)
+QUERY_BLOCK_ROWS = 64
+
+EMBEDDINGS_FILE = "embeddings.npy"
+FLOAT16_FILE = "embeddings.f16.npy"
+INT8_FILE = "embeddings.int8.npy"
+INT8_SCALE_FILE = "embeddings.int8_scale.npy"
+IVF_CENTROIDS_FILE = "ivf.centroids.npy"
+IVF_ORDER_FILE = "ivf.order.npy"
+IVF_OFFSETS_FILE = "ivf.offsets.npy"
+ASSIGN_BLOCK_ROWS = 8192
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """점수 상위 k개 인덱스 (내림차순). 전체 정렬 없이 argpartition 사용."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    idx = np.argpartition(-scores, k - 1)[:k]
+    return idx[np.argsort(-scores[idx])]
+
+
+def top_k_rows(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(Q, N) 점수 행렬의 행별 상위 k개 (인덱스, 점수). 각 행 내림차순."""
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64), np.empty((scores.shape[0], 0), dtype=np.float32)
+    idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    part = np.take_along_axis(scores, idx, axis=1)
+    order = np.argsort(-part, axis=1)
+    return np.take_along_axis(idx, order, axis=1), np.take_along_axis(part, order, axis=1)
+
+
+def _without(rows: np.ndarray, exclude) -> np.ndarray:
+    if exclude is None or len(exclude) == 0:
+        return rows
+    return rows[~np.isin(rows, exclude)]
+
+
+def _finite(idx: np.ndarray, scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """제외(-inf)된 행이 상위 k개에 걸린 경우(살아있는 행이 k개보다 적을 때) 잘라낸다."""
+    keep = np.isfinite(scores)
+    return (idx, scores) if keep.all() else (idx[keep], scores[keep])
+
+
+def quantize_int8(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """차원별 대칭 양자화: x ≈ codes * scale, codes ∈ [-127, 127]."""
+    scale = np.abs(embeddings).max(axis=0).astype(np.float32) / 127.0
+    scale[scale == 0] = 1.0
+    codes = np.clip(np.rint(embeddings / scale), -127, 127).astype(np.int8)
+    return codes, scale
+
+
+def write_quantized(cache_dir, embeddings: np.ndarray, variants=("float16", "int8")):
+    """embeddings.npy 옆에 양자화 변형을 저장한다."""
+    cache_dir = Path(cache_dir)
+    if "float16" in variants:
+        np.save(cache_dir / FLOAT16_FILE, embeddings.astype(np.float16))
+    if "int8" in variants:
+        codes, scale = quantize_int8(embeddings)
+        np.save(cache_dir / INT8_FILE, codes)
+        np.save(cache_dir / INT8_SCALE_FILE, scale)
+
+
+def _assign(embeddings: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """각 행을 가장 가까운(내적 최대) 중심에 배정."""
+    labels = np.empty(embeddings.shape[0], dtype=np.int32)
+    for start in range(0, embeddings.shape[0], ASSIGN_BLOCK_ROWS):
+        block = np.asarray(embeddings[start:start + ASSIGN_BLOCK_ROWS], dtype=np.float32)
+        labels[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return labels
+
+
+def train_ivf(embeddings: np.ndarray, nlist: int, iterations: int = 10, sample_size: int = None,
+              seed: int = 0) -> np.ndarray:
+    """정규화된 임베딩에 대한 구면(spherical) k-means. (nlist, D) 중심을 반환."""
+    rng = np.random.default_rng(seed)
+    n = embeddings.shape[0]
+    nlist = min(nlist, n)
+    sample_size = min(n, sample_size or nlist * 64)
+    sample = np.asarray(embeddings[np.sort(rng.choice(n, size=sample_size, replace=False))], dtype=np.float32)
+
+    centroids = sample[rng.choice(sample_size, size=nlist, replace=False)].copy()
+    for _ in range(iterations):
+        labels = _assign(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, sample)
+        counts = np.bincount(labels, minlength=nlist)
+        empty = counts == 0
+        # 빈 리스트는 임의의 샘플로 다시 시작
+        sums[empty] = sample[rng.choice(sample_size, size=int(empty.sum()), replace=False)]
+        centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+    return centroids.astype(np.float32)
+
+
+def write_ivf(cache_dir, embeddings: np.ndarray, nlist: int = None, iterations: int = 10) -> int:
+    """IVF 인덱스(중심, 리스트별 행 번호)를 embeddings.npy 옆에 저장. 사용한 nlist를 반환."""
+    cache_dir = Path(cache_dir)
+    nlist = nlist or max(1, int(4 * np.sqrt(embeddings.shape[0])))
+    centroids = train_ivf(embeddings, nlist, iterations)
+    labels = _assign(embeddings, centroids)
+    order = np.argsort(labels, kind="stable").astype(np.int64)
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(labels, minlength=len(centroids)))]).astype(np.int64)
+    np.save(cache_dir / IVF_CENTROIDS_FILE, centroids)
+    np.save(cache_dir / IVF_ORDER_FILE, order)
+    np.save(cache_dir / IVF_OFFSETS_FILE, offsets)
+    return len(centroids)
+
+
+class SearchEngine:
+    """
+    정규화된 쿼리 벡터(1, D) 또는 (D,)로 상위 k개 (인덱스, 코사인 유사도)를 반환.
+    exclude: 결과에서 뺄 행 번호 배열 (없으면 None)
+    """
+    name = "base"
+
+    def __init__(self, cache_dir, embeddings: np.ndarray):
+        self.cache_dir = Path(cache_dir)
+        self.embeddings = embeddings
+
+    def __len__(self) -> int:
+        return self.embeddings.shape[0]
+
+    def search(self, query: np.ndarray, k: int, exclude: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray]:
+        raise NotImplementedError
+
+    def search_batch(self, queries: np.ndarray, k: int,
+                     exclude: np.ndarray = None) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """(Q, D) 쿼리 각각의 상위 k개. 기본 구현은 쿼리별 search 반복."""
+        return [self.search(q, k, exclude) for q in np.asarray(queries, dtype=np.float32)]
+
+    def exact_scores(self, query: np.ndarray, idx: np.ndarray) -> np.ndarray:
+        # memmap에서 해당 행만 읽는다 (fancy indexing은 정렬된 인덱스에서 더 빠름)
+        order = np.sort(idx)
+        scores = np.asarray(self.embeddings[order], dtype=np.float32) @ query
+        return scores[np.searchsorted(order, idx)]
+
+
+class ExactSearch(SearchEngine):
+    name = "float32"
+
+    def search(self, query, k, exclude=None):
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        scores = np.asarray(self.embeddings @ query)
+        if exclude is not None:
+            scores[exclude] = -np.inf
+        idx = top_k(scores, k)
+        return _finite(idx, scores[idx])
+
+    def search_batch(self, queries, k, exclude=None):
+        # 행렬-행렬 곱 한 번으로 여러 쿼리를 채점 (임베딩 행렬을 쿼리 수만큼 반복해서 읽지 않는다)
+        queries = np.asarray(queries, dtype=np.float32)
+        results = []
+        for start in range(0, len(queries), QUERY_BLOCK_ROWS):
+            scores = np.asarray(queries[start:start + QUERY_BLOCK_ROWS] @ self.embeddings.T)
+            if exclude is not None:
+                scores[:, exclude] = -np.inf
+            idx, top = top_k_rows(scores, k)
+            results.extend(_finite(i, t) for i, t in zip(idx, top))
+        return results
+
+
+class QuantizedSearch(SearchEngine):
+    """양자화 행렬로 rescore_k개 후보를 추린 뒤 float32로 정확히 재채점."""
+
+    def __init__(self, cache_dir, embeddings, rescore_k: int = DEFAULT_RESCORE_K):
+        super().__init__(cache_dir, embeddings)
+        self.rescore_k = rescore_k
+        self.matrix, self.scale = self._load()
+
+    def _load(self) -> Tuple[np.ndarray, np.ndarray]:
+        raise NotImplementedError
+
+    def approximate_scores(self, query: np.ndarray) -> np.ndarray:
+        weighted = query * self.scale if self.scale is not None else query
+        scores = np.empty(self.matrix.shape[0], dtype=np.float32)
+        for start in range(0, self.matrix.shape[0], SCORE_BLOCK_ROWS):
+            block = self.matrix[start:start + SCORE_BLOCK_ROWS]
+            scores[start:start + len(block)] = block.astype(np.float32) @ weighted
+        return scores
+
+    def approximate_scores_batch(self, queries: np.ndarray) -> np.ndarray:
+        """(Q, D) 쿼리의 (Q, N) 근사 점수. 양자화 행렬을 블록마다 한 번만 float32로 바꿔 모든 쿼리와 곱한다."""
+        weighted = queries * self.scale if self.scale is not None else queries
+        scores = np.empty((len(queries), self.matrix.shape[0]), dtype=np.float32)
+        for start in range(0, self.matrix.shape[0], SCORE_BLOCK_ROWS):
+            block = self.matrix[start:start + SCORE_BLOCK_ROWS]
+            scores[:, start:start + len(block)] = weighted @ block.astype(np.float32).T
+        return scores
+
+    def search(self, query, k, exclude=None):
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        approximate = self.approximate_scores(query)
+        if exclude is not None:
+            approximate[exclude] = -np.inf
+        shortlist = top_k(approximate, max(k, self.rescore_k))
+        shortlist, _ = _finite(shortlist, approximate[shortlist])
+        exact = self.exact_scores(query, shortlist)
+        order = top_k(exact, k)
+        return shortlist[order], exact[order]
+
+    def search_batch(self, queries, k, exclude=None):
+        # 근사 점수는 (Q×D)·(D×N) 블록 곱, 재채점은 쿼리별 후보의 합집합 행만 float32로 한 번 읽어 곱한다
+        queries = np.asarray(queries, dtype=np.float32)
+        results = []
+        for start in range(0, len(queries), QUERY_BLOCK_ROWS):
+            block = queries[start:start + QUERY_BLOCK_ROWS]
+            approximate = self.approximate_scores_batch(block)
+            if exclude is not None:
+                approximate[:, exclude] = -np.inf
+            shortlists, shortlist_scores = top_k_rows(approximate, max(k, self.rescore_k))
+            shortlists = [_finite(i, s)[0] for i, s in zip(shortlists, shortlist_scores)]
+            rows = np.unique(np.concatenate(shortlists))
+            exact = block @ np.asarray(self.embeddings[rows], dtype=np.float32).T  # (Qb, U)
+            for q, shortlist in enumerate(shortlists):
+                scores = exact[q, np.searchsorted(rows, shortlist)]
+                order = top_k(scores, k)
+                results.append((shortlist[order], scores[order]))
+        return results
+
+
+class Float16Search(QuantizedSearch):
+    name = "float16"
+
+    def _load(self):
+        return np.load(self.cache_dir / FLOAT16_FILE, mmap_mode="r"), None
+
+
+class Int8Search(QuantizedSearch):
+    name = "int8"
+
+    def _load(self):
+        codes = np.load(self.cache_dir / INT8_FILE, mmap_mode="r")
+        return codes, np.load(self.cache_dir / INT8_SCALE_FILE)
+
+
+class IVFSearch(SearchEngine):
+    """쿼리와 가까운 nprobe개 리스트에 속한 행만 float32로 채점 (스캔량 ≈ N · nprobe / nlist)."""
+    name = "ivf"
+
+    def __init__(self, cache_dir, embeddings, nprobe: int = DEFAULT_NPROBE):
+        super().__init__(cache_dir, embeddings)
+        self.nprobe = nprobe
+        self.centroids = np.load(self.cache_dir / IVF_CENTROIDS_FILE)
+        self.order = np.load(self.cache_dir / IVF_ORDER_FILE, mmap_mode="r")
+        self.offsets = np.load(self.cache_dir / IVF_OFFSETS_FILE)
+        if self.offsets[-1] != embeddings.shape[0]:
+            raise ValueError("IVF 인덱스와 임베딩 행 수가 다릅니다. 인덱스를 다시 생성하세요.")
+
+    def candidates(self, query: np.ndarray, exclude: np.ndarray = None, k: int = 0) -> np.ndarray:
+        """가까운 nprobe개 리스트의 살아있는 행. k개가 안 되면 탐색 리스트 수를 두 배씩 늘린다."""
+        ranked = np.argsort(-(self.centroids @ query))
+        nprobe = self.nprobe
+        while True:
+            rows = _without(np.concatenate([self.order[self.offsets[c]:self.offsets[c + 1]] for c in ranked[:nprobe]]),
+                            exclude)
+            if len(rows) >= k or nprobe >= len(ranked):
+                return rows
+            nprobe *= 2
+
+    def search_batch(self, queries, k, exclude=None):
+        # 리스트별로 그 리스트를 탐색하는 쿼리들을 모아 (Qc×D)·(D×n_c) 한 번에 채점한 뒤 쿼리별로 합친다
+        queries = np.asarray(queries, dtype=np.float32)
+        if len(queries) == 0:
+            return []
+        lists, _ = top_k_rows(queries @ self.centroids.T, self.nprobe)  # (Q, nprobe)
+        rows: List[List[np.ndarray]] = [[] for _ in queries]
+        scores: List[List[np.ndarray]] = [[] for _ in queries]
+        for c in np.unique(lists):
+            members = _without(np.sort(np.asarray(self.order[self.offsets[c]:self.offsets[c + 1]])), exclude)
+            if len(members) == 0:
+                continue
+            probing = np.flatnonzero((lists == c).any(axis=1))
+            block = queries[probing] @ np.asarray(self.embeddings[members], dtype=np.float32).T
+            for j, q in enumerate(probing):
+                rows[q].append(members)
+                scores[q].append(block[j])
+        results = []
+        for q in range(len(queries)):
+            candidate_rows = np.concatenate(rows[q]) if rows[q] else np.empty(0, dtype=np.int64)
+            if len(candidate_rows) < k:
+                # 탐색한 리스트에 살아있는 행이 k개보다 적으면 리스트를 넓혀 다시 찾는다
+                results.append(self.search(queries[q], k, exclude))
+                continue
+            candidate_scores = np.concatenate(scores[q])
+            idx = top_k(candidate_scores, k)
+            results.append((candidate_rows[idx], candidate_scores[idx]))
+        return results
+
+    def search(self, query, k, exclude=None):
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        rows = self.candidates(query, exclude, k)
+        if len(rows) == 0:
+            return rows, np.empty(0, dtype=np.float32)
+        scores = self.exact_scores(query, rows)
+        idx = top_k(scores, k)
+        return rows[idx], scores[idx]
+
+
+ENGINES: Dict[str, Type[SearchEngine]] = {
+    "float32": ExactSearch,
+    "float16": Float16Search,
+    "int8": Int8Search,
+    "ivf": IVFSearch,
+}
+
+
+def load_engine(cache_dir, embeddings: np.ndarray, variant: str = DEFAULT_VARIANT,
+                rescore_k: int = DEFAULT_RESCORE_K, nprobe: int = DEFAULT_NPROBE) -> SearchEngine:
+    """설정된 변형의 엔진을 연다. 변형 파일이 없으면 정확 검색으로 대체."""
+    if variant not in ENGINES:
+        raise ValueError(f"지원하지 않는 인덱스 변형: {variant} (가능한 값: {sorted(ENGINES)})")
+    engine_cls = ENGINES[variant]
+    try:
+        if issubclass(engine_cls, QuantizedSearch):
+            return engine_cls(cache_dir, embeddings, rescore_k=rescore_k)
+        if engine_cls is IVFSearch:
+            return engine_cls(cache_dir, embeddings, nprobe=nprobe)
+        return engine_cls(cache_dir, embeddings)
+    except FileNotFoundError as e:
+        print(f"'{variant}' 인덱스 파일이 없습니다 ({e}) → float32 정확 검색 사용")
+        return ExactSearch(cache_dir, embeddings)
@@ -1,33 +1,76 @@
-from .schemas import PlanCopyrightCheckRequest, PlanCopyrightCheckResponse
-from .gpt_processor import GameDataExtractor
+import os
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional
+from .schemas import PlanCopyrightCheckRequest, PlanCopyrightCheckResponse, PlanCopyrightBatchItem, TranslatedGameData
+from .gpt_processor import EXTRACT_MODE, GameDataExtractor
 from .copyright_analyzer import CopyrightAnalyzer
+from .registry import AnalyzerRegistry
+from .model_loader import MULTILINGUAL_MODEL_KEYS
+from .verdict_cache import VerdictCache
+from utils import deadline
+
+# 일괄 검사 시 동시에 진행할 GPT 추출/번역 수
+BATCH_CONCURRENCY = int(os.getenv("COPYRIGHT_BATCH_CONCURRENCY", "8"))
 
 class CopyrightService:
     def __init__(self):
         self.data_extractor = GameDataExtractor()
-        self.copyright_analyzer = CopyrightAnalyzer()
+        # 모델 키별 분석기 (기본 키는 바로 로드, 나머지는 요청 시 로드 + 메모리 예산 LRU)
+        self.analyzers = AnalyzerRegistry()
+        self.analyzers.get()
+        # 내용 / 인덱스 버전 / 모델이 같은 재검사는 파이프라인 전체를 건너뛴다
+        self.verdicts = VerdictCache()
+
+    @property
+    def copyright_analyzer(self) -> CopyrightAnalyzer:
+        """기본 모델 키의 분석기."""
+        return self.analyzers.get()
+
+    async def get_analyzer(self, model_key: Optional[str] = None) -> CopyrightAnalyzer:
+        # 상주하지 않는 모델은 로드에 수 초가 걸리므로 스레드에서
+        return await asyncio.to_thread(self.analyzers.get, model_key)
+
+    def needs_translation(self, model_key: Optional[str] = None) -> bool:
+        """다국어 인코더는 한국어 추출 결과를 그대로 임베딩하므로 GPT 번역 단계를 건너뛴다."""
+        return self.analyzers.resolve(model_key) not in MULTILINGUAL_MODEL_KEYS
+
+    def verdict_key(self, summary_text: str, analyzer: CopyrightAnalyzer, index, translate: bool) -> str:
+        return self.verdicts.key(summary_text, analyzer.verdict_version(index), EXTRACT_MODE if translate else "src")
     
     async def check_plan_copyright(self, request: PlanCopyrightCheckRequest) -> PlanCopyrightCheckResponse:
         """
         전체 저작권 검사 워크플로우를 실행합니다.
         
-        1. summaryText에서 구조화된 데이터 추출
-        2. GPT로 영어 번역
-        3. MiniLM-L12-v2로 유사도 검사
-        4. 저작권 분석 결과 반환
+        0. 내용 / 인덱스 버전 / 모델이 같은 이전 판정이 있으면 그대로 반환
+        1. summaryText에서 구조화된 데이터를 영어로 추출 (캐시 적중 시 GPT 호출 없음, 다국어 모델 키면 번역 생략)
+        2. 문장 임베딩으로 유사도 검사
+        3. 저작권 분석 결과 반환
         """
+        # 모델 키가 없거나 로드할 수 없으면 기본 응답 대신 422/503
+        analyzer = await self.get_analyzer(request.modelKey)
+        # 판정 캐시 키와 분석이 같은 인덱스 버전을 쓰도록 여기서 고정
+        index = analyzer.current_index()
+        translate = self.needs_translation(request.modelKey)
+        verdict_key = self.verdict_key(request.summaryText, analyzer, index, translate)
+        cached = self.verdicts.get(verdict_key, request.planId)
+        # 캐시로 답한 검사도 재검사 대상이 되도록 기획안 저장소에 남긴다 (남길 벡터가 없으면 분석을 다시 돌림)
+        if cached is not None and await asyncio.to_thread(analyzer.record_cached_plan, verdict_key, request.planId, index):
+            return cached
         try:
             # 1. 데이터 추출 및 번역
             translated_data = await self.data_extractor.process_plan(
-                request.planId, 
-                request.summaryText
+                request.planId,
+                request.summaryText,
+                translate=translate,
             )
             
-            # 2. 저작권 분석
-            result = await self.copyright_analyzer.analyze_copyright(translated_data)
-            
+            # 2. 저작권 분석 (오류 시 기본 응답은 캐시하지 않음)
+            result = await analyzer.analyze_copyright(translated_data, index, verdict_key)
+            self.verdicts.put(verdict_key, result)
             return result
             
+        except deadline.DeadlineExceeded:
+            raise
         except Exception as e:
             # 오류 발생 시 기본 응답 반환
             return PlanCopyrightCheckResponse(
@@ -35,4 +78,80 @@ class CopyrightService:
                 riskLevel="LOW",
                 similarGames=[],
                 analysisSummary=f"분석 중 오류가 발생했습니다: {str(e)}"
-            )
\ No newline at end of file
+            )
+
+    async def check_plans_copyright_stream(self, plans: List[PlanCopyrightCheckRequest],
+                                           model_key: Optional[str] = None) -> AsyncIterator[PlanCopyrightBatchItem]:
+        """
+        여러 기획안을 일괄 검사하고 끝나는 대로 한 건씩 내보냅니다.
+
+        0. 상주 중인 모델의 판정 캐시에 있는 기획안은 바로 내보냄
+        1. GPT 추출/번역을 BATCH_CONCURRENCY개씩 동시에 실행
+        2. 그 사이 완료된 기획안들을 모아 한 번의 encode + 행렬 곱으로 채점 (스레드풀)
+           → 채점하는 동안 끝난 추출이 다음 묶음이 되므로 부하가 클수록 묶음이 커진다
+        기획안별 modelKey가 없으면 model_key(요청 공통)를 쓰고, 묶음은 모델 키별로 나눠 채점한다.
+        """
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+        async def extract(plan: PlanCopyrightCheckRequest):
+            async with semaphore:
+                try:
+                    translate = self.needs_translation(plan.modelKey or model_key)
+                    return plan, await self.data_extractor.process_plan(plan.planId, plan.summaryText, translate), None
+                except Exception as e:
+                    return plan, None, getattr(e, "detail", None) or str(e)
+
+        # 판정 캐시 조회는 상주 중인 분석기만 (조회 때문에 모델을 로드하지 않음, 키 오류는 추출 단계에서 보고)
+        uncached = []
+        for plan in plans:
+            key = plan.modelKey or model_key
+            cached = None
+            try:
+                analyzer = self.analyzers.peek(key)
+                if analyzer is not None:
+                    index = analyzer.current_index()
+                    verdict_key = self.verdict_key(plan.summaryText, analyzer, index, self.needs_translation(key))
+                    cached = self.verdicts.get(verdict_key, plan.planId)
+                    if cached is not None and not await asyncio.to_thread(
+                            analyzer.record_cached_plan, verdict_key, plan.planId, index):
+                        cached = None
+            except Exception:
+                pass
+            if cached is not None:
+                yield PlanCopyrightBatchItem(planId=plan.planId, status="ok", result=cached)
+            else:
+                uncached.append(plan)
+
+        pending = {asyncio.create_task(extract(plan)) for plan in uncached}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                ready: Dict[Optional[str], List[PlanCopyrightCheckRequest]] = {}
+                translated: Dict[int, TranslatedGameData] = {}
+                for task in done:
+                    plan, game, error = task.result()
+                    if error is not None:
+                        yield PlanCopyrightBatchItem(planId=plan.planId, status="error", error=f"데이터 추출 중 오류 발생: {error}")
+                    else:
+                        ready.setdefault(plan.modelKey or model_key, []).append(plan)
+                        translated[id(plan)] = game
+                for key, group in ready.items():
+                    try:
+                        analyzer = await self.get_analyzer(key)
+                        index = analyzer.current_index()
+                        translate = self.needs_translation(key)
+                        verdict_keys = [self.verdict_key(plan.summaryText, analyzer, index, translate) for plan in group]
+                        results = await asyncio.to_thread(
+                            analyzer.analyze_batch, [translated[id(plan)] for plan in group], index, verdict_keys)
+                    except Exception as e:
+                        error = getattr(e, "detail", None) or str(e)
+                        for plan in group:
+                            yield PlanCopyrightBatchItem(planId=plan.planId, status="error", error=f"분석 중 오류가 발생했습니다: {error}")
+                        continue
+                    for verdict_key, result in zip(verdict_keys, results):
+                        self.verdicts.put(verdict_key, result)
+                        yield PlanCopyrightBatchItem(planId=result.planId, status="ok", result=result)
+        finally:
+            # 클라이언트가 스트림을 끊으면 남은 GPT 호출을 취소
+            for task in pending:
+                task.cancel()
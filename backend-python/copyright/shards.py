@@ -0,0 +1,302 @@
+"""
+저작권 인덱스 샤드 / 매니페스트
+
+인덱스를 덮어쓰지 않고 추가만 하는(append-only) 샤드로 관리한다.
+
+cache/<model_key>/
+  shards/<shard_id>/        : 불변 샤드. embeddings.npy(+ 양자화/IVF 변형), store/(컬럼 저장소), keys.json
+  manifests/v000001.json    : 버전별 매니페스트 (모델 키, 샤드 목록과 전역 행 범위, 샤드 내용 해시, 삭제 행)
+  CURRENT                   : 현재 매니페스트 파일 이름. 임시 파일 + os.replace로 교체하므로 원자적으로 바뀐다
+
+행 식별자(key)는 game_id(없으면 게임 이름), 내용 해시는 후보 텍스트 + 메타로 계산한다.
+인덱서는 새로 생기거나 바뀐 행만 새 샤드로 인코딩하고, 바뀌거나 사라진 행의 이전 위치는 tombstone으로 표시한다.
+분석기는 CURRENT가 바뀌면 이미 열어 둔 샤드는 그대로 재사용하고 새 샤드만 mmap 해서 교체(hot-swap)한다.
+"""
+import os
+import json
+import time
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .columnar import ColumnarStore
+from .keywords import Masks, candidate_masks, load_keyword_bits, row_masks
+from .search import EMBEDDINGS_FILE, load_engine, top_k
+
+MANIFEST_FORMAT = "copyright-manifest-v1"
+CURRENT_FILE = "CURRENT"
+MANIFEST_DIR = "manifests"
+SHARD_DIR = "shards"
+KEYS_FILE = "keys.json"
+
+
+def row_key(row: Dict[str, Any]) -> str:
+    game_id = row.get("game_id")
+    if game_id is not None and not (isinstance(game_id, float) and np.isnan(game_id)):
+        return f"id:{int(game_id)}"
+    return f"name:{row.get('title', '')}"
+
+
+def content_hash(candidate_text: str, row: Dict[str, Any]) -> str:
+    payload = json.dumps([candidate_text, str(row.get("title", "")), str(row.get("category", "")),
+                          str(row.get("mechanic", "")), str(row.get("Description", ""))], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def unique_keys(rows: Sequence[Dict[str, Any]], seen: Optional[Dict[str, int]] = None) -> List[str]:
+    """같은 키가 여러 번 나오면 등장 순서대로 #2, #3을 붙인다. 청크 단위로 부를 때는 seen을 이어서 넘긴다."""
+    seen = {} if seen is None else seen
+    keys = []
+    for row in rows:
+        key = row_key(row)
+        seen[key] = seen.get(key, 0) + 1
+        keys.append(key if seen[key] == 1 else f"{key}#{seen[key]}")
+    return keys
+
+
+def hash_directory(directory: Path) -> str:
+    """샤드 디렉터리 파일 내용 해시 (매니페스트에 기록해 손상/불일치를 확인)."""
+    digest = hashlib.sha256()
+    for path in sorted(p for p in directory.rglob("*") if p.is_file()):
+        digest.update(str(path.relative_to(directory)).encode("utf-8"))
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+# ---------- 매니페스트 ----------
+
+def read_current(cache_dir) -> Optional[str]:
+    try:
+        with open(Path(cache_dir) / CURRENT_FILE, "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def load_manifest(cache_dir, name: Optional[str] = None) -> Optional[dict]:
+    name = name or read_current(cache_dir)
+    if name is None:
+        return None
+    with open(Path(cache_dir) / MANIFEST_DIR / name, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != MANIFEST_FORMAT:
+        raise ValueError(f"지원하지 않는 매니페스트 형식: {manifest.get('format')}")
+    manifest["name"] = name
+    return manifest
+
+
+def _write_atomic(path: Path, text: str):
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def publish_manifest(cache_dir, manifest: dict) -> str:
+    """새 매니페스트를 쓰고 CURRENT를 원자적으로 교체한다. 매니페스트 파일 이름을 반환."""
+    cache_dir = Path(cache_dir)
+    (cache_dir / MANIFEST_DIR).mkdir(parents=True, exist_ok=True)
+    name = f"v{manifest['version']:06d}.json"
+    body = {k: v for k, v in manifest.items() if k != "name"}
+    _write_atomic(cache_dir / MANIFEST_DIR / name, json.dumps(body, ensure_ascii=False, indent=2))
+    _write_atomic(cache_dir / CURRENT_FILE, name)
+    return name
+
+
+def new_manifest(previous: Optional[dict], model_key: str, model_name: str) -> dict:
+    return {
+        "format": MANIFEST_FORMAT,
+        "version": (previous["version"] + 1) if previous else 1,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "model_key": model_key,
+        "model_name": model_name,
+        "shards": [],
+        "tombstones": {},
+        "num_rows": 0,
+        "num_live_rows": 0,
+    }
+
+
+def live_rows(cache_dir, manifest: dict) -> Dict[str, Tuple[str, int, str]]:
+    """현재 살아있는 행: key → (shard_id, 샤드 내 행 번호, 내용 해시)."""
+    rows = {}
+    for shard in manifest["shards"]:
+        dead = set(manifest["tombstones"].get(shard["id"], []))
+        with open(Path(cache_dir) / SHARD_DIR / shard["id"] / KEYS_FILE, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        for local, (key, digest) in enumerate(entries):
+            if local not in dead:
+                rows[key] = (shard["id"], local, digest)
+    return rows
+
+
+# ---------- 런타임 (분석기) ----------
+
+class Shard:
+    """불변 샤드 하나: mmap 임베딩 + 검색 엔진 + 컬럼 저장소."""
+
+    def __init__(self, directory: Path):
+        self.id = directory.name
+        self.directory = directory
+        self.embeddings = np.load(directory / EMBEDDINGS_FILE, mmap_mode="r")
+        self.store = ColumnarStore(directory / "store")
+        self.engine = load_engine(directory, self.embeddings)
+        self.texts = self.store.text_column("candidate_text")
+        self.rows = self.store.rows()
+        # 공통 요소 추출용 키워드 비트셋 (이전 샤드에는 없을 수 있음)
+        self.keywords = load_keyword_bits(directory)
+
+
+class _Concat(Sequence):
+    """여러 샤드의 시퀀스를 전역 행 번호로 이어 붙인 뷰."""
+
+    def __init__(self, parts: List[Sequence], offsets: np.ndarray):
+        self.parts = parts
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return int(self.offsets[-1])
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        i = int(i)
+        if i < 0:
+            i += len(self)
+        part = int(np.searchsorted(self.offsets, i, side="right")) - 1
+        return self.parts[part][i - int(self.offsets[part])]
+
+    def __iter__(self) -> Iterator:
+        for part in self.parts:
+            yield from part
+
+
+class ShardedSearch:
+    """샤드별 엔진으로 검색한 뒤 삭제 행을 빼고 전역 상위 k개로 병합한다."""
+    name = "sharded"
+
+    def __init__(self, shards: List[Shard], offsets: np.ndarray, dead: List[np.ndarray]):
+        self.shards = shards
+        self.offsets = offsets
+        self.dead = dead
+        inner = {s.engine.name for s in shards}
+        self.name = f"sharded({','.join(sorted(inner))})"
+
+    def _merge(self, hits) -> Tuple[np.ndarray, np.ndarray]:
+        idx = np.concatenate([h[0] for h in hits]) if hits else np.empty(0, dtype=np.int64)
+        scores = np.concatenate([h[1] for h in hits]) if hits else np.empty(0, dtype=np.float32)
+        return idx, scores
+
+    def _exclude(self, n: int) -> Optional[np.ndarray]:
+        return self.dead[n] if len(self.dead[n]) else None
+
+    def search(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        hits = []
+        for n, shard in enumerate(self.shards):
+            # 삭제된 행은 엔진이 상위 k개를 고르기 전에 제외한다 (삭제 표시가 많아도 쿼리 비용은 그대로)
+            local_idx, local_scores = shard.engine.search(query, k, self._exclude(n))
+            hits.append((np.asarray(local_idx) + self.offsets[n], np.asarray(local_scores)))
+        idx, scores = self._merge(hits)
+        order = top_k(scores, k)
+        return idx[order], scores[order]
+
+    def search_batch(self, queries: np.ndarray, k: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        per_shard = [shard.engine.search_batch(queries, k, self._exclude(n)) for n, shard in enumerate(self.shards)]
+        results = []
+        for q in range(len(queries)):
+            hits = [(np.asarray(per_shard[n][q][0]) + self.offsets[n], np.asarray(per_shard[n][q][1]))
+                    for n in range(len(self.shards))]
+            idx, scores = self._merge(hits)
+            order = top_k(scores, k)
+            results.append((idx[order], scores[order]))
+        return results
+
+
+class ShardedIndex:
+    """매니페스트 한 버전에 대한 읽기 전용 뷰. 분석기는 요청마다 이 객체 하나를 잡고 쓴다."""
+
+    def __init__(self, cache_dir, manifest: dict, opened: Optional[Dict[str, Shard]] = None):
+        cache_dir = Path(cache_dir)
+        opened = opened or {}
+        self.manifest = manifest
+        self.version = manifest["name"]
+        self.shards = [opened.get(s["id"]) or Shard(cache_dir / SHARD_DIR / s["id"]) for s in manifest["shards"]]
+        sizes = [len(s.embeddings) for s in self.shards]
+        for shard, spec, size in zip(self.shards, manifest["shards"], sizes):
+            if size != spec["num_rows"]:
+                raise ValueError(f"샤드 {shard.id} 행 수 불일치: {size} != {spec['num_rows']}")
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        dead = [np.asarray(sorted(manifest["tombstones"].get(s.id, [])), dtype=np.int64) for s in self.shards]
+        self.engine = ShardedSearch(self.shards, self.offsets, dead)
+        self._positions = {s.id: n for n, s in enumerate(self.shards)}
+        self._dead_sets = [set(d.tolist()) for d in dead]
+        self.candidate_texts = _Concat([s.texts for s in self.shards], self.offsets)
+        self.meta = _Concat([s.rows for s in self.shards], self.offsets)
+        self.num_live_rows = int(manifest["num_live_rows"])
+
+    def opened_shards(self) -> Dict[str, Shard]:
+        return {s.id: s for s in self.shards}
+
+    def locate(self, i: int) -> Tuple[str, int]:
+        """전역 행 번호 → (샤드 id, 샤드 내 행). 샤드는 불변이라 버전이 바뀌어도 같은 행을 가리킨다."""
+        n = int(np.searchsorted(self.offsets, int(i), side="right")) - 1
+        return self.shards[n].id, int(i) - int(self.offsets[n])
+
+    def global_row(self, shard_id: str, local: int) -> int:
+        return int(self.offsets[self._positions[shard_id]]) + int(local)
+
+    def is_live(self, shard_id: str, local: int) -> bool:
+        """(샤드 id, 행)이 이 버전에 있고 삭제 표시되지 않았는지."""
+        n = self._positions.get(shard_id)
+        return n is not None and int(local) not in self._dead_sets[n]
+
+    def keyword_masks(self, i: int, row: Dict[str, Any]) -> Masks:
+        """전역 행 i의 키워드 비트셋. 샤드에 저장돼 있으면 읽기만 하고, 없으면 메타 행에서 계산."""
+        n = int(np.searchsorted(self.offsets, int(i), side="right")) - 1
+        bits = self.shards[n].keywords
+        return row_masks(bits, int(i) - int(self.offsets[n])) if bits is not None else candidate_masks(row)
+
+    def info(self) -> dict:
+        return {
+            "version": self.version,
+            "modelKey": self.manifest["model_key"],
+            "createdAt": self.manifest["created_at"],
+            "engine": self.engine.name,
+            "numRows": int(self.offsets[-1]),
+            "numLiveRows": self.num_live_rows,
+            "shards": [{"id": s["id"], "rows": s["rows"], "numRows": s["num_rows"],
+                        "tombstones": len(self.manifest["tombstones"].get(s["id"], []))}
+                       for s in self.manifest["shards"]],
+        }
+
+
+class FlatIndex:
+    """샤드/매니페스트 이전 형식(단일 디렉터리) 또는 폴백 모드 인덱스. ShardedIndex와 같은 속성을 가진다."""
+
+    def __init__(self, version: Optional[str], engine, meta: Sequence, candidate_texts: Sequence, embeddings=None):
+        self.version = version
+        self.engine = engine
+        self.meta = meta
+        self.candidate_texts = candidate_texts
+        self.embeddings = embeddings
+
+    def opened_shards(self) -> Dict[str, Shard]:
+        return {}
+
+    def keyword_masks(self, i: int, row: Dict[str, Any]) -> Masks:
+        return candidate_masks(row)
+
+    def info(self) -> dict:
+        return {
+            "version": self.version,
+            "engine": self.engine.name if self.engine is not None else None,
+            "numRows": len(self.candidate_texts),
+            "numLiveRows": len(self.candidate_texts),
+            "shards": [],
+        }
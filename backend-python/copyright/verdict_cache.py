@@ -0,0 +1,38 @@
+"""
+저작권 판정 결과 캐시 (summaryText + 인덱스 버전 + 모델 키 → PlanCopyrightCheckResponse)
+
+같은 기획안을 하루에도 여러 번 검사하는데, 추출 캐시가 GPT 호출은 없애도 encode / 검색 / 요약은 매번 다시 돈다.
+판정 결과 자체를 보관해 두면 내용이 그대로인 재검사는 밀리초 안에 끝난다.
+
+키에는 결과를 바꿀 수 있는 것을 모두 넣으므로 따로 지우지 않아도 자동으로 무효화된다.
+- 공백 정규화한 summaryText, 추출 방식(번역 여부, single/two-step, 프롬프트 버전)
+- 분석기 버전 문자열(CopyrightAnalyzer.verdict_version): 모델 키 + 인코더 변형 + 인덱스 매니페스트 버전 +
+  위험도 임계값 / 키워드 사전 지문 → 인덱스를 다시 발행하거나 임계값을 바꾸면 이전 판정은 쓰이지 않는다
+
+- COPYRIGHT_VERDICT_CACHE_SIZE : 메모리 LRU 항목 수 (기본 2048, 0이면 끔)
+- COPYRIGHT_VERDICT_CACHE_TTL  : 항목 유효 시간(초, 기본은 추출 캐시와 같음)
+- COPYRIGHT_VERDICT_CACHE_DIR  : 디스크 계층 경로 (비어 있으면 메모리만 사용)
+"""
+import os
+import hashlib
+
+from .embedding_cache import normalize_text
+from .extraction_cache import EXTRACT_CACHE_TTL, EXTRACT_PROMPT_VERSION, ResultCache
+from .schemas import PlanCopyrightCheckResponse
+
+VERDICT_CACHE_SIZE = int(os.getenv("COPYRIGHT_VERDICT_CACHE_SIZE", "2048"))
+# 판정은 추출 결과에서 나오므로 추출 캐시보다 오래 둘 이유가 없다
+VERDICT_CACHE_TTL = float(os.getenv("COPYRIGHT_VERDICT_CACHE_TTL", str(EXTRACT_CACHE_TTL)))
+VERDICT_CACHE_DIR = os.getenv("COPYRIGHT_VERDICT_CACHE_DIR", "")
+
+
+class VerdictCache(ResultCache[PlanCopyrightCheckResponse]):
+    def __init__(self, capacity: int = VERDICT_CACHE_SIZE, ttl: float = VERDICT_CACHE_TTL,
+                 disk_dir: str = VERDICT_CACHE_DIR):
+        super().__init__(PlanCopyrightCheckResponse, capacity, ttl, disk_dir)
+
+    @staticmethod
+    def key(summary_text: str, analyzer_version: str, extract_mode: str) -> str:
+        return hashlib.sha256(
+            f"{EXTRACT_PROMPT_VERSION}\0{extract_mode}\0{analyzer_version}\0{normalize_text(summary_text)}".encode("utf-8")
+        ).hexdigest()
@@ -4,6 +4,7 @@ import logging
 
 from .schema import GameTranslationRequest, GameTranslationResponse, BatchTranslationRequest, BatchTranslationResponse
 from .service import GameTranslationService
+from utils import resources
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -15,13 +16,10 @@ router = APIRouter(
 )
 
 # 번역 서비스 인스턴스 (지연 초기화)
-translation_service = None
+translation_service = resources.register("game_translation.service", GameTranslationService)
 
 def get_translation_service():
-    global translation_service
-    if translation_service is None:
-        translation_service = GameTranslationService()
-    return translation_service
+    return translation_service.get()
 
 
 @router.post("/game", response_model=GameTranslationResponse)
@@ -50,6 +48,8 @@ async def translate_game(request: GameTranslationRequest):
         logger.info("게임 번역 완료")
         return response
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"게임 번역 실패: {e}")
         raise HTTPException(
@@ -117,6 +117,8 @@ async def translate_batch(request: BatchTranslationRequest):
         logger.info(f"배치 번역 완료: {success_count}/{len(request.games)}개 성공")
         return response
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"배치 번역 실패: {e}")
         raise HTTPException(
@@ -157,6 +159,8 @@ async def translate_categories_only(categories: List[str]):
             "translated": translated,
             "success": True
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"카테고리 번역 실패: {e}")
         raise HTTPException(
@@ -176,6 +180,8 @@ async def translate_mechanics_only(mechanics: List[str]):
             "translated": translated,
             "success": True
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"메카닉 번역 실패: {e}")
         raise HTTPException(
@@ -203,6 +209,8 @@ async def translate_description_only(request: dict):
             "translated": translated,
             "success": True
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"설명 번역 실패: {e}")
         raise HTTPException(
@@ -291,6 +299,8 @@ async def translate_batch_optimized(request: dict):
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"최적화된 배치 번역 실패: {e}")
         raise HTTPException(status_code=500, detail=f"배치 번역 실패: {str(e)}")
\ No newline at end of file
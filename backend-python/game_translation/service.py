@@ -2,8 +2,8 @@ import os
 import asyncio
 import logging
 from typing import List, Optional, Dict, Any
-from openai import AsyncOpenAI
 import json
+from utils import deadline
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -18,6 +18,7 @@ class GameTranslationService:
         if not api_key:
             raise ValueError("OPENAI_API_KEY 환경 변수가 설정되지 않았습니다")
         
+        from openai import AsyncOpenAI
         self.client = AsyncOpenAI(api_key=api_key)
         self.model = "gpt-3.5-turbo"
         
@@ -59,7 +60,8 @@ class GameTranslationService:
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.3,
-                max_tokens=2000
+                max_tokens=2000,
+                timeout=deadline.timeout_for("llm")
             )
             
             result_text = response.choices[0].message.content.strip()
@@ -106,7 +108,8 @@ class GameTranslationService:
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.3,
-                max_tokens=500
+                max_tokens=500,
+                timeout=deadline.timeout_for("llm")
             )
             
             content = response.choices[0].message.content.strip()
@@ -155,7 +158,8 @@ class GameTranslationService:
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.3,
-                max_tokens=500
+                max_tokens=500,
+                timeout=deadline.timeout_for("llm")
             )
             
             content = response.choices[0].message.content.strip()
@@ -208,7 +212,8 @@ class GameTranslationService:
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.4,
-                max_tokens=800
+                max_tokens=800,
+                timeout=deadline.timeout_for("llm")
             )
             
             translated = response.choices[0].message.content.strip()
@@ -2,11 +2,12 @@ import json
 import re
 import os
 from dotenv import load_dotenv
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
-from langchain_openai import ChatOpenAI
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
+from utils import deadline
+from utils.resources import PromptSpec, lazy_chain
+from pipeline import speculative
+from pipeline.speculative import speculative_cache
 
 # --- 초기 설정 ---
 load_dotenv()
@@ -18,9 +19,7 @@ router = APIRouter(
 )
 
 # --- LLM 및 프롬프트 정의 ---
-llm = ChatOpenAI(model_name="gpt-4o", temperature=0.7)
-
-game_objective_prompt_template = PromptTemplate(
+game_objective_prompt_template = PromptSpec(
     input_variables=["theme", "playerCount", "averageWeight", "ideaText", "mechanics", "storyline", "world_setting", "world_tone"],
     template=(
         "# Mission: 당신은 플레이어의 동기 부여에 통달한 '목표 설계의 대가'입니다. 당신의 임무는 주어진 컨셉의 영혼을 꿰뚫고, 모든 요소가 하나의 목표를 향해 달려가는 몰입감 넘치는 경험의 청사진을 그리는 것입니다.\n\n"
@@ -61,7 +60,7 @@ game_objective_prompt_template = PromptTemplate(
         "```"
     )
 )
-game_objective_chain = LLMChain(llm=llm, prompt=game_objective_prompt_template)
+game_objective_chain = lazy_chain("goal.game_objective", game_objective_prompt_template, model_name="gpt-4o", temperature=0.7)
 
 
 # --- Pydantic 모델 정의 ---
@@ -82,11 +81,10 @@ class GameObjectiveResponse(BaseModel):
     designNote: str
 
 
-# --- API 엔드포인트 ---
-@router.post("/generate-goal", response_model=GameObjectiveResponse, summary="게임 목표 생성")
-async def generate_objective_api(request: GoalGenerationRequest):
+# --- 목표 생성 로직 ---
+def generate_objective(request: GoalGenerationRequest) -> dict:
     try:
-        response = game_objective_chain.invoke(request.dict())
+        response = deadline.invoke_chain(game_objective_chain, request.dict())
         
         match = re.search(r"```json\s*(\{.*?\})\s*```", response['text'], re.DOTALL)
         if not match:
@@ -95,5 +93,22 @@ async def generate_objective_api(request: GoalGenerationRequest):
         json_str = match.group(1)
         return json.loads(json_str)
 
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"LLM 체인 실행 중 오류: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"LLM 체인 실행 중 오류: {str(e)}")
+
+
+# --- API 엔드포인트 ---
+@router.post("/generate-goal", response_model=GameObjectiveResponse, summary="게임 목표 생성")
+def generate_objective_api(request: GoalGenerationRequest, http_request: Request = None):
+    # 컨셉 생성 직후 미리 만들어 둔 결과가 있으면 그대로 사용
+    # (take가 빗나가면 이전 추측 작업이 취소되므로 계열은 먼저 구한다. 없으면 규칙 작업은 컨셉 골격으로만 취소 가능)
+    lineage = speculative_cache.lineage_of("goal", request)
+    objective = speculative_cache.take("goal", request)
+    if objective is None:
+        objective = generate_objective(request)
+
+    if speculative.requested(http_request):
+        speculative.speculate_rule(request, objective, lineage=lineage)
+    return objective
\ No newline at end of file
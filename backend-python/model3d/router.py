@@ -8,10 +8,11 @@ import requests
 import tempfile
 
 from utils.s3_utils import upload_model3d_to_s3
+from utils import deadline, resources
 from .service import MeshyClient, create_visual_prompt
 
 router = APIRouter()
-meshy_client = MeshyClient(api_key=os.getenv("MESHY_API_KEY"))
+meshy_client = resources.register("model3d.meshy_client", lambda: MeshyClient(api_key=os.getenv("MESHY_API_KEY")))
 
 # 요청 DTO
 class Model3DGenerateRequest(BaseModel):
@@ -80,7 +81,7 @@ async def api_generate_3d_model(request: Model3DGenerateRequest):
         temp_dir = tempfile.gettempdir()
         local_path = os.path.join(temp_dir, f"{request.content_id}.glb")
         try:
-            with requests.get(result_data["refined_url"], stream=True) as r:
+            with requests.get(result_data["refined_url"], stream=True, timeout=deadline.timeout_for("download")) as r:
                 r.raise_for_status()
                 with open(local_path, 'wb') as f:
                     for chunk in r.iter_content(chunk_size=8192):
@@ -115,6 +116,9 @@ async def api_generate_3d_model(request: Model3DGenerateRequest):
             status="completed"
         )
 
+    except HTTPException:
+        # 다운로드/업로드 실패(500), 리소스 없음(503), 시간 예산 초과(504)는 그대로 전달
+        raise
     except Exception as e:
         logging.error(f"예상치 못한 오류: {e}")
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
@@ -13,12 +13,13 @@ import time
 import logging
 from dotenv import load_dotenv
 from typing import Optional, Dict, Any
-from openai import OpenAI
+from utils import deadline
+from utils.resources import lazy_openai_client
 
 # --- 1. 로깅 및 전역 클라이언트 설정 ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 load_dotenv()
-openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+openai_client = lazy_openai_client()
 
 
 # --- 2. OpenAI 프롬프트 생성 기능 ---
@@ -56,11 +57,14 @@ def create_visual_prompt(
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
-            ]
+            ],
+            timeout=deadline.timeout_for("llm")
         )
         visual_prompt = response.choices[0].message.content
         logging.info(f"[OpenAI] 생성된 프롬프트: {visual_prompt}")
         return visual_prompt
+    except deadline.DeadlineExceeded:
+        raise
     except Exception as e:
         logging.error(f"[OpenAI] 프롬프트 생성 실패: {e}")
         return None
@@ -79,7 +83,7 @@ class MeshyClient:
         logging.info(f"[{task_name}] 작업({task_id})의 완료를 기다립니다...")
         while True:
             try:
-                response = requests.get(f"{self.base_url}/{task_id}", headers=self.headers)
+                response = requests.get(f"{self.base_url}/{task_id}", headers=self.headers, timeout=deadline.timeout_for("meshy"))
                 response.raise_for_status()
                 data = response.json()
                 status = data.get("status")
@@ -92,7 +96,9 @@ class MeshyClient:
                     logging.error(f"❌ [{task_name}] 작업({task_id}) 실패. 원인: {error_msg}")
                     return None
                 
-                time.sleep(10)
+                # 다음 폴링까지 기다릴 예산이 없으면 여기서 중단 (DeadlineExceeded)
+                left = deadline.ensure("meshy")
+                time.sleep(10 if left is None else min(10, left - deadline.STAGE_MIN_SECONDS["meshy"]))
             except requests.exceptions.RequestException as e:
                 logging.error(f"❌ [{task_name}] 상태 확인 중 오류 발생: {e}")
                 return None
@@ -105,7 +111,7 @@ class MeshyClient:
         logging.info(f"[Meshy] Preview Task 생성을 시작합니다.")
         preview_payload = {"mode": "preview", "prompt": prompt, "art_style": art_style}
         try:
-            response = requests.post(self.base_url, headers=self.headers, json=preview_payload)
+            response = requests.post(self.base_url, headers=self.headers, json=preview_payload, timeout=deadline.timeout_for("meshy"))
             response.raise_for_status()
             preview_id = response.json().get("result")
         except requests.exceptions.RequestException as e:
@@ -119,7 +125,7 @@ class MeshyClient:
         logging.info(f"[Meshy] Refine Task 생성을 시작합니다.")
         refine_payload = {"mode": "refine", "preview_task_id": preview_id}
         try:
-            response = requests.post(self.base_url, headers=self.headers, json=refine_payload)
+            response = requests.post(self.base_url, headers=self.headers, json=refine_payload, timeout=deadline.timeout_for("meshy"))
             response.raise_for_status()
             refine_id = response.json().get("result")
         except requests.exceptions.RequestException as e:
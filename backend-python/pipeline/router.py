@@ -0,0 +1,35 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+
+from .schema import PlanPipelineRequest
+from .service import run_pipeline, resolve_stages
+from .speculative import speculative_cache
+
+router = APIRouter(prefix="/api/plans", tags=["Plan Pipeline"])
+
+
+@router.post("/generate-plan", summary="컨셉부터 전체 기획 산출물까지 DAG로 병렬 생성")
+async def generate_plan_api(request: PlanPipelineRequest):
+    """
+    컨셉 입력을 받아 컨셉 → 목표 → 규칙 → 구성요소 → (요약, 카드 문구, 카드 이미지, 썸네일, 밸런스, 가격)을
+    의존성 순서대로 실행합니다. 서로 독립적인 단계는 동시에 실행됩니다.
+
+    응답은 NDJSON 스트림이며, 단계가 끝날 때마다 한 줄씩 전송됩니다.
+    마지막 줄은 stage="pipeline" 요약 이벤트입니다.
+    """
+    try:
+        resolve_stages(request.stages)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    async def event_stream():
+        async for event in run_pipeline(request):
+            yield event.model_dump_json() + "\n"
+
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
+
+@router.get("/speculation/stats", summary="다음 단계 추측 실행 통계")
+def speculation_stats_api():
+    """추측 실행 적중/미스/취소 횟수와 대기 중인 작업 수를 반환합니다."""
+    return speculative_cache.snapshot()
@@ -0,0 +1,27 @@
+from pydantic import BaseModel, Field
+from typing import Any, List, Optional
+
+
+class PlanPipelineRequest(BaseModel):
+    """컨셉 입력부터 기획 산출물 전체를 한 번에 생성하는 요청 스키마"""
+    projectId: int = Field(..., example=1)
+    theme: str = Field(..., example="우주 탐험")
+    playerCount: str = Field(..., example="2~4명")
+    averageWeight: float = Field(..., example=3.2, description="1.0(가벼움) ~ 5.0(무거움)")
+    gameName: Optional[str] = Field(None, description="요약/썸네일에 사용할 게임 이름 (없으면 테마 사용)")
+    world_setting: str = ""
+    world_tone: str = ""
+    stages: Optional[List[str]] = Field(
+        None,
+        description="실행할 단계 목록 (선행 단계는 자동 포함). 없으면 전체 실행",
+        example=["summary", "pricing"]
+    )
+
+
+class StageEvent(BaseModel):
+    """단계 하나가 끝날 때마다 스트리밍되는 이벤트 (NDJSON 한 줄)"""
+    stage: str
+    status: str  # completed | failed | skipped
+    elapsedSeconds: float
+    result: Optional[Any] = None
+    error: Optional[str] = None
@@ -0,0 +1,321 @@
+"""
+기획 파이프라인 오케스트레이터
+
+Spring이 컨셉 → 목표 → 규칙 → 구성요소 → (요약, 카드 문구, 카드 이미지, 썸네일 ...)을
+HTTP로 하나씩 직렬 호출하던 흐름을 의존성 DAG로 실행한다.
+선행 단계가 끝난 단계는 바로 동시에 시작되므로 전체 소요 시간은 모든 단계의 합이 아니라
+임계 경로(critical path) 길이가 된다.
+
+    concept ─┬─ goal ── rule ─┬─ components ─┬─ summary
+             │                │               ├─ card_text
+             │                │               ├─ card_images
+             │                │               └─ pricing
+             │                └─ balance
+             └─ thumbnail
+"""
+import re
+import json
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+from .schema import PlanPipelineRequest, StageEvent
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Stage:
+    name: str
+    run: Callable[[PlanPipelineRequest, Dict[str, Any]], Awaitable[Any]]
+    deps: List[str] = field(default_factory=list)
+
+
+# ---------- 단계 구현 (기존 라우터 로직 재사용) ----------
+async def _run_concept(req: PlanPipelineRequest, results: Dict[str, Any]) -> dict:
+    from concept.router import generate_concept_api, GenerateConceptRequest, ConceptResponse
+    concept = await run_in_threadpool(generate_concept_api, GenerateConceptRequest(
+        projectId=req.projectId,
+        theme=req.theme,
+        playerCount=req.playerCount,
+        averageWeight=req.averageWeight,
+    ))
+    # conceptId/planId가 numpy 정수라 응답 모델로 한 번 정규화
+    return ConceptResponse.model_validate({k: int(v) if k.endswith("Id") else v for k, v in concept.items()}).model_dump()
+
+
+async def _run_goal(req: PlanPipelineRequest, results: Dict[str, Any]) -> dict:
+    from goal.router import generate_objective_api, GoalGenerationRequest, GameObjectiveResponse
+    concept = results["concept"]
+    goal = await run_in_threadpool(generate_objective_api, GoalGenerationRequest(
+        theme=concept["theme"],
+        playerCount=concept["playerCount"],
+        averageWeight=concept["averageWeight"],
+        ideaText=concept["ideaText"],
+        mechanics=concept["mechanics"],
+        storyline=concept["storyline"],
+        world_setting=req.world_setting,
+        world_tone=req.world_tone,
+    ))
+    return GameObjectiveResponse.model_validate(goal).model_dump()
+
+
+async def _run_rule(req: PlanPipelineRequest, results: Dict[str, Any]) -> dict:
+    from rule.router import generate_rules_api, GameRuleGenerationRequest
+    concept, goal = results["concept"], results["goal"]
+    return await run_in_threadpool(generate_rules_api, GameRuleGenerationRequest(
+        theme=concept["theme"],
+        playerCount=concept["playerCount"],
+        averageWeight=concept["averageWeight"],
+        ideaText=concept["ideaText"],
+        mechanics=concept["mechanics"],
+        storyline=concept["storyline"],
+        world_setting=req.world_setting,
+        world_tone=req.world_tone,
+        mainGoal=goal["mainGoal"],
+        subGoals=json.dumps(goal["subGoals"], ensure_ascii=False),  # Spring과 동일하게 JSON 문자열로 전달
+        winConditionType=goal["winConditionType"],
+        objective_designNote=goal["designNote"],
+    ))
+
+
+async def _run_components(req: PlanPipelineRequest, results: Dict[str, Any]) -> dict:
+    from component.router import generate_components_api, ComponentGenerationRequest
+    concept, goal, rule = results["concept"], results["goal"], results["rule"]
+    components = await run_in_threadpool(generate_components_api, ComponentGenerationRequest(
+        theme=concept["theme"],
+        ideaText=concept["ideaText"],
+        mechanics=concept["mechanics"],
+        mainGoal=goal["mainGoal"],
+        turnStructure=rule["turnStructure"],
+        actionRules=rule["actionRules"],
+    ))
+    return components.model_dump()
+
+
+async def _run_summary(req: PlanPipelineRequest, results: Dict[str, Any]) -> dict:
+    from summary.router import (
+        generate_summary_api, SummaryGenerationRequest, ConceptData, GoalData, RuleData, ComponentItemSummary
+    )
+    concept, goal, rule = results["concept"], results["goal"], results["rule"]
+    summary = await run_in_threadpool(generate_summary_api, SummaryGenerationRequest(
+        gameName=_game_name(req),
+        concept=ConceptData(**concept),
+        goal=GoalData(**goal),
+        rule=RuleData(**rule),
+        components=[ComponentItemSummary(**c) for c in results["components"]["components"]],
+    ))
+    return summary.model_dump()
+
+
+async def _run_card_text(req: PlanPipelineRequest, results: Dict[str, Any]) -> dict:
+    from card_text.router import generate_card_texts, CardTextGenerateRequest
+    concept = results["concept"]
+    response = await run_in_threadpool(generate_card_texts, CardTextGenerateRequest(
+        theme=concept["theme"],
+        storyline=concept["storyline"],
+        cards=_card_infos(results),
+    ))
+    return {"generated_texts": [t.model_dump(by_alias=True) for t in response["generated_texts"]]}
+
+
+async def _run_card_images(req: PlanPipelineRequest, results: Dict[str, Any]) -> dict:
+    from card_image.router import generate_card_images, CardImageGenerateRequest
+    concept = results["concept"]
+    response = await run_in_threadpool(generate_card_images, CardImageGenerateRequest(
+        theme=concept["theme"],
+        storyline=concept["storyline"],
+        cards=_card_infos(results),
+    ))
+    return {"generated_images": [i.model_dump(by_alias=True) for i in response["generated_images"]]}
+
+
+async def _run_thumbnail(req: PlanPipelineRequest, results: Dict[str, Any]) -> dict:
+    from thumbnail.router import generate_thumbnail, ThumbnailGenerateRequest
+    concept = results["concept"]
+    response = await run_in_threadpool(generate_thumbnail, ThumbnailGenerateRequest(
+        contentId=concept["planId"],
+        theme=concept["theme"],
+        storyline=concept["storyline"],
+        projectTitle=_game_name(req),
+    ))
+    return response.model_dump()
+
+
+async def _run_balance(req: PlanPipelineRequest, results: Dict[str, Any]) -> dict:
+    from balance.router import analyze_balance_endpoint, AnalysisRequest, GameRuleDetails
+    rule = results["rule"]
+    response = await run_in_threadpool(analyze_balance_endpoint, AnalysisRequest(rules=GameRuleDetails(
+        ruleId=rule["ruleId"],
+        gameName=_game_name(req),
+        turnStructure=rule["turnStructure"],
+        actionRules=rule["actionRules"],
+        victoryCondition=rule["victoryCondition"],
+        penaltyRules=rule.get("penaltyRules", []),
+    )))
+    return response.model_dump()
+
+
+async def _run_pricing(req: PlanPipelineRequest, results: Dict[str, Any]) -> dict:
+    from pricing.api import estimate_price, PlanPriceRequest, ComponentAnalysis
+    concept = results["concept"]
+    components = results["components"]["components"]
+    plan_text = "\n".join([
+        concept["theme"], concept["ideaText"], concept["mechanics"], concept["storyline"],
+        *[f"{c['type']} {c['title']} {c['quantity']}" for c in components],
+    ])
+    return await run_in_threadpool(estimate_price, PlanPriceRequest(
+        planId=concept["planId"],
+        planText=plan_text,
+        componentAnalysis=ComponentAnalysis(**_component_analysis(components)),
+    ))
+
+
+STAGES: Dict[str, Stage] = {s.name: s for s in [
+    Stage("concept", _run_concept),
+    Stage("goal", _run_goal, ["concept"]),
+    Stage("rule", _run_rule, ["concept", "goal"]),
+    Stage("components", _run_components, ["concept", "goal", "rule"]),
+    Stage("summary", _run_summary, ["concept", "goal", "rule", "components"]),
+    Stage("card_text", _run_card_text, ["concept", "components"]),
+    Stage("card_images", _run_card_images, ["concept", "components"]),
+    Stage("thumbnail", _run_thumbnail, ["concept"]),
+    Stage("balance", _run_balance, ["rule"]),
+    Stage("pricing", _run_pricing, ["concept", "components"]),
+]}
+
+
+# ---------- 헬퍼 ----------
+def _game_name(req: PlanPipelineRequest) -> str:
+    return req.gameName or req.theme
+
+
+def _card_infos(results: Dict[str, Any]) -> List[dict]:
+    # card_text / card_image 라우터가 각자 CardInfo 모델을 가지므로 dict로 넘겨 요청 모델이 검증하게 한다
+    return [
+        {"name": c["title"], "effect": c["role_and_effect"], "description": c["art_concept"]}
+        for c in results["components"]["components"]
+        if c["type"].lower() == "card" or "카드" in c["type"]
+    ]
+
+
+def _quantity(text: str) -> int:
+    match = re.search(r"\d+", text or "")
+    return int(match.group()) if match else 1
+
+
+def _component_analysis(components: List[dict]) -> dict:
+    """구성요소 목록에서 가격 예측용 수량 집계 (Spring ComponentAnalysis와 같은 형태)."""
+    buckets = {"card": "totalCards", "token": "totalTokens", "dice": "totalDice", "board": "totalBoards"}
+    analysis = {"totalCards": 0, "totalTokens": 0, "totalDice": 0, "totalBoards": 0, "totalComponents": 0}
+    breakdown: Dict[str, int] = {}
+    for c in components:
+        qty = _quantity(c["quantity"])
+        ctype = c["type"].lower()
+        analysis["totalComponents"] += qty
+        breakdown[c["type"]] = breakdown.get(c["type"], 0) + qty
+        for key, total in buckets.items():
+            if key in ctype:
+                analysis[total] += qty
+                break
+    analysis["componentBreakdown"] = breakdown
+    return analysis
+
+
+def resolve_stages(selected: Optional[List[str]]) -> List[str]:
+    """선택한 단계와 그 선행 단계 전체를 정의 순서대로 반환."""
+    if not selected:
+        return list(STAGES)
+    unknown = [s for s in selected if s not in STAGES]
+    if unknown:
+        raise ValueError(f"알 수 없는 단계: {', '.join(unknown)} (가능: {', '.join(STAGES)})")
+    needed = set()
+    stack = list(selected)
+    while stack:
+        name = stack.pop()
+        if name not in needed:
+            needed.add(name)
+            stack.extend(STAGES[name].deps)
+    return [name for name in STAGES if name in needed]
+
+
+def _error_message(e: BaseException) -> str:
+    if isinstance(e, HTTPException):
+        return str(e.detail)
+    return str(e) or type(e).__name__
+
+
+# ---------- DAG 실행 ----------
+async def run_pipeline(req: PlanPipelineRequest) -> AsyncIterator[StageEvent]:
+    """
+    의존성이 모두 끝난 단계를 즉시 동시 실행하고, 끝나는 순서대로 이벤트를 내보낸다.
+    실패한 단계의 후속 단계는 실행하지 않고 skipped로 보고한다.
+    """
+    names = resolve_stages(req.stages)
+    started_at = time.time()
+    results: Dict[str, Any] = {}
+    failed: set = set()
+    running: Dict[asyncio.Task, str] = {}
+    stage_started: Dict[str, float] = {}
+    waiting = list(names)
+
+    def schedule_ready():
+        for name in list(waiting):
+            deps = STAGES[name].deps
+            if all(d in results for d in deps):
+                waiting.remove(name)
+                stage_started[name] = time.time()
+                running[asyncio.create_task(STAGES[name].run(req, results))] = name
+
+    def skip_blocked() -> List[StageEvent]:
+        skipped = []
+        for name in list(waiting):
+            blocked_by = [d for d in STAGES[name].deps if d in failed]
+            if blocked_by:
+                waiting.remove(name)
+                failed.add(name)
+                skipped.append(StageEvent(
+                    stage=name, status="skipped", elapsedSeconds=0.0,
+                    error=f"선행 단계 실패: {', '.join(blocked_by)}"
+                ))
+        return skipped
+
+    try:
+        schedule_ready()
+        while running:
+            done, _ = await asyncio.wait(running.keys(), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = running.pop(task)
+                elapsed = round(time.time() - stage_started[name], 2)
+                if task.exception() is not None:
+                    failed.add(name)
+                    logger.error(f"[pipeline] '{name}' 단계 실패: {task.exception()}")
+                    yield StageEvent(stage=name, status="failed", elapsedSeconds=elapsed, error=_error_message(task.exception()))
+                else:
+                    results[name] = task.result()
+                    logger.info(f"[pipeline] '{name}' 단계 완료 ({elapsed}초)")
+                    yield StageEvent(stage=name, status="completed", elapsedSeconds=elapsed, result=results[name])
+            # 실패가 연쇄되면 한 번에 여러 단계가 막힐 수 있으므로 더 없을 때까지 반복
+            while True:
+                skipped = skip_blocked()
+                if not skipped:
+                    break
+                for event in skipped:
+                    yield event
+            schedule_ready()
+    finally:
+        # 클라이언트 연결이 끊기면 남은 단계는 더 이상 진행하지 않는다.
+        for task in running:
+            task.cancel()
+
+    yield StageEvent(
+        stage="pipeline",
+        status="failed" if failed else "completed",
+        elapsedSeconds=round(time.time() - started_at, 2),
+        result={"completed": [n for n in names if n in results], "failed": sorted(failed)},
+    )
@@ -0,0 +1,233 @@
+"""
+다음 단계 추측 실행 (speculative precomputation)
+
+/generate-concept 다음에는 거의 항상 같은 필드로 /generate-goal이, 목표 다음에는 /generate-rule이 호출된다.
+추측 모드가 켜져 있으면 한 단계가 끝나는 즉시 다음 단계 요청을 예측해 백그라운드에서 미리 생성하고,
+정확히 같은 입력으로 요청이 들어오면 캐시된 결과(또는 진행 중인 작업)를 그대로 돌려준다.
+
+- 활성화: 환경변수 SPECULATIVE_PRECOMPUTE=true 또는 요청 헤더 X-Speculate: true (헤더가 우선)
+- 낮은 우선순위: 요청 스레드풀과 분리된 작은 전용 스레드풀 + 별도 시간 예산에서 실행
+- 계열(lineage): 추측 작업은 projectId(알 때)와 컨셉 골격(테마 / 인원 / 난이도 해시, concept_frame)을 함께 기록한다.
+  Spring의 목표 / 규칙 요청에는 projectId가 없으므로 이후 단계는 컨셉 골격으로 같은 계열을 찾는다.
+- 취소: 사용자가 다음 단계 대신 컨셉을 수정(/regenerate-concept)하면 해당 계열 작업을 취소하고,
+  필드를 고쳐 요청해 take()가 빗나가면 같은 단계 · 같은 계열의 이전 추측 작업을 취소한다.
+  시작 전 작업은 실행하지 않고, 실행 중인 작업은 예산의 취소 이벤트로 LLM 스트림을 끊는다 (utils.deadline)
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional, Union
+
+from pydantic import BaseModel
+
+from utils import deadline
+
+logger = logging.getLogger(__name__)
+
+SPECULATE_HEADER = "x-speculate"
+SPECULATIVE_ENABLED = os.getenv("SPECULATIVE_PRECOMPUTE", "false").lower() == "true"
+SPECULATIVE_WORKERS = int(os.getenv("SPECULATIVE_WORKERS", "2"))
+SPECULATIVE_BUDGET_SECONDS = float(os.getenv("SPECULATIVE_BUDGET_SECONDS", "120"))
+SPECULATIVE_TTL_SECONDS = float(os.getenv("SPECULATIVE_TTL_SECONDS", "600"))
+
+# Spring이 다음 단계 요청에 채워 보내는 세계관 값 (GameObjectiveService / GameRuleService 기준)
+PREDICTED_WORLD = {
+    "goal": (os.getenv("SPECULATIVE_GOAL_WORLD_SETTING", "임시 세계관 설정"),
+             os.getenv("SPECULATIVE_GOAL_WORLD_TONE", "임시 세계관 톤")),
+    "rule": (os.getenv("SPECULATIVE_RULE_WORLD_SETTING", "{}"),
+             os.getenv("SPECULATIVE_RULE_WORLD_TONE", "")),
+}
+
+
+def concept_frame(concept: Union[BaseModel, dict]) -> str:
+    """컨셉 골격(테마 / 인원 / 난이도) 해시. 컨셉 · 목표 · 규칙 요청이 모두 가진 필드라 단계 사이 계열 키로 쓴다."""
+    fields = concept.model_dump() if isinstance(concept, BaseModel) else concept
+    raw = json.dumps([fields["theme"], fields["playerCount"], float(fields["averageWeight"])], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class _Entry:
+    def __init__(self, future: Future, stage: str, lineage: Optional[int], frame: str, cancel: threading.Event):
+        self.future = future
+        self.stage = stage
+        self.lineage = lineage
+        self.frame = frame
+        self.cancel_event = cancel
+        self.created = time.time()
+
+    def cancel(self):
+        # 실행 전이면 Future 취소로 충분하고, 실행 중이면 작업이 이벤트를 보고 스스로 멈춘다
+        self.cancel_event.set()
+        self.future.cancel()
+
+
+class SpeculativeCache:
+    """입력 해시 → 추측 실행 결과(Future). 결과는 한 번 사용되면 제거된다."""
+
+    def __init__(self, workers: int = SPECULATIVE_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="speculative")
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        self.stats = {"scheduled": 0, "hits": 0, "misses": 0, "cancelled": 0, "failed": 0}
+
+    @staticmethod
+    def key(stage: str, request: BaseModel) -> str:
+        return hashlib.sha256(f"{stage}:{request.model_dump_json()}".encode("utf-8")).hexdigest()
+
+    def _count(self, stat: str, n: int = 1):
+        with self._lock:
+            self.stats[stat] += n
+
+    def _evict_expired(self):
+        now = time.time()
+        for key, entry in list(self._entries.items()):
+            if now - entry.created > SPECULATIVE_TTL_SECONDS:
+                entry.cancel()
+                del self._entries[key]
+
+    def schedule(self, stage: str, request: BaseModel, fn: Callable[[BaseModel], Any], lineage: Optional[int] = None):
+        """다음 단계를 백그라운드에서 미리 실행한다. 같은 입력이 이미 있으면 무시."""
+        key = self.key(stage, request)
+        cancel = threading.Event()
+
+        def run():
+            with deadline.budget_scope(SPECULATIVE_BUDGET_SECONDS, cancel=cancel):
+                return fn(request)
+
+        with self._lock:
+            self._evict_expired()
+            if key in self._entries:
+                return
+            self._entries[key] = _Entry(self._executor.submit(run), stage, lineage, concept_frame(request), cancel)
+            self.stats["scheduled"] += 1
+        logger.info(f"[speculative] '{stage}' 단계 추측 실행 시작 (lineage={lineage})")
+
+    def take(self, stage: str, request: BaseModel) -> Optional[Any]:
+        """
+        같은 입력의 추측 결과가 있으면 꺼내 반환한다. 아직 실행 중이면 남은 예산 안에서 기다린다.
+        결과가 없거나 실패/취소됐으면 None (호출자가 평소대로 생성).
+        빗나가면 사용자가 필드를 고친 것이므로 같은 단계 · 같은 계열의 이전 추측 작업은 취소한다.
+        """
+        key = self.key(stage, request)
+        with self._lock:
+            self._evict_expired()
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                frame = concept_frame(request)
+                stale = self._pop_matching(lambda e: e.stage == stage and e.frame == frame)
+        if entry is None:
+            self._count("misses")
+            self._cancel(stale, f"'{stage}' 입력 변경")
+            return None
+        try:
+            result = entry.future.result(timeout=deadline.remaining())
+        except (CancelledError, FutureTimeoutError, deadline.Cancelled):
+            self._count("misses")
+            return None
+        except Exception as e:
+            logger.warning(f"[speculative] '{stage}' 추측 실행 결과 사용 불가: {e}")
+            self._count("failed")
+            return None
+        if entry.cancel_event.is_set():
+            # 꺼낸 뒤에 계열이 취소됐으면 이전 컨셉 기준 결과이므로 버린다
+            self._count("misses")
+            return None
+        self._count("hits")
+        logger.info(f"[speculative] '{stage}' 단계 추측 결과 사용")
+        return result
+
+    def lineage_of(self, stage: str, request: BaseModel) -> Optional[int]:
+        """요청의 projectId 계열. 입력이 바뀌어 정확히 맞는 작업이 없으면 같은 단계 · 같은 컨셉 골격 작업의 계열."""
+        frame = concept_frame(request)
+        with self._lock:
+            entry = self._entries.get(self.key(stage, request))
+            if entry is None:
+                entry = next((e for e in self._entries.values()
+                              if e.stage == stage and e.frame == frame and e.lineage is not None), None)
+        return entry.lineage if entry else None
+
+    def _pop_matching(self, match: Callable[[_Entry], bool]) -> list:
+        # self._lock 안에서 호출
+        keys = [k for k, e in self._entries.items() if match(e)]
+        return [self._entries.pop(k) for k in keys]
+
+    def _cancel(self, entries: list, reason: str) -> int:
+        for entry in entries:
+            entry.cancel()
+        if entries:
+            self._count("cancelled", len(entries))
+            logger.info(f"[speculative] {reason}: 추측 작업 {len(entries)}개 취소")
+        return len(entries)
+
+    def cancel_lineage(self, lineage: Optional[int], frame: Optional[str] = None) -> int:
+        """
+        projectId 계열(또는 같은 컨셉 골격)의 추측 작업을 모두 취소하고 결과를 버린다 (실행 중인 작업은 다음 토큰에서 멈춤).
+        projectId 없이 예약된 작업(추측하지 않은 목표 다음의 규칙 등)은 frame으로만 찾을 수 있다.
+        """
+        with self._lock:
+            entries = self._pop_matching(
+                lambda e: (lineage is not None and e.lineage == lineage) or (frame is not None and e.frame == frame))
+        return self._cancel(entries, f"lineage={lineage}")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            pending = len(self._entries)
+            stats = dict(self.stats)
+        return {**stats, "pending": pending, "enabled": SPECULATIVE_ENABLED}
+
+
+speculative_cache = SpeculativeCache()
+
+
+def requested(http_request) -> bool:
+    """HTTP 요청에서 추측 모드가 켜져 있는지. 직접 호출(오케스트레이터 등)은 항상 False."""
+    if http_request is None:
+        return False
+    header = http_request.headers.get(SPECULATE_HEADER)
+    if header is not None:
+        return header.lower() in ("1", "true", "yes")
+    return SPECULATIVE_ENABLED
+
+
+# ---------- 단계별 다음 요청 예측 ----------
+def speculate_goal(concept: dict):
+    """컨셉 생성 결과로 /generate-goal 요청을 예측해 미리 실행."""
+    from goal.router import GoalGenerationRequest, generate_objective
+    world_setting, world_tone = PREDICTED_WORLD["goal"]
+    goal_request = GoalGenerationRequest(
+        theme=concept["theme"],
+        playerCount=concept["playerCount"],
+        averageWeight=concept["averageWeight"],
+        ideaText=concept["ideaText"],
+        mechanics=concept["mechanics"],
+        storyline=concept["storyline"],
+        world_setting=world_setting,
+        world_tone=world_tone,
+    )
+    speculative_cache.schedule("goal", goal_request, generate_objective, lineage=int(concept["projectId"]))
+
+
+def speculate_rule(goal_request: BaseModel, goal: dict, lineage: Optional[int] = None):
+    """목표 생성 요청/결과로 /generate-rule 요청을 예측해 미리 실행."""
+    from rule.router import GameRuleGenerationRequest, generate_rules
+    world_setting, world_tone = PREDICTED_WORLD["rule"]
+    rule_request = GameRuleGenerationRequest(
+        theme=goal_request.theme,
+        playerCount=goal_request.playerCount,
+        averageWeight=goal_request.averageWeight,
+        ideaText=goal_request.ideaText,
+        mechanics=goal_request.mechanics,
+        storyline=goal_request.storyline,
+        world_setting=world_setting,
+        world_tone=world_tone,
+        mainGoal=goal["mainGoal"],
+        # Spring(Jackson)이 보내는 JSON 문자열과 같은 형태
+        subGoals=json.dumps(goal["subGoals"], ensure_ascii=False, separators=(",", ":")),
+        winConditionType=goal["winConditionType"],
+        objective_designNote=goal["designNote"],
+    )
+    speculative_cache.schedule("rule", rule_request, generate_rules, lineage=lineage)
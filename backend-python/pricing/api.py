@@ -7,8 +7,9 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from pathlib import Path
-import re, json, joblib, numpy as np, pandas as pd
+import re, json
 from typing import Optional, Dict
+from utils import resources
 
 router = APIRouter(prefix="/api/ai-pricing", tags=["AI Pricing"])
 
@@ -16,11 +17,17 @@ BASE_DIR = Path(__file__).resolve().parent
 MODEL_PATH = BASE_DIR / "models" / "price_predictor.pkl"
 DICT_PATH = BASE_DIR / "models" / "feature_avg_dicts.pkl"
 
-if not MODEL_PATH.exists() or not DICT_PATH.exists():
-    raise RuntimeError("모델 파일이 없습니다. 먼저 `python -m pricing.model_train` 실행하세요.")
+def _load_pricing_model():
+    import joblib
+    if not MODEL_PATH.exists() or not DICT_PATH.exists():
+        raise RuntimeError("모델 파일이 없습니다. 먼저 `python -m pricing.model_train` 실행하세요.")
+    return {
+        "model": joblib.load(MODEL_PATH),
+        "feature_avg": joblib.load(DICT_PATH),  # {'cat_avg':..., 'type_avg':...}
+    }
 
-model = joblib.load(MODEL_PATH)
-feature_avg = joblib.load(DICT_PATH)  # {'cat_avg':..., 'type_avg':...}
+# 모델 파일이 없으면 이 라우터의 엔드포인트만 503으로 응답한다
+pricing_model = resources.register("pricing.model", _load_pricing_model)
 
 # ComponentAnalysis 클래스를 먼저 정의
 class ComponentAnalysis(BaseModel):
@@ -37,7 +44,11 @@ class PlanPriceRequest(BaseModel):
     componentAnalysis: Optional[ComponentAnalysis] = None
 
 @router.post("/estimate")
-async def estimate_price(req: PlanPriceRequest):
+def estimate_price(req: PlanPriceRequest):
+    # pandas / RandomForest 연산이라 동기 함수로 둔다 (FastAPI와 파이프라인 모두 스레드풀에서 실행)
+    artifacts = pricing_model.get()
+    model, feature_avg = artifacts["model"], artifacts["feature_avg"]
+
     # --- 기획서 텍스트에서 실제 정보 추출하여 AI 모델 입력값 생성 ---
     
     plan_text = req.planText.lower() if req.planText else ""
@@ -216,6 +227,7 @@ async def estimate_price(req: PlanPriceRequest):
     print(f"  - average_weight: {avg_weight}")
     print(f"  - component_count: {component_count}")
     
+    import pandas as pd
     X = pd.DataFrame([[category_avg_price, type_avg_price, min_age, avg_weight, component_count]],
                     columns=["category_avg_price", "type_avg_price", "min_age", "average_weight", "component_count"]).fillna(-1)
     
@@ -6,9 +6,9 @@ from dotenv import load_dotenv
 from typing import List
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
-from langchain_openai import ChatOpenAI
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
+from utils import deadline
+from utils.resources import PromptSpec, lazy_chain
+from pipeline.speculative import speculative_cache
 from faker import Faker
 
 # --- 초기 설정 ---
@@ -21,9 +21,6 @@ router = APIRouter(
     tags=["Rule"]
 )
 
-# --- LLM 공통 설정 ---
-llm = ChatOpenAI(model_name="gpt-4o", temperature=0.7)
-
 # --- Pydantic 모델 정의 ---
 class GameRuleGenerationRequest(BaseModel):
     theme: str
@@ -70,7 +67,7 @@ class GameRuleRegenerationResponse(BaseModel):
     designNote: str
 
 # --- 게임 규칙 '최초' 생성 기능 ---
-game_rules_prompt_template = PromptTemplate(
+game_rules_prompt_template = PromptSpec(
     input_variables=[
         "theme", "playerCount", "averageWeight", "ideaText", "mechanics",  
         "storyline", "world_setting", "world_tone", "mainGoal",  
@@ -123,12 +120,11 @@ game_rules_prompt_template = PromptTemplate(
         "```"
     )
 )
-game_rules_chain = LLMChain(llm=llm, prompt=game_rules_prompt_template)
+game_rules_chain = lazy_chain("rule.game_rules", game_rules_prompt_template, model_name="gpt-4o", temperature=0.7)
 
-@router.post("/generate-rule")
-def generate_rules_api(request: GameRuleGenerationRequest):
+def generate_rules(request: GameRuleGenerationRequest) -> dict:
     try:
-        response = game_rules_chain.invoke(request.dict())
+        response = deadline.invoke_chain(game_rules_chain, request.dict())
         response_text = response.get('text', '')
         json_match = re.search(r"```json\s*(\{.*?\})\s*```", response_text, re.DOTALL)
 
@@ -142,12 +138,22 @@ def generate_rules_api(request: GameRuleGenerationRequest):
             game_rules["ruleId"] = fake.random_int(min=10000, max=99999)
 
         return game_rules
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"규칙 생성 중 오류 발생: {e}")
 
+@router.post("/generate-rule")
+def generate_rules_api(request: GameRuleGenerationRequest):
+    # 목표 생성 직후 미리 만들어 둔 결과가 있으면 그대로 사용
+    game_rules = speculative_cache.take("rule", request)
+    if game_rules is None:
+        game_rules = generate_rules(request)
+    return game_rules
+
 
 # --- 게임 규칙 '재생성' (개선) 기능 ---
-regenerate_rules_prompt_template = PromptTemplate(
+regenerate_rules_prompt_template = PromptSpec(
     input_variables=["game_context", "original_rule_json", "feedback", "rule_id"],
     template=(
         "# Mission: 당신은 플레이어의 피드백을 반영하여 게임의 깊이를 더하는 '리드 게임 밸런서'입니다.\n"
@@ -187,7 +193,7 @@ regenerate_rules_prompt_template = PromptTemplate(
         "```"
     )
 )
-regenerate_rules_chain = LLMChain(llm=llm, prompt=regenerate_rules_prompt_template)
+regenerate_rules_chain = lazy_chain("rule.regenerate_rules", regenerate_rules_prompt_template, model_name="gpt-4o", temperature=0.7)
 
 @router.post("/regenerate-rule")
 def regenerate_rules_api(request: GameRuleRegenerationRequest):
@@ -207,7 +213,7 @@ def regenerate_rules_api(request: GameRuleRegenerationRequest):
         }
         original_rule_json_str = json.dumps(original_rule_data, indent=2, ensure_ascii=False)
 
-        response = regenerate_rules_chain.invoke({
+        response = deadline.invoke_chain(regenerate_rules_chain, {
             "game_context": game_context_summary.strip(),
             "original_rule_json": original_rule_json_str,
             "feedback": request.feedback,
@@ -226,5 +232,7 @@ def regenerate_rules_api(request: GameRuleRegenerationRequest):
         
         return regenerated_rules
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"규칙 재생성 중 오류 발생: {e}")
\ No newline at end of file
@@ -0,0 +1,177 @@
+"""
+운영용 pre-fork 서버 실행 진입점
+
+uvicorn --workers N은 워커마다 app을 새로 import 하므로 저작권 임베딩, 후보 텍스트/메타,
+SentenceTransformer 가중치, 가격 예측 RandomForest, 컨셉 FAISS 인덱스가 워커 수만큼 메모리에 올라간다.
+
+이 스크립트는
+1. 마스터 프로세스에서 app을 import 하고 리소스 레지스트리를 동기로 모두 초기화한 뒤
+2. gc.collect() + gc.freeze()로 살아있는 객체를 영구 세대로 옮겨 GC가 페이지를 건드리지 않게 하고
+3. 리스닝 소켓을 연 뒤 워커를 fork 해서 읽기 전용 페이지를 copy-on-write로 공유한다.
+
+마스터는 워커를 감시하다 죽으면 다시 띄우고, 주기적으로 워커별 고유(USS)/공유 메모리를 로그로 남긴다.
+
+주의: 마스터에서는 모델 로드까지만 하고 추론(torch forward)은 실행하지 않는다.
+      torch/OpenMP 스레드풀이 fork 이전에 만들어지면 워커에서 멈출 수 있다.
+
+사용법:
+    python serve.py --workers 4 --port 8000
+"""
+import os
+import gc
+import sys
+import json
+import time
+import signal
+import socket
+import logging
+import argparse
+from typing import Dict, Optional
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - [serve] %(message)s")
+logger = logging.getLogger("serve")
+
+MEMORY_REPORT_SECONDS = float(os.getenv("PREFORK_MEMORY_REPORT_SECONDS", "60"))
+SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def read_memory(pid: int) -> Optional[Dict[str, float]]:
+    """/proc/<pid>/smaps_rollup 기준 메모리(MB). uss = Private_Clean + Private_Dirty."""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            values = {}
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in SMAPS_FIELDS:
+                    values[key] = int(rest.split()[0]) / 1024.0
+    except OSError:
+        return None
+    uss = values.get("Private_Clean", 0.0) + values.get("Private_Dirty", 0.0)
+    shared = values.get("Shared_Clean", 0.0) + values.get("Shared_Dirty", 0.0)
+    return {
+        "rssMb": round(values.get("Rss", 0.0), 1),
+        "pssMb": round(values.get("Pss", 0.0), 1),
+        "ussMb": round(uss, 1),
+        "sharedMb": round(shared, 1),
+    }
+
+
+def preload():
+    """마스터에서 app과 모든 리소스를 로드하고 GC 대상에서 제외한다."""
+    started = time.perf_counter()
+    import app as app_module
+    from utils.resources import registry
+
+    # 로드만 한다. 더미 encode / 커넥션 pre-warm(prime)은 워커 시작 시 각 워커에서 실행된다
+    registry.warm_up(prime=False)
+    failed = {name: s["error"] for name, s in registry.status().items() if s["state"] == "failed"}
+    if failed:
+        logger.warning(f"초기화 실패 리소스 (워커에서 재시도): {failed}")
+    if app_module.disabled_routers:
+        logger.warning(f"비활성화된 라우터: {app_module.disabled_routers}")
+
+    gc.collect()
+    gc.freeze()
+    logger.info(f"사전 로드 완료 ({time.perf_counter() - started:.1f}초), 고정 객체 {gc.get_freeze_count()}개")
+    return app_module.app
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock: socket.socket, log_level: str):
+    import uvicorn
+    # 마스터의 시그널 핸들러를 기본값으로 되돌린다 (uvicorn이 자체 핸들러를 설치)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class Master:
+    def __init__(self, app, sock: socket.socket, workers: int, log_level: str):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.log_level = log_level
+        self.children: Dict[int, int] = {}  # pid -> 워커 번호
+        self.stopping = False
+
+    def spawn(self, index: int):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                run_worker(self.app, self.sock, self.log_level)
+            finally:
+                os._exit(0)
+        self.children[pid] = index
+        logger.info(f"워커 #{index} 시작 (pid={pid})")
+
+    def stop(self, signum, frame):
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def report_memory(self):
+        report = {"master": read_memory(os.getpid())}
+        for pid, index in sorted(self.children.items(), key=lambda x: x[1]):
+            report[f"worker-{index}"] = {"pid": pid, **(read_memory(pid) or {})}
+        workers = [v for k, v in report.items() if k.startswith("worker-") and "ussMb" in v]
+        if workers:
+            report["totalUssMb"] = round(sum(w["ussMb"] for w in workers), 1)
+            report["totalPssMb"] = round(sum(w["pssMb"] for w in workers) + (report["master"] or {}).get("pssMb", 0.0), 1)
+        logger.info(f"메모리: {json.dumps(report, ensure_ascii=False)}")
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for index in range(self.workers):
+            self.spawn(index)
+
+        next_report = time.monotonic() + min(MEMORY_REPORT_SECONDS, 15.0)
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid:
+                index = self.children.pop(pid)
+                if not self.stopping:
+                    logger.warning(f"워커 #{index} 종료 (pid={pid}, status={status}) → 재시작")
+                    self.spawn(index)
+                continue
+            if MEMORY_REPORT_SECONDS > 0 and time.monotonic() >= next_report and not self.stopping:
+                self.report_memory()
+                next_report = time.monotonic() + MEMORY_REPORT_SECONDS
+            time.sleep(0.5)
+        logger.info("모든 워커 종료")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="모델을 한 번만 로드하고 워커를 fork 하는 운영용 서버")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "2")))
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info"))
+    args = parser.parse_args()
+
+    if not hasattr(os, "fork"):
+        sys.exit("pre-fork 모드는 fork를 지원하는 OS(Linux 등)에서만 사용할 수 있습니다.")
+
+    app = preload()
+    sock = bind_socket(args.host, args.port)
+    logger.info(f"http://{args.host}:{args.port} 에서 워커 {args.workers}개로 서비스 시작")
+    Master(app, sock, args.workers, args.log_level).run()
+
+
+if __name__ == "__main__":
+    main()
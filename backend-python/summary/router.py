@@ -5,9 +5,8 @@ from dotenv import load_dotenv
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 from typing import List, Dict
-from langchain_openai import ChatOpenAI
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
+from utils import deadline
+from utils.resources import PromptSpec, lazy_chain
 
 # --- 초기 설정 ---
 load_dotenv()
@@ -19,9 +18,7 @@ router = APIRouter(
 )
 
 # --- LLM 및 프롬프트 정의 ---
-llm = ChatOpenAI(model_name="gpt-4o", temperature=0.7)
-
-summary_prompt_template = PromptTemplate(
+summary_prompt_template = PromptSpec(
     input_variables=["game_data_summary"],
     template=(
         "# Mission: 당신은 모든 기획 단계를 종합하여 최종 보드게임 기획서를 완성하는 '총괄 프로듀서'입니다. 당신의 임무는 흩어져 있는 기획 정보들을 하나의 일관되고 매력적인 문서로 통합하는 것입니다.\n\n"
@@ -59,7 +56,7 @@ summary_prompt_template = PromptTemplate(
     )
 )
 
-summary_chain = LLMChain(llm=llm, prompt=summary_prompt_template)
+summary_chain = lazy_chain("summary.summary", summary_prompt_template, model_name="gpt-4o", temperature=0.7)
 
 
 # --- Pydantic 모델 정의 ---
@@ -101,7 +98,7 @@ class SummaryResponse(BaseModel):
 
 # --- API 엔드포인트 ---
 @router.post("/generate-summary", response_model=SummaryResponse, summary="전체 기획서 요약 생성")
-async def generate_summary_api(request: SummaryGenerationRequest):
+def generate_summary_api(request: SummaryGenerationRequest):
     try:
         components_list = [c.dict() for c in request.components]
 
@@ -128,12 +125,14 @@ async def generate_summary_api(request: SummaryGenerationRequest):
         {json.dumps(components_list, ensure_ascii=False, indent=2)}
         """
 
-        response = summary_chain.invoke({"game_data_summary": game_data_summary.strip()})
+        response = deadline.invoke_chain(summary_chain, {"game_data_summary": game_data_summary.strip()})
         
         summary_text = response.get('text', '요약 생성에 실패했습니다.')
 
         return SummaryResponse(summaryText=summary_text)
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"기획서 요약 생성 중 오류 발생: {e}")
         raise HTTPException(status_code=500, detail=f"서버 내부 오류 발생: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,84 @@
+"""
+테스트 공통 픽스처
+
+실제 sentence-transformers 가중치 없이 돌도록 인덱서 / 검사 쿼리는 단어 해시 임베딩(HashingEncoder)을 쓴다.
+"""
+import sys
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from copyright import indexer  # noqa: E402
+from copyright.keywords import VOCABULARY  # noqa: E402
+
+MODEL_KEY = "mini12"
+FILLER_WORDS = ["the", "players", "each", "round", "north", "river", "castle", "merchant", "seasons", "gold",
+                "harbor", "village", "cards", "tokens", "journey", "storm", "crown", "forest", "island", "tower"]
+
+
+class HashingEncoder:
+    """단어 해시 bag-of-words 임베딩 (정규화). 공통 단어가 많을수록 코사인이 높고, 같은 텍스트는 같은 벡터."""
+
+    dim = 64
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=True, **kwargs):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in str(text).lower().split():
+                digest = hashlib.md5(word.encode("utf-8")).digest()
+                # 단어마다 다른 가중치 → 서로 다른 텍스트의 코사인이 우연히 같아지지 않는다
+                weight = 1.0 + digest[2] / 255.0
+                vectors[i, digest[0] % self.dim] += weight if digest[1] & 1 else -weight
+            if not vectors[i].any():
+                vectors[i, 0] = 1.0
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def make_game(game_id: int, rng: np.random.Generator) -> dict:
+    """BGG CSV 한 행 형태의 가상 게임 (설명에 게임마다 다른 단어를 넣어 점수 동률을 피한다)."""
+    description = " ".join(rng.choice(VOCABULARY + FILLER_WORDS, size=12))
+    return {
+        "name": f"Game {game_id}",
+        "game_id": game_id,
+        "category": str([w.title() for w in rng.choice(VOCABULARY, size=2)]),
+        "mechanic": str([f"{w.title()} Mechanic" for w in rng.choice(VOCABULARY, size=2)]),
+        "Description": f"{description} lot{game_id}",
+    }
+
+
+@pytest.fixture
+def make_games():
+    def make(ids, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        return [make_game(int(i), rng) for i in ids]
+    return make
+
+
+@pytest.fixture
+def encoder():
+    return HashingEncoder()
+
+
+@pytest.fixture
+def build_index(tmp_path, monkeypatch, encoder):
+    """games(CSV 행)로 인덱서를 실행해 tmp_path/cache/<model>에 새 버전을 발행하고 그 경로를 반환한다."""
+    def init_worker(model_name, torch_threads):
+        indexer._worker_model = encoder
+
+    monkeypatch.setattr(indexer, "_init_worker", init_worker)
+    out_dir = tmp_path / "cache"
+
+    def build(games, **kwargs) -> Path:
+        csv_path = tmp_path / "bgg_data.csv"
+        pd.DataFrame(games).to_csv(csv_path, index=False)
+        indexer.main(MODEL_KEY, str(csv_path), str(out_dir), workers=1, **kwargs)
+        return out_dir / MODEL_KEY
+
+    return build
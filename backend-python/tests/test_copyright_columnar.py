@@ -0,0 +1,32 @@
+"""
+컬럼 저장소(columnar.py) 행 디코딩
+"""
+import pandas as pd
+import pytest
+
+from copyright.columnar import ColumnarStore, write_copyright_store
+from copyright.indexer import build_candidate_texts, build_meta
+
+
+@pytest.fixture
+def store(tmp_path, make_games):
+    """(저장소, 기대하는 행 딕셔너리 목록)."""
+    df = pd.DataFrame(make_games(range(1, 8)))
+    meta, texts = build_meta(df), build_candidate_texts(df)
+    write_copyright_store(tmp_path / "store", meta, texts)
+    return ColumnarStore(tmp_path / "store"), [{**row, "candidate_text": text} for row, text in zip(meta, texts)]
+
+
+def test_rows_roundtrip(store):
+    columnar, expected = store
+    assert list(columnar.rows()) == expected
+
+
+def test_negative_row_index(store):
+    columnar, expected = store
+    rows = columnar.rows()
+    assert rows[-1] == expected[-1] and rows[-len(expected)] == expected[0]
+    assert rows[-3:] == expected[-3:]
+    for i in (len(expected), -len(expected) - 1):
+        with pytest.raises(IndexError):
+            rows[i]
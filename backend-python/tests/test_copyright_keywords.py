@@ -0,0 +1,113 @@
+"""
+키워드 비트셋 공통 요소(keywords.py)가 이전 부분 문자열 검사 구현과 같은 결과를 내는지
+"""
+import numpy as np
+import pytest
+
+from copyright.keywords import (GAMEPLAY_KEYWORDS, MECHANIC_CATEGORIES, SPECIAL_ELEMENTS, THEME_KEYWORDS, VOCABULARY,
+                                candidate_masks, encode_masks, load_keyword_bits, overlapping_elements, query_masks,
+                                row_masks)
+from copyright.shards import ShardedIndex, load_manifest
+
+# 키워드를 포함하거나 걸치는 단어 (부분 문자열 매칭: "wizardry" ⊃ "wizard", "boardgame" ⊃ "board")
+TRICKY_WORDS = ["wizardry", "boardgame", "cardboard", "dicey", "overland", "strategic", "teamwork", "timeless",
+                "wardrobe", "handmade", "easygoing", "roundabout", "placements", "tokenized", "deckbuilding",
+                "Space-Station", "WAR", "Magic:", "semi-cooperative", "darkness", "player's"]
+
+
+def reference_overlap(theme, mechanics, description, similar_game_data, limit=5):
+    """user-043 이전 CopyrightAnalyzer._extract_overlapping_elements (사전만 keywords.py에서 가져옴)."""
+    overlapping = []
+
+    game_theme_lower = theme.lower()
+    similar_category = similar_game_data.get('category', '').lower()
+    for theme_name, keywords in THEME_KEYWORDS.items():
+        game_has_theme = any(keyword in game_theme_lower for keyword in keywords)
+        similar_has_theme = any(keyword in similar_category for keyword in keywords)
+        if game_has_theme and similar_has_theme:
+            matching_keywords = [kw for kw in keywords if kw in game_theme_lower and kw in similar_category]
+            if matching_keywords:
+                overlapping.append(f"테마 유사성: {theme_name} 테마 (키워드: {', '.join(matching_keywords)})")
+            else:
+                overlapping.append(f"테마 유사성: {theme_name} 계열 테마")
+
+    game_mechanics_text = ' '.join(mechanics).lower()
+    similar_mechanic = similar_game_data.get('mechanic', '').lower()
+    for mechanic_name, keywords in MECHANIC_CATEGORIES.items():
+        game_has_mechanic = any(keyword in game_mechanics_text for keyword in keywords)
+        similar_has_mechanic = any(keyword in similar_mechanic for keyword in keywords)
+        if game_has_mechanic and similar_has_mechanic:
+            matching_keywords = [kw for kw in keywords if kw in game_mechanics_text and kw in similar_mechanic]
+            if matching_keywords:
+                overlapping.append(f"규칙 유사성: {mechanic_name} (공통 키워드: {', '.join(matching_keywords)})")
+            else:
+                overlapping.append(f"규칙 유사성: {mechanic_name} 계열")
+
+    game_description = description.lower()
+    similar_description = similar_game_data.get('Description', '').lower()
+    for aspect_name, keywords in GAMEPLAY_KEYWORDS.items():
+        game_has_aspect = any(keyword in game_description for keyword in keywords)
+        similar_has_aspect = any(keyword in similar_description for keyword in keywords)
+        if game_has_aspect and similar_has_aspect:
+            matching_keywords = [kw for kw in keywords if kw in game_description and kw in similar_description]
+            if matching_keywords:
+                overlapping.append(f"게임플레이 유사성: {aspect_name} (공통: {', '.join(matching_keywords)})")
+
+    game_text = f"{game_theme_lower} {game_mechanics_text} {game_description}"
+    similar_text = f"{similar_category} {similar_mechanic} {similar_description}"
+    for element in SPECIAL_ELEMENTS:
+        if element in game_text and element in similar_text:
+            overlapping.append(f"구성 요소 유사성: {element}")
+
+    return overlapping[:limit]
+
+
+def _random_text(rng: np.random.Generator, size: int) -> str:
+    words = list(rng.choice(VOCABULARY + TRICKY_WORDS + ["lorem", "ipsum", "quest-like", "x"], size=size))
+    # 대소문자 / 붙여 쓰기 변형
+    if rng.random() < 0.3:
+        words = [w.upper() if rng.random() < 0.3 else w.title() for w in words]
+    if len(words) > 1 and rng.random() < 0.3:
+        words[0] = words[0] + words[1]
+    return " ".join(words)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_bitset_overlap_matches_substring_reference(seed):
+    rng = np.random.default_rng(seed)
+    for _ in range(400):
+        theme = _random_text(rng, int(rng.integers(0, 4)))
+        mechanics = [_random_text(rng, int(rng.integers(1, 4))) for _ in range(int(rng.integers(0, 3)))]
+        description = _random_text(rng, int(rng.integers(0, 15)))
+        row = {"category": _random_text(rng, int(rng.integers(0, 5))),
+               "mechanic": _random_text(rng, int(rng.integers(0, 5))),
+               "Description": _random_text(rng, int(rng.integers(0, 20)))}
+        expected = reference_overlap(theme, mechanics, description, row)
+        assert overlapping_elements(query_masks(theme, mechanics, description), candidate_masks(row)) == expected
+
+
+def test_every_keyword_is_found_inside_longer_words():
+    # 긴 키워드가 먼저 잡혀도 그 안의 짧은 키워드(접두사 / 중간 위치)가 빠지지 않아야 한다
+    for word in VOCABULARY:
+        text = f"xx{word}yy"
+        expected = [kw for kw in VOCABULARY if kw in text]
+        row = {"category": text, "mechanic": text, "Description": text}
+        masks = candidate_masks(row)
+        assert [kw for kw in VOCABULARY if masks[0] & (1 << VOCABULARY.index(kw))] == expected
+
+
+def test_encoded_masks_roundtrip():
+    rng = np.random.default_rng(7)
+    rows = [{"category": _random_text(rng, 4), "mechanic": _random_text(rng, 4), "Description": _random_text(rng, 12)}
+            for _ in range(200)]
+    bits = encode_masks(rows)
+    assert all(row_masks(bits, i) == candidate_masks(row) for i, row in enumerate(rows))
+
+
+def test_indexer_stores_keyword_bits(build_index, make_games):
+    cache_dir = build_index(make_games(range(1, 121)))
+    index = ShardedIndex(cache_dir, load_manifest(cache_dir))
+    assert all(load_keyword_bits(shard.directory) is not None for shard in index.shards)
+    for i in range(len(index.meta)):
+        row = index.meta[i]
+        assert index.keyword_masks(i, row) == candidate_masks(row)
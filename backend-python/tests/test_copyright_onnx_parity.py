@@ -0,0 +1,115 @@
+"""
+ONNX 쿼리 인코더 vs PyTorch SentenceTransformer 일치도 (onnx_parity.py와 같은 지표)
+
+기본 검사는 tmp_path에서 만든 아주 작은 랜덤 BERT SentenceTransformer를 onnx_encoder로 내보내 비교한다
+(가중치 다운로드 없이 내보내기 → 양자화 → 토크나이저 경로 전체를 검사).
+실제 모델 검사는 내보낸 ONNX 모델(python -m copyright.onnx_encoder --model <key>)과 그 원본 torch 모델을
+둘 다 불러올 수 있을 때만 실행하고, 아니면 건너뛴다.
+"""
+import json
+
+import pytest
+
+from copyright import onnx_encoder
+from copyright.keywords import VOCABULARY
+from copyright.model_loader import MODEL_NAMES
+from copyright.onnx_encoder import ONNX_CONFIG_FILE, ONNX_FP32_FILE, ONNX_INT8_FILE, export_onnx, onnx_dir
+from copyright.onnx_parity import SAMPLE_TEXTS, _load, _parity, _perturb
+
+K = 3
+# 백엔드 → (ONNX 파일, 임베딩 코사인 최솟값, 쿼리만 바꿨을 때 top-k 일치율 최솟값)
+BACKENDS = {
+    "onnx-fp32": (ONNX_FP32_FILE, 0.9999, 1.0),
+    "onnx-int8": (ONNX_INT8_FILE, 0.98, 0.9),
+}
+
+TINY_KEY = "mini12"
+TINY_WORDS = "the a players each round game with and in of to where build world earn".split()
+
+_references = {}
+
+
+def _torch_reference(model_key: str):
+    """(후보 임베딩, 쿼리 임베딩, 점수) — torch 모델을 불러올 수 없으면 건너뛴다."""
+    with open(onnx_dir(model_key) / ONNX_CONFIG_FILE, "r", encoding="utf-8") as f:
+        source = json.load(f)["source"]
+    if source not in _references:
+        pytest.importorskip("sentence_transformers")
+        try:
+            model = _load("torch", model_key, source)
+        except Exception as e:
+            pytest.skip(f"torch 모델을 불러올 수 없음 ({source}): {e}")
+        vectors = model.encode(SAMPLE_TEXTS, normalize_embeddings=True)
+        queries = model.encode(_perturb(SAMPLE_TEXTS), normalize_embeddings=True)
+        _references[source] = (vectors, queries, queries @ vectors.T)
+    return _references[source]
+
+
+@pytest.fixture(scope="module")
+def tiny_onnx_root(tmp_path_factory):
+    """랜덤 초기화한 2층 BERT SentenceTransformer를 만들어 <root>/mini12로 내보내고 root를 반환한다."""
+    pytest.importorskip("onnxruntime")
+    transformers = pytest.importorskip("transformers")
+    st = pytest.importorskip("sentence_transformers")
+    base = tmp_path_factory.mktemp("tiny_onnx")
+    bert_dir, model_dir, root = base / "bert", base / "model", base / "onnx"
+    bert_dir.mkdir()
+
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    vocab = (["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + list(letters) + ["##" + c for c in letters]
+             + sorted(set(VOCABULARY) | set(TINY_WORDS)))
+    (bert_dir / "vocab.txt").write_text("\n".join(dict.fromkeys(vocab)), encoding="utf-8")
+    tokenizer = transformers.BertTokenizerFast(str(bert_dir / "vocab.txt"))
+    config = transformers.BertConfig(vocab_size=len(tokenizer), hidden_size=64, num_hidden_layers=2,
+                                     num_attention_heads=4, intermediate_size=128, max_position_embeddings=128)
+    transformers.set_seed(0)
+    transformers.BertModel(config).save_pretrained(str(bert_dir))
+    tokenizer.save_pretrained(str(bert_dir))
+
+    modules = [st.models.Transformer(str(bert_dir), max_seq_length=64), st.models.Pooling(64), st.models.Normalize()]
+    st.SentenceTransformer(modules=modules, device="cpu").save(str(model_dir))
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("COPYRIGHT_ONNX_DIR", str(root))
+        mp.setattr(onnx_encoder, "ONNX_ROOT", root)
+        export_onnx(TINY_KEY, source=str(model_dir))
+    return root
+
+
+@pytest.fixture
+def tiny_onnx(tiny_onnx_root, monkeypatch):
+    monkeypatch.setenv("COPYRIGHT_ONNX_DIR", str(tiny_onnx_root))
+    monkeypatch.setattr(onnx_encoder, "ONNX_ROOT", tiny_onnx_root)
+    return TINY_KEY
+
+
+def _assert_parity(model_key: str, backend: str):
+    _, min_cosine, min_agreement = BACKENDS[backend]
+    reference, ref_queries, ref_scores = _torch_reference(model_key)
+
+    model = _load(backend, model_key, None)
+    vectors = model.encode(SAMPLE_TEXTS, normalize_embeddings=True)
+    queries = model.encode(_perturb(SAMPLE_TEXTS), normalize_embeddings=True)
+
+    both = _parity(reference, ref_scores, vectors, queries, vectors, K)
+    assert both["embeddingCosineMin"] >= min_cosine, both
+    # 운영 인덱스는 torch로 만든 후보 임베딩을 그대로 쓰므로 쿼리만 ONNX로 바뀐 경우의 순위가 중요하다
+    query_only = _parity(ref_queries, ref_scores, queries, queries, reference, K)
+    assert query_only["embeddingCosineMin"] >= min_cosine, query_only
+    assert query_only[f"top{K}Agreement"] >= min_agreement, query_only
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+def test_tiny_onnx_matches_torch(tiny_onnx, backend):
+    assert (onnx_dir(tiny_onnx) / BACKENDS[backend][0]).exists()
+    _assert_parity(tiny_onnx, backend)
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+@pytest.mark.parametrize("model_key", sorted(MODEL_NAMES))
+def test_onnx_matches_torch(model_key, backend):
+    """실제 모델 (선택): 내보낸 ONNX 모델과 원본 가중치가 있을 때만."""
+    filename = BACKENDS[backend][0]
+    if not (onnx_dir(model_key) / filename).exists():
+        pytest.skip(f"내보낸 ONNX 모델 없음: {onnx_dir(model_key) / filename}")
+    pytest.importorskip("onnxruntime")
+    _assert_parity(model_key, backend)
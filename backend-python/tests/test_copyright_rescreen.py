@@ -0,0 +1,87 @@
+"""
+저장된 기획안 증분 재검사(rescreen.py)가 새 인덱스 전체로 다시 채점한 결과와 같은지
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from copyright.copyright_analyzer import TOP_K, determine_risk_level
+from copyright.indexer import build_candidate_texts
+from copyright.rescreen import PlanVectorStore, plan_record, rescreen
+from copyright.shards import ShardedIndex, load_manifest
+
+MODEL_KEY = "mini12"
+
+
+def _near_copies(games, rng: np.random.Generator):
+    """후보 텍스트에서 단어 일부를 지운 기획안 텍스트 (해당 게임과 점수가 높다)."""
+    texts = build_candidate_texts(pd.DataFrame(games))
+    return [" ".join(w for w in text.split() if rng.random() > 0.2) for text in texts]
+
+
+@pytest.fixture
+def rescreened(tmp_path, build_index, make_games, encoder):
+    rng = np.random.default_rng(5)
+    v1_games = make_games(range(1, 201), seed=11)
+    added = make_games(range(201, 241), seed=12)
+    cache_dir = build_index(v1_games)
+    v1 = ShardedIndex(cache_dir, load_manifest(cache_dir))
+
+    by_id = {g["game_id"]: g for g in v1_games}
+    texts = (_near_copies(added[:10], rng)                               # v2에 추가될 게임과 비슷 → 위험도 상승
+             + _near_copies([by_id[i] for i in range(1, 11)], rng)       # 최고 점수 후보가 v2에서 삭제됨
+             + _near_copies([by_id[i] for i in range(50, 70)], rng)      # 최고 점수 후보는 남음
+             + [" ".join(rng.choice(t.split(), size=6)) for t in _near_copies(v1_games[100:120], rng)])
+    vectors = encoder.encode(texts)
+    hits = v1.engine.search_batch(vectors, TOP_K)
+
+    # 최고 점수 후보는 남고 2~3위 후보만 지워지는 기획안도 생기도록 50~69번 기획안의 2위 후보를 삭제
+    top_ids = {v1.meta[int(idx[0])]["game_id"] for idx, _ in hits}
+    second_ids = {v1.meta[int(idx[1])]["game_id"] for idx, _ in hits[20:40]} - top_ids
+    deleted = set(range(1, 11)) | second_ids
+    modified = set(range(150, 155)) - top_ids
+
+    store = PlanVectorStore(MODEL_KEY, root=str(tmp_path / "plans"))
+    store.put([plan_record(pid, f"plan-{pid}", vector, determine_risk_level(float(scores[0])).value, idx, scores, v1)
+               for pid, vector, (idx, scores) in zip(range(len(texts)), vectors, hits)])
+
+    v2_games = [({**g, "Description": g["Description"] + " deluxe"} if g["game_id"] in modified else g)
+                for g in v1_games if g["game_id"] not in deleted] + added
+    build_index(v2_games)
+    v2 = ShardedIndex(cache_dir, load_manifest(cache_dir))
+    report = rescreen(store, v2, cache_dir, determine_risk_level, TOP_K)
+    return store, v1, v2, vectors, hits, report, len(second_ids)
+
+
+def test_rescreen_matches_full_rescore(rescreened):
+    store, v1, v2, vectors, v1_hits, report, _ = rescreened
+    store.reload()
+    records = {r["planId"]: r for r in store.records()}
+    full = v2.engine.search_batch(vectors, TOP_K)
+
+    changed = set()
+    for pid, ((idx, scores), (_, v1_scores)) in enumerate(zip(full, v1_hits)):
+        record = records[pid]
+        assert record["indexVersion"] == v2.version
+        assert [h[:2] for h in record["hits"]] == [list(v2.locate(int(i))) for i in idx]
+        np.testing.assert_allclose([h[2] for h in record["hits"]], scores, atol=1e-5)
+        assert record["maxScore"] == pytest.approx(float(scores[0]), abs=1e-5)
+        risk = determine_risk_level(float(scores[0])).value
+        assert record["riskLevel"] == risk
+        if risk != determine_risk_level(float(v1_scores[0])).value:
+            changed.add(pid)
+    assert {c["planId"] for c in report["changed"]} == changed
+    assert changed  # 추가된 게임과 비슷한 기획안은 위험도가 바뀐다
+
+
+def test_rescreen_report_counts(rescreened):
+    store, v1, v2, vectors, _, report, second_deleted = rescreened
+    assert second_deleted  # 2~3위 후보만 삭제된 경우가 실제로 만들어졌는지
+    new_shard = v2.shards[-1]
+    assert new_shard.id not in {s["id"] for s in v1.manifest["shards"]}
+    assert report["addedRows"] == len(new_shard.embeddings)
+    assert report["numPlans"] == len(vectors)
+    assert report["fullPlans"] >= 10 and report["deltaPlans"] > 0
+    assert report["fullPlans"] + report["deltaPlans"] + report["upToDatePlans"] == report["numPlans"]
+    # 같은 버전은 다시 채점하지 않고 저장된 리포트를 돌려준다
+    assert rescreen(store, v2, None, determine_risk_level, TOP_K) == report
@@ -0,0 +1,130 @@
+"""
+증분 인덱스(매니페스트 + 불변 샤드 + 삭제 표시)와 샤드 병합 검색이 살아있는 행 전체 정확 검색과 같은지
+"""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from copyright.search import load_engine, top_k_rows
+from copyright.shards import ShardedIndex, ShardedSearch, live_rows, load_manifest, read_current
+
+K = 5
+VARIANTS = ("float32", "float16", "int8")
+DELETED = set(range(1, 21))    # v2 CSV에서 빠진 game_id
+MODIFIED = set(range(21, 31))  # v2에서 설명이 바뀐 game_id
+ADDED = range(301, 351)
+
+
+@pytest.fixture
+def versions(build_index, make_games):
+    """(캐시 경로, v1 매니페스트 이름, v2 CSV 행). 두 버전 모두 양자화 / IVF 변형을 같이 만든다."""
+    v1_games = make_games(range(1, 301), seed=1)
+    cache_dir = build_index(v1_games, quantize=["float16", "int8"], ivf_lists=0)
+    v1 = read_current(cache_dir)
+    v2_games = [({**g, "Description": g["Description"] + " revised edition"} if g["game_id"] in MODIFIED else g)
+                for g in v1_games if g["game_id"] not in DELETED] + make_games(ADDED, seed=2)
+    build_index(v2_games, quantize=["float16", "int8"], ivf_lists=0)
+    return cache_dir, v1, v2_games
+
+
+def _engine(index: ShardedIndex, variant: str) -> ShardedSearch:
+    shards = [SimpleNamespace(engine=load_engine(s.directory, s.embeddings, variant)) for s in index.shards]
+    assert all(s.engine.name == variant for s in shards)
+    return ShardedSearch(shards, index.offsets, index.engine.dead)
+
+
+def _live_mask(index: ShardedIndex) -> np.ndarray:
+    live = np.ones(int(index.offsets[-1]), dtype=bool)
+    for n, dead in enumerate(index.engine.dead):
+        live[dead + index.offsets[n]] = False
+    return live
+
+
+def _exact(index: ShardedIndex, queries: np.ndarray, k: int):
+    embeddings = np.concatenate([np.asarray(s.embeddings, dtype=np.float32) for s in index.shards])
+    scores = queries @ embeddings.T
+    scores[:, ~_live_mask(index)] = -np.inf
+    return top_k_rows(scores, k)
+
+
+def _queries(index: ShardedIndex, encoder, count: int = 30) -> np.ndarray:
+    rng = np.random.default_rng(3)
+    rows = rng.choice(len(index.candidate_texts), size=count, replace=False)
+    texts = [" ".join(w for w in index.candidate_texts[int(i)].split() if rng.random() > 0.3) for i in rows]
+    return encoder.encode(texts)
+
+
+def test_manifest_tombstones_deleted_and_modified_rows(versions):
+    cache_dir, v1, v2_games = versions
+    manifest = load_manifest(cache_dir)
+    assert manifest["name"] != v1
+    first, second = manifest["shards"]
+    # v1 샤드의 행 순서는 CSV 순서 (game_id 1 → 행 0)
+    assert manifest["tombstones"] == {first["id"]: sorted(g - 1 for g in DELETED | MODIFIED)}
+    assert second["num_rows"] == len(MODIFIED) + len(ADDED)
+    assert manifest["num_live_rows"] == len(v2_games)
+
+    live = live_rows(cache_dir, manifest)
+    assert set(live) == {f"id:{g['game_id']}" for g in v2_games}
+    assert all(live[f"id:{g}"][0] == second["id"] for g in MODIFIED)
+
+    index = ShardedIndex(cache_dir, manifest)
+    described = {index.meta[i]["game_id"]: index.meta[i]["Description"] for i in np.flatnonzero(_live_mask(index))}
+    assert described == {g["game_id"]: g["Description"] for g in v2_games}
+
+
+def test_previous_manifest_still_opens(versions):
+    cache_dir, v1, _ = versions
+    index = ShardedIndex(cache_dir, load_manifest(cache_dir, v1))
+    assert index.num_live_rows == 300 and not index.manifest["tombstones"]
+    assert index.meta[0]["game_id"] == 1  # v2에서 삭제된 행도 이전 버전에서는 그대로 보인다
+
+
+@pytest.mark.parametrize("variant", VARIANTS)
+def test_sharded_search_matches_exact_live_rows(versions, encoder, variant):
+    cache_dir, _, _ = versions
+    index = ShardedIndex(cache_dir, load_manifest(cache_dir))
+    engine = _engine(index, variant)
+    queries = _queries(index, encoder)
+    expected_idx, expected_scores = _exact(index, queries, K)
+
+    batch = engine.search_batch(queries, K)
+    for q, query in enumerate(queries):
+        for idx, scores in (engine.search(query, K), batch[q]):
+            np.testing.assert_array_equal(idx, expected_idx[q])
+            np.testing.assert_allclose(scores, expected_scores[q], atol=1e-5)
+
+
+@pytest.mark.parametrize("variant", VARIANTS + ("ivf",))
+def test_search_returns_k_live_rows_when_most_rows_are_deleted(build_index, make_games, encoder, variant):
+    games = make_games(range(1, 301), seed=4)
+    cache_dir = build_index(games, quantize=["float16", "int8"], ivf_lists=0)
+    build_index(games[:K + 3])  # 나머지 292행은 삭제 표시만 (새 샤드 없음)
+    index = ShardedIndex(cache_dir, load_manifest(cache_dir))
+    assert len(index.shards) == 1 and index.num_live_rows == K + 3
+
+    engine = _engine(index, variant)
+    queries = _queries(index, encoder, 20)
+    expected_idx, _ = _exact(index, queries, K)
+    for q, (idx, scores) in enumerate(engine.search_batch(queries, K)):
+        assert len(idx) == K and set(idx.tolist()) <= set(range(K + 3))
+        assert np.all(np.isfinite(scores)) and np.all(np.diff(scores) <= 1e-6)
+        if variant != "ivf":
+            np.testing.assert_array_equal(idx, expected_idx[q])
+        np.testing.assert_array_equal(engine.search(queries[q], K)[0], idx)
+
+
+def test_full_rebuild_compacts_to_one_shard(versions, build_index, encoder):
+    cache_dir, _, v2_games = versions
+    before = ShardedIndex(cache_dir, load_manifest(cache_dir))
+    queries = _queries(before, encoder)
+    build_index(v2_games, full=True)
+    after = ShardedIndex(cache_dir, load_manifest(cache_dir))
+    assert len(after.shards) == 1 and not after.manifest["tombstones"]
+    assert after.num_live_rows == before.num_live_rows == len(v2_games)
+
+    for (idx_a, scores_a), (idx_b, scores_b) in zip(before.engine.search_batch(queries, K),
+                                                    after.engine.search_batch(queries, K)):
+        assert [before.meta[int(i)]["game_id"] for i in idx_a] == [after.meta[int(i)]["game_id"] for i in idx_b]
+        np.testing.assert_allclose(scores_a, scores_b, atol=1e-5)
@@ -0,0 +1,100 @@
+"""
+다음 단계 추측 실행 (pipeline/speculative.py) — 입력 변경 시 취소, 계열(lineage) 취소가 규칙 작업까지 닿는지
+"""
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test")  # 라우터 모듈 import용 (LLM은 호출하지 않음)
+
+import goal.router  # noqa: E402
+import rule.router  # noqa: E402
+from goal.router import GoalGenerationRequest  # noqa: E402
+from pipeline import speculative  # noqa: E402
+from pipeline.speculative import SpeculativeCache, concept_frame  # noqa: E402
+from utils import deadline  # noqa: E402
+
+PROJECT_ID = 7
+CONCEPT = {"projectId": PROJECT_ID, "theme": "우주 탐험", "playerCount": "2~4명", "averageWeight": 2.5,
+           "ideaText": "행성을 개척한다", "mechanics": "일꾼 놓기", "storyline": "은하 변방의 개척자들"}
+GOAL_REQUEST = GoalGenerationRequest(**{k: v for k, v in CONCEPT.items() if k != "projectId"},
+                                     world_setting="임시 세계관 설정", world_tone="임시 세계관 톤")
+OBJECTIVE = {"mainGoal": "수정 10개 모으기", "subGoals": ["기지 건설"], "winConditionType": "점수", "designNote": "-"}
+SPECULATE = SimpleNamespace(headers={"x-speculate": "true"})
+
+
+def _wait_for_cancel(request):
+    """취소되거나 시간이 다 될 때까지 실행 중인 LLM 호출처럼 붙잡고 있는 가짜 작업."""
+    budget = deadline.current_budget()
+    end = time.monotonic() + 5
+    while time.monotonic() < end:
+        budget.check_cancelled("fake")
+        time.sleep(0.01)
+    return OBJECTIVE
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = SpeculativeCache(workers=2)
+    monkeypatch.setattr(speculative, "speculative_cache", cache)
+    monkeypatch.setattr(goal.router, "speculative_cache", cache)
+    monkeypatch.setattr(rule.router, "generate_rules", _wait_for_cancel)
+    yield cache
+    for entry in list(cache._entries.values()):
+        entry.cancel()
+    cache._executor.shutdown(wait=True)
+
+
+def _pending(cache, stage):
+    return [e for e in cache._entries.values() if e.stage == stage]
+
+
+def test_take_miss_cancels_stale_entry_of_same_stage(cache):
+    other = GOAL_REQUEST.model_copy(update={"theme": "해저 도시"})
+    cache.schedule("goal", GOAL_REQUEST, _wait_for_cancel, lineage=PROJECT_ID)
+    cache.schedule("goal", other, _wait_for_cancel, lineage=PROJECT_ID + 1)
+    stale = _pending(cache, "goal")[0]
+
+    edited = GOAL_REQUEST.model_copy(update={"ideaText": "행성을 개척하고 교역한다"})
+    assert cache.lineage_of("goal", edited) == PROJECT_ID
+    assert cache.take("goal", edited) is None
+    assert stale.cancel_event.is_set()
+    with pytest.raises(deadline.Cancelled):
+        stale.future.result(timeout=5)  # 실행 중이던 작업도 멈춘다
+    # 컨셉 골격이 다른 작업은 그대로
+    assert [e.frame for e in _pending(cache, "goal")] == [concept_frame(other)]
+    assert cache.stats["cancelled"] == 1 and cache.stats["misses"] == 1
+
+
+def test_take_hit_keeps_result(cache):
+    cache.schedule("goal", GOAL_REQUEST, lambda request: OBJECTIVE, lineage=PROJECT_ID)
+    assert cache.take("goal", GOAL_REQUEST) == OBJECTIVE
+    assert cache.stats["hits"] == 1 and cache.stats["cancelled"] == 0
+
+
+def test_cancel_lineage_reaches_rule_after_non_speculative_goal(cache, monkeypatch):
+    monkeypatch.setattr(goal.router, "generate_objective", lambda request: OBJECTIVE)
+    assert goal.router.generate_objective_api(GOAL_REQUEST, SPECULATE) == OBJECTIVE
+
+    [rule_entry] = _pending(cache, "rule")
+    assert rule_entry.lineage is None  # Spring 목표 요청에는 projectId가 없다
+    # /regenerate-concept와 같은 인자: projectId + 원래 컨셉 골격
+    assert cache.cancel_lineage(PROJECT_ID, concept_frame(CONCEPT)) == 1
+    assert rule_entry.cancel_event.is_set() and not cache._entries
+
+
+def test_rule_inherits_lineage_of_edited_speculative_goal(cache, monkeypatch):
+    monkeypatch.setattr(goal.router, "generate_objective", lambda request: OBJECTIVE)
+    blocked = threading.Event()
+    cache.schedule("goal", GOAL_REQUEST, lambda request: blocked.wait(5), lineage=PROJECT_ID)
+
+    edited = GOAL_REQUEST.model_copy(update={"world_tone": "어두운"})
+    goal.router.generate_objective_api(edited, SPECULATE)
+    blocked.set()
+    assert not _pending(cache, "goal")  # 빗나간 추측 목표는 취소
+    [rule_entry] = _pending(cache, "rule")
+    assert rule_entry.lineage == PROJECT_ID
+    assert cache.cancel_lineage(PROJECT_ID) == 1
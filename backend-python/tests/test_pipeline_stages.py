@@ -0,0 +1,55 @@
+"""
+기획 파이프라인 DAG 단계 어댑터 (pipeline/service.py) — 생성 함수는 가짜로 바꿔 LLM / 이미지 API 없이 실행
+"""
+import asyncio
+
+import pytest
+
+import card_image.router
+import card_text.router
+from pipeline.schema import PlanPipelineRequest
+from pipeline.service import STAGES
+
+REQUEST = PlanPipelineRequest(projectId=1, theme="우주 탐험", playerCount="2~4명", averageWeight=2.5)
+RESULTS = {
+    "concept": {"theme": "우주 탐험", "storyline": "은하 변방의 개척자들"},
+    "components": {"components": [
+        {"type": "Card", "title": "매복", "quantity": "1장",
+         "role_and_effect": "상대가 들어오면 자원 2개를 받는다", "art_concept": "그림자 속 암살자"},
+        {"type": "액션 카드", "title": "워프", "quantity": "1장",
+         "role_and_effect": "인접 지역으로 이동", "art_concept": "푸른 포털"},
+        {"type": "Token", "title": "수정 토큰", "quantity": "20개",
+         "role_and_effect": "자원", "art_concept": "보라색 수정"},
+    ]},
+}
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+
+    def fake_text(name, effect, description, theme, storyline):
+        calls.append(("text", name, effect, description, theme, storyline))
+        return f"{name}: {effect}"
+
+    def fake_image(name, effect, description, theme, storyline):
+        calls.append(("image", name, effect, description, theme, storyline))
+        return f"https://example.com/{name}.png"
+
+    monkeypatch.setattr(card_text.router, "generate_card_text", fake_text)
+    monkeypatch.setattr(card_image.router, "generate_card_image_korean", fake_image)
+    return calls
+
+
+def test_card_text_stage(calls):
+    result = asyncio.run(STAGES["card_text"].run(REQUEST, RESULTS))
+    assert [t["name"] for t in result["generated_texts"]] == ["매복", "워프"]
+    assert result["generated_texts"][0]["text"] == "매복: 상대가 들어오면 자원 2개를 받는다"
+    assert calls[0] == ("text", "매복", "상대가 들어오면 자원 2개를 받는다", "그림자 속 암살자", "우주 탐험", "은하 변방의 개척자들")
+
+
+def test_card_images_stage(calls):
+    result = asyncio.run(STAGES["card_images"].run(REQUEST, RESULTS))
+    assert [i["imageUrl"] for i in result["generated_images"]] == ["https://example.com/매복.png",
+                                                                  "https://example.com/워프.png"]
+    assert [c[1] for c in calls] == ["매복", "워프"]
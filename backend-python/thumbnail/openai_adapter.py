@@ -1,9 +1,10 @@
 import os
-from openai import OpenAI
 from dotenv import load_dotenv
+from utils import deadline
+from utils.resources import lazy_openai_client
 
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = lazy_openai_client()
 
 def call_dalle_image(prompt: str, model="dall-e-3", size="1024x1024") -> str:
     try:
@@ -11,9 +12,12 @@ def call_dalle_image(prompt: str, model="dall-e-3", size="1024x1024") -> str:
             model=model,
             prompt=prompt,
             n=1,
-            size=size
+            size=size,
+            timeout=deadline.timeout_for("image")
         )
         return response.data[0].url
+    except deadline.DeadlineExceeded:
+        raise
     except Exception as e:
         print(f"[DALL·E Error] {e}")
         raise Exception("DALL·E 이미지 생성 실패")
@@ -1,6 +1,7 @@
 from thumbnail.prompt_generator import translate_to_thumbnail_prompt
 from thumbnail.openai_adapter import call_dalle_image
 from utils.s3_utils import upload_image_bytes_to_s3
+from utils import deadline
 import requests
 import uuid
 
@@ -16,7 +17,7 @@ def generate_thumbnail_image(request) -> str:
     temporary_url = call_dalle_image(translated_prompt)
 
     # 3. 이미지 다운로드 → S3 업로드
-    response = requests.get(temporary_url)
+    response = requests.get(temporary_url, timeout=deadline.timeout_for("download"))
     if response.status_code != 200:
         raise Exception("이미지 다운로드 실패")
 
@@ -0,0 +1,166 @@
+"""
+서버 콜드 스타트 분석 리포트
+
+app을 계측된 하위 프로세스에서 import 하고 다음을 JSON으로 출력한다.
+- 모듈별 import 시간 순위 (python -X importtime 결과: self / cumulative)
+- 라우터별 초기화 시간과 RSS 증가량 (APP_PROFILE에 포함된 라우터를 순서대로 import, 공용 의존성은 먼저 import한 라우터에 귀속)
+- (--warm) 리소스 레지스트리 항목별 초기화 시간과 RSS 증가량
+
+사용법:
+    python -m tools.startup_report                  # 표준출력으로 JSON
+    python -m tools.startup_report --warm --top 50 --output startup.json
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import datetime
+import subprocess
+from typing import Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def rss_mb() -> Optional[float]:
+    """현재 프로세스 RSS(MB). /proc이 없으면 최대 RSS로 대체."""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    except ImportError:
+        return None
+
+
+def _measure(fn) -> dict:
+    before = rss_mb()
+    started = time.perf_counter()
+    error = None
+    try:
+        fn()
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    after = rss_mb()
+    return {
+        "seconds": round(time.perf_counter() - started, 4),
+        "rssDeltaMb": round(after - before, 2) if before is not None and after is not None else None,
+        "error": error,
+    }
+
+
+def run_child(warm: bool) -> dict:
+    """계측 대상 프로세스. 결과 JSON을 표준출력으로, importtime 로그는 표준에러로 나간다."""
+    from importlib import import_module
+
+    sys.path.insert(0, BACKEND_DIR)
+    os.chdir(BACKEND_DIR)
+    os.environ["RESOURCE_WARMUP"] = "false"
+
+    baseline_rss = rss_mb()
+    started = time.perf_counter()
+
+    from utils.profiles import selected_routers
+
+    routers = []
+    for module_path, _ in selected_routers():
+        routers.append({"router": module_path, **_measure(lambda: import_module(module_path))})
+
+    app_import = _measure(lambda: import_module("app"))
+    total_import = time.perf_counter() - started
+
+    resources = []
+    if warm:
+        from utils.resources import registry
+        for name in registry.names():
+            resources.append({"resource": name, **_measure(lambda: registry.get(name))})
+
+    return {
+        "baselineRssMb": round(baseline_rss, 2) if baseline_rss is not None else None,
+        "importSeconds": round(total_import, 4),
+        "appImport": app_import,
+        "routers": routers,
+        "resources": resources,
+        "finalRssMb": round(rss_mb() or 0.0, 2),
+    }
+
+
+def parse_importtime(stderr: str) -> List[dict]:
+    modules = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        modules.append({
+            "module": name,
+            "selfMs": round(int(self_us) / 1000.0, 2),
+            "cumulativeMs": round(int(cumulative_us) / 1000.0, 2),
+            "depth": len(indent) // 2,
+        })
+    return modules
+
+
+def build_report(warm: bool = False, top: int = 30) -> dict:
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "tools.startup_report", "--child"] + (["--warm"] if warm else []),
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"계측 프로세스 실패 (exit {proc.returncode}):\n{proc.stderr[-2000:]}")
+
+    child = json.loads(proc.stdout.strip().splitlines()[-1])
+    modules = parse_importtime(proc.stderr)
+    top_level: Dict[str, float] = {}
+    for module in modules:
+        package = module["module"].split(".")[0]
+        if module["depth"] == 0 or module["module"] == package:
+            top_level[package] = max(top_level.get(package, 0.0), module["cumulativeMs"])
+
+    return {
+        "generatedAt": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "wallSeconds": round(time.perf_counter() - started, 3),
+        "profile": os.getenv("APP_PROFILE", "all"),
+        **child,
+        "packagesByCumulativeMs": sorted(
+            ({"package": k, "cumulativeMs": v} for k, v in top_level.items()),
+            key=lambda x: x["cumulativeMs"], reverse=True
+        )[:top],
+        "modulesBySelfMs": sorted(modules, key=lambda x: x["selfMs"], reverse=True)[:top],
+        "modulesByCumulativeMs": sorted(modules, key=lambda x: x["cumulativeMs"], reverse=True)[:top],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="app import / 초기화 시간 및 메모리 리포트")
+    parser.add_argument("--warm", action="store_true", help="리소스 레지스트리 항목까지 초기화해서 측정")
+    parser.add_argument("--top", type=int, default=30, help="순위에 표시할 모듈 수")
+    parser.add_argument("--output", help="JSON을 저장할 파일 경로 (없으면 표준출력)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.warm), ensure_ascii=False))
+        return
+
+    report = json.dumps(build_report(args.warm, args.top), ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+        print(f"리포트 저장: {args.output}")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
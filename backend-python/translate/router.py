@@ -39,5 +39,7 @@ def translate_process(req: TranslateProcessRequest):
             translationId=req.translation_id,
             translatedData=translated_json_str,
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,226 @@
+"""
+요청 단위 시간 예산(deadline) 관리
+
+Spring은 자체 타임아웃으로 FastAPI를 호출하지만, Python 쪽은 호출별 타임아웃이 없어
+Spring이 이미 포기한 요청을 계속 처리하고 있었다.
+이 모듈은 들어온 데드라인 헤더(없으면 라우트별 기본값)를 요청 스코프 예산으로 만들고,
+LLM / S3 / 이미지 / Meshy 호출이 남은 예산에서 타임아웃을 계산하도록 돕는다.
+
+- X-Request-Deadline: 절대 데드라인 (epoch milliseconds)
+- X-Request-Timeout-Ms: 상대 타임아웃 (milliseconds)
+
+남은 예산으로 다음 단계를 감당할 수 없으면 호출 전에 DeadlineExceeded(504)로 바로 중단한다.
+백그라운드 작업(추측 실행 등)은 취소 이벤트가 달린 예산을 걸 수 있다. 취소되면 다음 단계를 시작하지 않고,
+진행 중인 LLM 호출은 스트리밍으로 받으며 토큰마다 확인해 연결을 끊는다 (더 이상 토큰을 소비하지 않음).
+"""
+import os
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Optional
+from fastapi import HTTPException
+
+DEADLINE_HEADER = b"x-request-deadline"
+TIMEOUT_HEADER = b"x-request-timeout-ms"
+
+# 헤더가 없을 때 사용하는 기본 예산(초)
+DEFAULT_TIMEOUT_SECONDS = float(os.getenv("REQUEST_DEFAULT_TIMEOUT_SECONDS", "120"))
+
+# 라우트별 기본 예산(초). 가장 길게 매칭되는 prefix를 사용한다.
+ROUTE_TIMEOUTS = {
+    "/api/content/generate-3d": 900.0,       # Meshy preview + refine 폴링
+    "/api/content/generate-image": 300.0,    # 카드 여러 장 DALL·E 생성
+    "/api/content/generate-thumbnail": 120.0,
+    "/api/balance/simulate": 180.0,
+    "/api/plans/copyright-plan": 90.0,
+    "/api/plans/copyright-batch": 1800.0,     # 포트폴리오 일괄 재검사
+    "/api/plans/generate-plan": 900.0,       # 전체 기획 파이프라인 (임계 경로 기준)
+    "/api/translation/batch": 300.0,
+}
+
+# 단계별 최소 필요 시간(초). 남은 예산이 이보다 적으면 호출하지 않고 중단한다.
+STAGE_MIN_SECONDS = {
+    "llm": 3.0,
+    "image": 10.0,
+    "download": 1.0,
+    "s3": 1.0,
+    "meshy": 5.0,
+}
+
+# 단계별 호출 1회 최대 타임아웃(초). 예산이 넉넉하거나 예산이 없는 컨텍스트에서 사용한다.
+STAGE_MAX_SECONDS = {
+    "llm": 180.0,
+    "image": 120.0,
+    "download": 60.0,
+    "s3": 60.0,
+    "meshy": 30.0,
+}
+
+
+class DeadlineExceeded(HTTPException):
+    """남은 예산으로 다음 단계를 시작할 수 없을 때 발생 (504)."""
+
+    def __init__(self, stage: str, remaining: float):
+        self.stage = stage
+        super().__init__(
+            status_code=504,
+            detail=f"요청 시간 예산 초과: '{stage}' 단계를 시작할 시간이 부족합니다 (남은 시간 {max(remaining, 0.0):.1f}초)"
+        )
+
+
+class Cancelled(HTTPException):
+    """예산이 취소돼 작업을 중단할 때 발생 (추측 실행 취소 등, 클라이언트 응답으로 나가지 않는 작업용)."""
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        super().__init__(status_code=499, detail=f"작업이 취소되었습니다: '{stage}' 단계")
+
+
+class Budget:
+    """요청 하나의 시간 예산. time.monotonic() 기준 데드라인을 들고 다닌다."""
+
+    def __init__(self, seconds: float, cancel: Optional[threading.Event] = None):
+        self.deadline = time.monotonic() + seconds
+        self.exhausted_stage: Optional[str] = None
+        self.cancel_event = cancel
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event is not None and self.cancel_event.is_set()
+
+    def check_cancelled(self, stage: str):
+        if self.cancelled:
+            raise Cancelled(stage)
+
+    def remaining(self) -> float:
+        return self.deadline - time.monotonic()
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+_current_budget: contextvars.ContextVar[Optional[Budget]] = contextvars.ContextVar("request_budget", default=None)
+
+
+def current_budget() -> Optional[Budget]:
+    return _current_budget.get()
+
+
+def remaining() -> Optional[float]:
+    """현재 요청의 남은 예산(초). 예산이 없는 컨텍스트(스크립트 등)에서는 None."""
+    budget = _current_budget.get()
+    return budget.remaining() if budget else None
+
+
+@contextmanager
+def budget_scope(seconds: float, cancel: Optional[threading.Event] = None):
+    """요청 밖(백그라운드 작업 등)에서 별도 예산을 걸 때 사용. cancel이 설정되면 이후 단계는 Cancelled로 중단."""
+    budget = Budget(seconds, cancel)
+    token = _current_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _current_budget.reset(token)
+
+
+def ensure(stage: str, min_seconds: Optional[float] = None) -> Optional[float]:
+    """다음 단계를 시작할 예산이 있는지 확인하고 남은 시간을 반환한다."""
+    budget = _current_budget.get()
+    if budget is None:
+        return None
+    budget.check_cancelled(stage)
+    left = budget.remaining()
+    need = STAGE_MIN_SECONDS.get(stage, 1.0) if min_seconds is None else min_seconds
+    if left < need:
+        budget.exhausted_stage = stage
+        raise DeadlineExceeded(stage, left)
+    return left
+
+
+def timeout_for(stage: str, cap: Optional[float] = None) -> float:
+    """
+    외부 호출에 넘길 타임아웃(초)을 계산한다.
+    min(남은 예산, cap)이며 cap을 생략하면 STAGE_MAX_SECONDS를 사용한다.
+    """
+    if cap is None:
+        cap = STAGE_MAX_SECONDS.get(stage, 60.0)
+    left = ensure(stage)
+    return cap if left is None else min(left, cap)
+
+
+def invoke_chain(chain, inputs: dict, stage: str = "llm"):
+    """LLMChain을 남은 예산 안에서 실행한다 (timeout을 OpenAI 호출까지 전달)."""
+    timeout = timeout_for(stage)
+    llm_kwargs = {**chain.llm_kwargs, "timeout": timeout}
+    config = None
+    budget = _current_budget.get()
+    if budget is not None and budget.cancel_event is not None:
+        # 취소 가능한 예산: 스트리밍으로 받아 토큰마다 취소 여부를 확인 (취소되면 스트림을 닫아 생성 중단)
+        llm_kwargs["stream"] = True
+        config = {"callbacks": [_cancel_on_token(budget, stage)]}
+    chain = chain.model_copy(update={"llm_kwargs": llm_kwargs})
+    return chain.invoke(inputs, config=config)
+
+
+def _cancel_on_token(budget: Budget, stage: str):
+    # langchain은 첫 LLM 호출 때 import (lazy_chain과 같은 이유)
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class CancelOnToken(BaseCallbackHandler):
+        raise_error = True  # 콜백 예외를 삼키지 않고 스트리밍 루프 밖으로 전달
+
+        def on_llm_new_token(self, token: str, **kwargs):
+            budget.check_cancelled(stage)
+
+    return CancelOnToken()
+
+
+def _route_timeout(path: str) -> float:
+    matched = [prefix for prefix in ROUTE_TIMEOUTS if path.startswith(prefix)]
+    if not matched:
+        return DEFAULT_TIMEOUT_SECONDS
+    return ROUTE_TIMEOUTS[max(matched, key=len)]
+
+
+def parse_budget_seconds(headers, path: str) -> float:
+    """헤더(raw ASGI headers)에서 예산을 읽는다. 잘못된 값이면 라우트 기본값."""
+    values = dict(headers)
+    try:
+        if DEADLINE_HEADER in values:
+            deadline_ms = float(values[DEADLINE_HEADER].decode())
+            return deadline_ms / 1000.0 - time.time()
+        if TIMEOUT_HEADER in values:
+            return float(values[TIMEOUT_HEADER].decode()) / 1000.0
+    except ValueError:
+        pass
+    return _route_timeout(path)
+
+
+class DeadlineMiddleware:
+    """
+    요청마다 Budget을 만들어 contextvar에 심는 ASGI 미들웨어.
+    라우터가 예외를 500으로 감싸더라도 예산이 소진된 요청이면 504로 돌려준다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        budget = Budget(parse_budget_seconds(scope.get("headers", []), scope.get("path", "")))
+        token = _current_budget.set(budget)
+
+        async def send_with_deadline(message):
+            if message["type"] == "http.response.start" and message["status"] >= 500:
+                if budget.exhausted_stage or budget.expired():
+                    message = {**message, "status": 504}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_deadline)
+        finally:
+            _current_budget.reset(token)
@@ -1,6 +1,7 @@
 import os
 import requests
 from dotenv import load_dotenv
+from utils import deadline
 
 load_dotenv()
 MESHY_API_KEY = os.getenv("MESHY_API_KEY")
@@ -19,7 +20,7 @@ def create_meshy_preview(prompt, art_style="realistic"):
         "should_remesh": True
     }
     try:
-        response = requests.post(MESHY_URL, headers=headers, json=payload)
+        response = requests.post(MESHY_URL, headers=headers, json=payload, timeout=deadline.timeout_for("meshy"))
         response.raise_for_status()
         return response.json().get("result")
     except requests.exceptions.HTTPError as http_err:
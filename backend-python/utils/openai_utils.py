@@ -1,9 +1,10 @@
 import os
-from openai import OpenAI
 from dotenv import load_dotenv
+from utils import deadline
+from utils.resources import lazy_openai_client
 
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = lazy_openai_client()
 
 def call_openai(prompt, model="gpt-3.5-turbo", temperature=0.7, max_tokens=1000):
     try:
@@ -14,9 +15,12 @@ def call_openai(prompt, model="gpt-3.5-turbo", temperature=0.7, max_tokens=1000)
                 {"role": "user", "content": prompt},
             ],
             temperature=temperature,
-            max_tokens=max_tokens
+            max_tokens=max_tokens,
+            timeout=deadline.timeout_for("llm")
         )
         return response.choices[0].message.content
+    except deadline.DeadlineExceeded:
+        raise
     except Exception as e:
         print(f"[OpenAI Error] {e}")
         return "OpenAI 호출 실패"
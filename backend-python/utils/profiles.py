@@ -0,0 +1,77 @@
+"""
+배포 프로필 (노드 역할별로 마운트할 라우터 선택)
+
+APP_PROFILE 환경변수로 노드 역할을 고른다. 쉼표로 여러 프로필을 합칠 수 있다 (예: "copyright,pricing").
+선택되지 않은 라우터는 import 자체를 하지 않으므로 그 라우터의 리소스도 등록/초기화되지 않는다.
+
+- all         : 전체 (기본값, 로컬 개발용)
+- llm-gateway : GPT 호출 위주의 기획 생성 API (I/O 바운드)
+- copyright   : 저작권 유사도 검사 (임베딩 + SentenceTransformer, CPU 바운드)
+- pricing     : 가격 예측 (RandomForest, CPU 바운드)
+- media       : 카드 이미지 / 썸네일 / 3D 모델 생성
+
+이 모듈은 app.py, serve.py, tools.startup_report가 가볍게 import 할 수 있도록 무거운 의존성을 두지 않는다.
+"""
+import os
+from typing import Dict, List, Tuple
+
+# (모듈 경로, include_router 옵션)
+ROUTERS: List[Tuple[str, dict]] = [
+    ("concept.router", {}),
+    ("goal.router", {}),
+    ("rule.router", {}),
+    ("component.router", {}),
+    ("balance.router", {}),
+    ("summary.router", {}),
+    ("card_text.router", {}),
+    ("card_image.router", {}),
+    ("thumbnail.router", {}),
+    ("model3d.router", {}),
+    ("rulebook.router", {}),
+    ("translate.router", {}),
+    ("pricing.api", {}),
+    ("copyright.router", {}),
+    ("pipeline.router", {}),
+    ("game_translation.router", {"prefix": "/api/translation", "tags": ["게임 번역"]}),
+]
+
+PROFILES: Dict[str, List[str]] = {
+    "llm-gateway": [
+        "concept.router", "goal.router", "rule.router", "component.router", "balance.router",
+        "summary.router", "card_text.router", "rulebook.router", "translate.router",
+        # 파이프라인의 이미지/썸네일/가격 단계는 실행될 때 해당 모듈을 이 노드에서 import 한다
+        "pipeline.router", "game_translation.router",
+    ],
+    "copyright": ["copyright.router"],
+    "pricing": ["pricing.api"],
+    "media": ["card_image.router", "thumbnail.router", "model3d.router"],
+}
+PROFILES["all"] = [module_path for module_path, _ in ROUTERS]
+
+# 프로필별로 /readyz가 반드시 기다리는 리소스 (이게 없으면 그 노드는 받을 수 있는 요청이 없다).
+# 여러 역할을 합친 노드(all, llm-gateway)는 리소스 하나가 실패해도 나머지 라우터로 트래픽을 받는다.
+READY_REQUIRED: Dict[str, List[str]] = {
+    "copyright": ["copyright.service"],
+    "pricing": ["pricing.model"],
+}
+
+DEFAULT_PROFILE = "all"
+
+
+def active_profiles() -> List[str]:
+    names = [p.strip() for p in os.getenv("APP_PROFILE", DEFAULT_PROFILE).split(",") if p.strip()]
+    unknown = [p for p in names if p not in PROFILES]
+    if unknown:
+        raise ValueError(f"알 수 없는 APP_PROFILE: {unknown} (가능한 값: {sorted(PROFILES)})")
+    return names or [DEFAULT_PROFILE]
+
+
+def selected_routers() -> List[Tuple[str, dict]]:
+    """활성 프로필에 포함된 라우터를 ROUTERS 순서대로 반환한다."""
+    enabled = {module_path for profile in active_profiles() for module_path in PROFILES[profile]}
+    return [(module_path, options) for module_path, options in ROUTERS if module_path in enabled]
+
+
+def required_resources() -> List[str]:
+    """활성 프로필의 /readyz 필수 리소스 (READY_RESOURCES 환경변수가 없을 때의 기본값)."""
+    return sorted({name for profile in active_profiles() for name in READY_REQUIRED.get(profile, [])})
@@ -0,0 +1,272 @@
+"""
+무거운 의존성(모델 파일, 임베딩 인덱스, LLM 체인, 외부 API 클라이언트) 지연 초기화 레지스트리
+
+라우터 모듈은 import 시점에 리소스를 만들지 않고 registry.register()로 '선언'만 한다.
+실제 초기화는 처음 사용할 때 또는 서버 시작 후 백그라운드 warm-up에서 한 번만 일어난다.
+
+- 초기화 실패(모델 파일 없음 등)는 해당 리소스를 쓰는 엔드포인트만 503으로 응답하게 만든다.
+- 실패한 리소스는 RESOURCE_RETRY_SECONDS 이후 다시 초기화를 시도한다 (배포 중 파일이 늦게 도착하는 경우).
+- LazyResource는 속성 접근을 실제 객체로 넘기므로 기존 모듈 전역 클라이언트 자리에 그대로 쓸 수 있다.
+- prime 훅(더미 인코딩, 커넥션 pre-warm 등)은 warm-up 때만 실행된다. 로드와 분리되어 있어
+  pre-fork 마스터는 로드만 하고, 실제 추론/커넥션은 각 워커에서 만든다.
+- /readyz는 진행 중인 warm-up이 끝날 때까지(로드 + prime, 실패도 끝난 것으로 봄) 기다리고,
+  필수 리소스(READY_RESOURCES, 기본: 프로필별 utils.profiles.READY_REQUIRED)가 실패해 있으면 준비되지 않은 것으로 본다.
+  warm-up 대상이 아니거나 RESOURCE_WARMUP=false라 아무도 초기화하지 않는 리소스는 첫 요청 때 로드되므로 준비된 것으로 본다.
+"""
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+RESOURCE_RETRY_SECONDS = float(os.getenv("RESOURCE_RETRY_SECONDS", "30"))
+RESOURCE_WARMUP_WORKERS = int(os.getenv("RESOURCE_WARMUP_WORKERS", "4"))
+OPENAI_PREWARM = os.getenv("OPENAI_PREWARM", "true").lower() == "true"
+
+
+class ResourceUnavailable(HTTPException):
+    """리소스 초기화에 실패해 해당 기능을 사용할 수 없을 때 발생 (503)."""
+
+    def __init__(self, name: str, error: str):
+        self.name = name
+        super().__init__(
+            status_code=503,
+            detail=f"'{name}' 리소스를 사용할 수 없습니다: {error}"
+        )
+
+
+class LazyResource:
+    """처음 사용할 때 초기화되는 리소스 핸들."""
+
+    def __init__(self, name: str, loader: Callable[[], Any], warm: bool = True,
+                 prime: Optional[Callable[[Any], None]] = None):
+        self.name = name
+        self.loader = loader
+        self.warm = warm
+        self.prime_hook = prime
+        self.primed = prime is None
+        self._lock = threading.Lock()
+        self._value: Any = None
+        self.state = "pending"  # pending | loading | ready | failed
+        self.error: Optional[str] = None
+        self.failed_at = 0.0
+        self.load_seconds: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    @property
+    def hot(self) -> bool:
+        return self.ready and self.primed
+
+    def prime(self):
+        """로드된 리소스의 첫 호출 비용을 미리 치른다. 실패해도 리소스는 사용 가능하므로 기록만 한다."""
+        value = self.get()
+        with self._lock:
+            if self.primed:
+                return
+            started = time.perf_counter()
+            try:
+                self.prime_hook(value)
+                logger.info(f"[resources] '{self.name}' prime 완료 ({time.perf_counter() - started:.2f}초)")
+            except Exception as e:
+                logger.warning(f"[resources] '{self.name}' prime 실패 (무시): {type(e).__name__}: {e}")
+            self.primed = True
+
+    def get(self) -> Any:
+        if self.state == "ready":
+            return self._value
+        with self._lock:
+            if self.state == "ready":
+                return self._value
+            if self.state == "failed" and time.time() - self.failed_at < RESOURCE_RETRY_SECONDS:
+                raise ResourceUnavailable(self.name, self.error)
+
+            self.state = "loading"
+            started = time.perf_counter()
+            try:
+                self._value = self.loader()
+            except Exception as e:
+                self.state = "failed"
+                self.error = f"{type(e).__name__}: {e}"
+                self.failed_at = time.time()
+                logger.warning(f"[resources] '{self.name}' 초기화 실패: {self.error}")
+                raise ResourceUnavailable(self.name, self.error) from e
+            self.load_seconds = time.perf_counter() - started
+            self.state = "ready"
+            self.error = None
+            logger.info(f"[resources] '{self.name}' 초기화 완료 ({self.load_seconds:.2f}초)")
+            return self._value
+
+    def __getattr__(self, attr: str):
+        # 기존 전역 객체(client.chat..., chain.model_copy...)처럼 그대로 사용할 수 있도록 위임
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self.get(), attr)
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "primed": self.primed,
+            "loadSeconds": round(self.load_seconds, 3) if self.load_seconds is not None else None,
+            "error": self.error,
+        }
+
+
+class ResourceRegistry:
+    def __init__(self):
+        self._resources: Dict[str, LazyResource] = {}
+        # warm-up이 아직 로드/prime 중인 리소스 (/readyz는 이것들이 끝날 때까지 기다린다)
+        self._warming = set()
+        self._warming_lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[[], Any], warm: bool = True,
+                 prime: Optional[Callable[[Any], None]] = None) -> LazyResource:
+        """
+        리소스를 선언한다. 같은 이름이 이미 있으면 기존 핸들을 반환한다.
+        warm=False면 백그라운드 warm-up 대상에서 제외(처음 사용할 때만 초기화).
+        prime은 로드된 객체를 받아 첫 호출 비용을 미리 치르는 훅 (warm-up 때만 실행).
+        """
+        if name not in self._resources:
+            self._resources[name] = LazyResource(name, loader, warm, prime)
+        return self._resources[name]
+
+    def get(self, name: str) -> Any:
+        return self._resources[name].get()
+
+    def names(self) -> List[str]:
+        return list(self._resources)
+
+    def warm_targets(self) -> List[str]:
+        return [name for name, resource in self._resources.items() if resource.warm]
+
+    def _warm_one(self, name: str, prime: bool):
+        resource = self._resources[name]
+        try:
+            if prime:
+                resource.prime()
+            else:
+                resource.get()
+        except ResourceUnavailable:
+            pass
+        finally:
+            with self._warming_lock:
+                self._warming.discard(name)
+
+    def _mark_warming(self, names: List[str]) -> List[str]:
+        """이미 다른 warm-up이 맡은 리소스는 빼고 표시한다."""
+        with self._warming_lock:
+            names = [name for name in names if name not in self._warming]
+            self._warming.update(names)
+        return names
+
+    def warm_up(self, names: Optional[Iterable[str]] = None, prime: bool = True,
+                workers: int = RESOURCE_WARMUP_WORKERS):
+        """
+        선언된 리소스를 스레드 workers개로 동시에 초기화한다. 실패는 기록만 하고 넘어간다.
+        prime=False면 로드만 한다 (pre-fork 마스터용).
+        """
+        targets = list(names) if names is not None else self.warm_targets()
+        return self._run_warm_up(self._mark_warming(targets), prime, workers)
+
+    def _run_warm_up(self, targets: List[str], prime: bool = True, workers: int = RESOURCE_WARMUP_WORKERS):
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="resource-warmup") as pool:
+            list(pool.map(lambda name: self._warm_one(name, prime), targets))
+
+    def warm_up_in_background(self, names: Optional[Iterable[str]] = None) -> threading.Thread:
+        # 스레드가 시작되기 전에 /readyz가 준비 완료로 보지 않도록 여기서 먼저 표시
+        targets = self._mark_warming(list(names) if names is not None else self.warm_targets())
+        thread = threading.Thread(target=self._run_warm_up, args=(targets,), name="resource-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def readiness(self) -> Tuple[bool, Dict[str, dict]]:
+        """
+        warm-up 중인 리소스가 없고 필수 리소스가 실패 상태가 아니면 준비 완료.
+        필수 리소스: READY_RESOURCES(쉼표 구분) 또는 활성 프로필의 기본값 (utils.profiles.required_resources).
+        실패한 필수 리소스는 재시도 간격이 지나면 백그라운드에서 다시 초기화한다 (배포 중 파일이 늦게 도착하는 경우).
+        """
+        from .profiles import required_resources
+
+        configured = os.getenv("READY_RESOURCES", "").strip()
+        required = {n.strip() for n in configured.split(",") if n.strip()} if configured else set(required_resources())
+        with self._warming_lock:
+            warming = set(self._warming)
+        pending, retry = {}, []
+        for name, resource in self._resources.items():
+            # 현재 프로필에서 마운트되지 않은 리소스는 등록되지 않으므로 준비 여부와 무관
+            if name in warming:
+                pending[name] = resource.status()
+            elif name in required and resource.state == "failed":
+                pending[name] = resource.status()
+                if time.time() - resource.failed_at >= RESOURCE_RETRY_SECONDS:
+                    retry.append(name)
+        if retry:
+            self.warm_up_in_background(retry)
+        return not pending, pending
+
+    def status(self) -> Dict[str, dict]:
+        return {name: resource.status() for name, resource in self._resources.items()}
+
+
+registry = ResourceRegistry()
+register = registry.register
+
+
+class PromptSpec(NamedTuple):
+    """PromptTemplate 생성 인자. langchain import 없이 프롬프트를 선언하기 위해 사용."""
+    input_variables: List[str]
+    template: str
+
+
+def lazy_chain(name: str, prompt: PromptSpec, model_name: str = "gpt-4o", temperature: float = 0.7) -> LazyResource:
+    """LLMChain을 지연 생성 리소스로 선언한다. langchain은 첫 사용(또는 warm-up) 때 import된다."""
+
+    def build():
+        from langchain_openai import ChatOpenAI
+        from langchain.prompts import PromptTemplate
+        from langchain.chains import LLMChain
+        llm = ChatOpenAI(model_name=model_name, temperature=temperature)
+        return LLMChain(llm=llm, prompt=PromptTemplate(input_variables=prompt.input_variables, template=prompt.template))
+
+    return registry.register(name, build, prime=lambda chain: prewarm_openai_connection(chain.llm.root_client))
+
+
+def lazy_openai_client(name: str = "openai.client", async_client: bool = False) -> LazyResource:
+    """OpenAI 클라이언트를 지연 생성 리소스로 선언한다 (openai 패키지 import 비용 포함)."""
+
+    def build():
+        import openai
+        client_cls = openai.AsyncOpenAI if async_client else openai.OpenAI
+        return client_cls(api_key=os.getenv("OPENAI_API_KEY"))
+
+    # 비동기 클라이언트는 이벤트 루프 밖에서 pre-warm 할 수 없으므로 로드만 한다
+    return registry.register(name, build, prime=None if async_client else prewarm_openai_connection)
+
+
+_prewarmed_hosts = set()
+_prewarm_lock = threading.Lock()
+
+
+def prewarm_openai_connection(client):
+    """
+    OpenAI API와 TLS 커넥션을 미리 맺어 커넥션 풀에 넣어 둔다 (호스트당 프로세스에서 1회).
+    가벼운 models.list 호출을 사용하며 응답 내용/인증 실패 여부는 상관없다.
+    """
+    if not OPENAI_PREWARM:
+        return
+    host = str(client.base_url)
+    with _prewarm_lock:
+        if host in _prewarmed_hosts:
+            return
+        _prewarmed_hosts.add(host)
+    try:
+        client.with_options(timeout=5.0, max_retries=0).models.list()
+    except Exception as e:
+        # 401 등 HTTP 오류여도 커넥션은 이미 맺어졌으므로 목적은 달성
+        logger.info(f"[resources] OpenAI 커넥션 pre-warm 응답: {type(e).__name__}")
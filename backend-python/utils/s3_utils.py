@@ -1,11 +1,12 @@
-import boto3
 import os
 import io
 from dotenv import load_dotenv
-from botocore.client import Config
 import tempfile
 from pathlib import Path
 from uuid import uuid4
+from functools import lru_cache
+from utils import deadline
+from utils.resources import registry
 
 # .env 로드
 load_dotenv()
@@ -16,14 +17,45 @@ AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
 AWS_REGION = os.getenv("AWS_REGION")
 AWS_S3_BUCKET = os.getenv("AWS_S3_BUCKET")
 
-# S3 클라이언트 초기화
-s3_client = boto3.client(
-    "s3",
-    aws_access_key_id=AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-    region_name=AWS_REGION,
-    config=Config(signature_version='s3v4')
-)
+# S3 클라이언트 초기화 (boto3 import 포함, 첫 사용 또는 warm-up 때 생성)
+def _create_s3_client():
+    import boto3
+    from botocore.client import Config
+    return boto3.client(
+        "s3",
+        aws_access_key_id=AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+        region_name=AWS_REGION,
+        config=Config(signature_version='s3v4')
+    )
+
+s3_client = registry.register("s3.client", _create_s3_client)
+
+# 업로드 타임아웃 구간(초). 남은 예산 이하 중 가장 큰 구간의 클라이언트를 재사용한다.
+S3_TIMEOUT_BUCKETS = (1, 2, 5, 10, 20, 30, 60)
+
+@lru_cache(maxsize=len(S3_TIMEOUT_BUCKETS))
+def _s3_client_with_timeout(timeout: int):
+    import boto3
+    from botocore.client import Config
+    return boto3.client(
+        "s3",
+        aws_access_key_id=AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+        region_name=AWS_REGION,
+        config=Config(
+            signature_version='s3v4',
+            connect_timeout=min(timeout, 5),
+            read_timeout=timeout,
+            retries={"max_attempts": 2}
+        )
+    )
+
+def _budgeted_s3_client():
+    """요청의 남은 예산 안에서 끝나도록 타임아웃이 맞춰진 S3 클라이언트."""
+    timeout = deadline.timeout_for("s3")
+    bucket = max([b for b in S3_TIMEOUT_BUCKETS if b <= timeout], default=S3_TIMEOUT_BUCKETS[0])
+    return _s3_client_with_timeout(bucket)
 
 # 모든 S3 객체 목록 조회
 def list_s3_objects():
@@ -44,7 +76,7 @@ def upload_file_to_s3(local_path: str, s3_key: str, content_type: str = "applica
     Returns:
         퍼블릭 URL (https://...s3.amazonaws.com/...)
     """
-    s3_client.upload_file(
+    _budgeted_s3_client().upload_file(
         Filename=local_path,
         Bucket=AWS_S3_BUCKET,
         Key=s3_key,